@@ -0,0 +1,61 @@
+"""Time and memory for creating and loading cargo items.
+
+Compares the slotted ``Cargo`` class with an equivalent dict-backed class,
+both loaded into the same containers. Run with ``python benchmarks/bench_cargo.py [count]``.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from solution import Cargo, Container  # noqa: E402
+from solution.events import NullSink, use_sink  # noqa: E402
+
+ITEMS_PER_CONTAINER = 100
+
+
+class DictCargo:
+    def __init__(self, safe, load_mass):
+        self.safe = safe
+        self.load_mass = load_mass
+
+
+def load(cargo_type, containers, count):
+    for i in range(count):
+        containers[i // ITEMS_PER_CONTAINER].load_container(cargo_type(i % 7 != 0, 10))
+    return containers
+
+
+def new_containers(count):
+    capacity = ITEMS_PER_CONTAINER * 10
+    return [Container(capacity, 100, 100, 100) for _ in range(count // ITEMS_PER_CONTAINER)]
+
+
+def measure(cargo_type, count):
+    containers = new_containers(count)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    load(cargo_type, containers, count)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    containers = new_containers(count)
+    start = time.perf_counter()
+    load(cargo_type, containers, count)
+    return used, time.perf_counter() - start
+
+
+def main(count):
+    with use_sink(NullSink()):
+        with_dict = measure(DictCargo, count)
+        slotted = measure(Cargo, count)
+    print(f"cargo items: {count}")
+    for name, (used, elapsed) in (("__dict__", with_dict), ("__slots__", slotted)):
+        print(f"{name:>10}: {used / count:6.1f} bytes/item  {elapsed:6.2f} s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
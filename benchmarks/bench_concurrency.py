@@ -0,0 +1,84 @@
+"""Hammer a shared fleet from a growing number of threads.
+
+Every thread mixes cargo loads into random containers with transports of
+random containers between random ships. The benchmark reports operations
+per second for each thread count and, after every run, checks that each
+container sits on exactly one ship, that no container went past its load
+limit and that the ships' running totals match their contents.
+
+Run with ``python benchmarks/bench_concurrency.py [operations per thread] [max threads]``.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from solution import Cargo, ContainerForLiquids, Ship  # noqa: E402
+from solution.events import NullSink, use_sink  # noqa: E402
+
+SHIPS = 8
+CONTAINERS = 2_000
+
+
+def fleet(rng):
+    ships = [Ship(20, CONTAINERS, 10**9) for _ in range(SHIPS)]
+    containers = []
+    for position in range(CONTAINERS):
+        container = ContainerForLiquids(10_000, 259, 2_000, 606)
+        ships[position % SHIPS].load_container(container)
+        containers.append(container)
+    return ships, containers
+
+
+def worker(ships, containers, operations, seed):
+    rng = random.Random(seed)
+    for _ in range(operations):
+        container = rng.choice(containers)
+        if rng.random() < 0.8:
+            container.load_container(Cargo(rng.random() < 0.7, rng.randint(1, 300)))
+        else:
+            source, destination = rng.sample(ships, 2)
+            try:
+                source.transport_container(container, destination)
+            except ValueError:
+                pass  # The container is on another ship.
+
+
+def check(ships, containers):
+    for container in containers:
+        assert container.loaded_mass <= container.capacity * 0.9
+        assert len(container._storages) == 1
+    assert sum(ship.storage.container_count for ship in ships) == len(containers)
+    for ship in ships:
+        expected = sum(c.dry_mass + c.loaded_mass for c in ship.storage.containers)
+        assert ship.current_tonnage == expected
+
+
+def main(operations, max_threads):
+    print(f"{operations} operations per thread, {os.cpu_count()} CPUs")
+    print(f"{'threads':>7} {'time (s)':>9} {'ops/s':>10}")
+    for threads in range(1, max_threads + 1):
+        rng = random.Random(threads)
+        ships, containers = fleet(rng)
+        workers = [
+            threading.Thread(target=worker, args=(ships, containers, operations, seed))
+            for seed in range(threads)
+        ]
+        with use_sink(NullSink()):
+            start = time.perf_counter()
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        check(ships, containers)
+        print(f"{threads:>7} {elapsed:>9.3f} {threads * operations / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    arguments = [int(arg) for arg in sys.argv[1:]]
+    main(*(arguments + [50_000, 8][len(arguments):]))
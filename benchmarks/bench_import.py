@@ -0,0 +1,49 @@
+"""Measure how long ``python -c "import solution"`` takes.
+
+Run with ``python benchmarks/bench_import.py [--runs N] [--max-ms MS]``. The
+interpreter start-up cost (``python -c "pass"``) is subtracted, so the number
+reported is what importing the package adds. With ``--max-ms`` the script
+exits with status 1 when that number exceeds the limit, which makes it usable
+as a regression guard in CI.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def median_runtime(code, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def import_time_ms(runs):
+    baseline = median_runtime("pass", runs)
+    return (median_runtime("import solution", runs) - baseline) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    elapsed = import_time_ms(args.runs)
+    print(f"import solution: {elapsed:.1f} ms over interpreter start-up")
+    if args.max_ms is not None and elapsed > args.max_ms:
+        print(f"Regression: import time exceeds {args.max_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
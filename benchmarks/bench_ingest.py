@@ -0,0 +1,104 @@
+"""Compare loading gate events one at a time with streaming them through ``ingest``.
+
+A yard of containers of every type gets the same stream of cargo events
+both ways: looked up and loaded one ``load_container`` call at a time, and
+streamed through ``solution.ingest.ingest`` in batches of 1000 and of
+10 000. The benchmark reports events per second for each and checks they
+all end in the same state.
+
+Run with ``python benchmarks/bench_ingest.py [events ...]``.
+"""
+
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from solution import (  # noqa: E402
+    Cargo,
+    ChilledContainer,
+    Container,
+    ContainerForLiquids,
+    GasContainer,
+    Storage,
+)
+from solution.events import NullSink, use_sink  # noqa: E402
+from solution.ingest import ingest  # noqa: E402
+
+CONTAINERS = 1_000
+
+
+def setup():
+    storage = Storage()
+    for number in range(CONTAINERS):
+        match number % 4:
+            case 0:
+                container = Container(10**7, 259, 2_000, 606)
+            case 1:
+                container = ContainerForLiquids(10**7, 259, 2_000, 606)
+            case 2:
+                container = GasContainer(10**7, 259, 2_000, 606)
+            case _:
+                container = ChilledContainer(10**7, 259, 2_000, 606, "Fish", -5)
+        storage.add_container(container)
+    return storage
+
+
+def events(storage, count, seed):
+    rng = random.Random(seed)
+    serial_numbers = [container.serial_number for container in storage.containers]
+    for _ in range(count):
+        serial_number = rng.choice(serial_numbers)
+        if serial_number.startswith("KON-C"):
+            yield serial_number, rng.randint(1, 5_000), True, "Fish", rng.choice([-10, 0])
+        else:
+            yield serial_number, rng.randint(1, 5_000), rng.random() < 0.8, None, None
+
+
+def one_by_one(storage, stream):
+    accepted = 0
+    for serial_number, mass, safe, cargo_type, required_temperature in stream:
+        container = storage.get(serial_number)
+        count = len(container.cargo)
+        try:
+            if cargo_type is None:
+                container.load_container(Cargo(safe, mass))
+            else:
+                container.load_container(Cargo(safe, mass), cargo_type, required_temperature)
+        except Exception:
+            continue
+        accepted += len(container.cargo) > count
+    return accepted
+
+
+def streamed(batch_size):
+    def run(storage, stream):
+        return sum(reason is None for _, reason in ingest(storage, stream, batch_size))
+
+    run.__name__ = f"ingest({batch_size})"
+    return run
+
+
+def main(sizes):
+    runs = [one_by_one, streamed(1_000), streamed(10_000)]
+    print(f"{'events':>10}" + "".join(f"{run.__name__ + ' (ev/s)':>22}" for run in runs))
+    for size in sizes:
+        results = []
+        for run in runs:
+            with use_sink(NullSink()):
+                storage = setup()
+                stream = list(events(storage, size, size))
+                gc.collect()
+                start = time.perf_counter()
+                accepted = run(storage, iter(stream))
+                elapsed = time.perf_counter() - start
+            results.append((elapsed, accepted, storage.loaded_mass))
+        assert all(result[1:] == results[0][1:] for result in results)
+        print(f"{size:>10}" + "".join(f"{size / elapsed:>22,.0f}" for elapsed, *_ in results))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
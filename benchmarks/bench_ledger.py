@@ -0,0 +1,61 @@
+"""Memory and emptying time of a container's cargo: list of ``Cargo`` or ``CargoLedger``.
+
+One container is loaded with many small parcels, once keeping its cargo
+as a list and once in a ledger, with and without ``max_items``. The
+benchmark reports the memory the cargo takes, the time to load it and the
+time ``empty_container`` takes.
+
+Run with ``python benchmarks/bench_ledger.py [parcels ...]``.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from solution import Cargo, GasContainer  # noqa: E402
+from solution.events import NullSink, use_sink  # noqa: E402
+
+
+def loaded(parcels, ledger, max_items=None):
+    container = GasContainer(10**12, 259, 2_000, 606)
+    if ledger:
+        container.use_cargo_ledger(max_items)
+    for number in range(parcels):
+        container.load_container(Cargo(number % 10 != 0, 3))
+    return container
+
+
+def measure(parcels, *args):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    container = loaded(parcels, *args)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del container
+
+    start = time.perf_counter()
+    container = loaded(parcels, *args)
+    loading = time.perf_counter() - start
+    start = time.perf_counter()
+    container.empty_container()
+    return used, loading, time.perf_counter() - start
+
+
+def main(sizes):
+    print(f"{'parcels':>10} {'cargo':>22} {'memory (MB)':>12} {'load (s)':>9} {'empty (ms)':>11}")
+    for parcels in sizes:
+        for name, args in (
+            ("list", (False,)),
+            ("ledger", (True,)),
+            ("ledger, max 10 000", (True, 10_000)),
+        ):
+            with use_sink(NullSink()):
+                used, loading, emptying = measure(parcels, *args)
+            print(f"{parcels:>10} {name:>22} {used / 1e6:>12.1f} {loading:>9.2f} {emptying * 1e3:>11.2f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,54 @@
+"""Compare memory per container for Container objects and a ContainerTable.
+
+Run with ``python benchmarks/bench_memory.py [count]``.
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from solution import ChilledContainer, Container  # noqa: E402
+from solution.table import ContainerTable  # noqa: E402
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return used
+
+
+def build_objects(count):
+    return [
+        ChilledContainer(1000, 200, 500, 100, "Fruits", -5) if i % 4 == 0
+        else Container(1000, 200, 500, 100)
+        for i in range(count)
+    ]
+
+
+def build_table(count):
+    table = ContainerTable()
+    for i in range(count):
+        if i % 4 == 0:
+            table.append(ChilledContainer, 1000, 200, 500, 100, "Fruits", -5)
+        else:
+            table.append(Container, 1000, 200, 500, 100)
+    return table
+
+
+def main(count):
+    objects = measure(lambda: build_objects(count)) / count
+    table = measure(lambda: build_table(count)) / count
+    print(f"containers:        {count}")
+    print(f"Container objects: {objects:8.1f} bytes per container")
+    print(f"ContainerTable:    {table:8.1f} bytes per container")
+    print(f"reduction:         {objects / table:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,92 @@
+"""Measure how ShardedExecutor scales from one worker to N.
+
+Every run starts from an identical copy of a synthetic yard and applies the
+same operations; the outcomes and final container states are checked
+against the one-worker run. The speedup column only means something with
+at least as many idle cores as workers.
+
+Run with ``python benchmarks/bench_parallel.py [operations] [max workers]``.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from solution import (  # noqa: E402
+    Cargo,
+    ChilledContainer,
+    Container,
+    ContainerForLiquids,
+    GasContainer,
+    Storage,
+)
+from solution.events import NullSink, use_sink  # noqa: E402
+from solution.manifest import build_container, container_record  # noqa: E402
+from solution.parallel import ShardedExecutor  # noqa: E402
+
+CONTAINERS = 20_000
+TYPES = (Container, ContainerForLiquids, GasContainer)
+
+
+def yard(rng):
+    storage = Storage()
+    for i in range(CONTAINERS):
+        if i % 4 == 3:
+            container = ChilledContainer(30_000, 259, 2_200, 606, "Fish", -20)
+        else:
+            container = TYPES[i % 4](30_000, 259, 2_200, 606)
+        storage.add_container(container)
+    return storage
+
+
+def operations(storage, count, rng):
+    serials = [container.serial_number for container in storage.containers]
+    result = []
+    for _ in range(count):
+        serial = rng.choice(serials)
+        if rng.random() < 0.02:
+            result.append(("empty", serial))
+        elif serial.startswith("KON-C"):
+            result.append(("load", serial, Cargo(True, rng.randint(100, 3_000)), "Fish", -25))
+        else:
+            result.append(("load", serial, Cargo(rng.random() < 0.8, rng.randint(100, 3_000))))
+    return result
+
+
+def copy_of(storage):
+    copy = Storage()
+    for container in storage.containers:
+        copy.add_container(build_container(container_record(container), container.cargo))
+    return copy
+
+
+def main(count, max_workers):
+    rng = random.Random(0)
+    with use_sink(NullSink()):
+        original = yard(rng)
+        batch = operations(original, count, rng)
+        print(f"{count} operations on {CONTAINERS} containers, {os.cpu_count()} CPUs")
+        print(f"{'workers':>7} {'time (s)':>9} {'ops/s':>10} {'speedup':>8}")
+        baseline = expected = None
+        for workers in range(1, max_workers + 1):
+            storage = copy_of(original)
+            with ShardedExecutor(workers) as executor:
+                start = time.perf_counter()
+                report = executor.run(storage, batch)
+                elapsed = time.perf_counter() - start
+            outcome = (report.outcomes, [c.loaded_mass for c in storage.containers])
+            if expected is None:
+                baseline, expected = elapsed, outcome
+            assert outcome == expected, "sharded run differs from the serial run"
+            print(f"{workers:>7} {elapsed:>9.3f} {count / elapsed:>10.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    arguments = [int(arg) for arg in sys.argv[1:]]
+    main(
+        arguments[0] if arguments else 1_000_000,
+        arguments[1] if len(arguments) > 1 else os.cpu_count() or 1,
+    )
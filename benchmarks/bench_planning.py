@@ -0,0 +1,119 @@
+"""Plan and apply synthetic loading workloads with the first-fit-decreasing planner.
+
+For each size the benchmark creates that many containers of every kind and
+ten times as many cargo orders, then reports planning time, applying time
+and how much of the offered mass found a place. The smallest size is also
+planned with a linear first-fit scan for comparison.
+
+Run with ``python benchmarks/bench_planning.py [containers ...]``.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from solution import (  # noqa: E402
+    Cargo,
+    ChilledContainer,
+    Container,
+    ContainerForLiquids,
+    GasContainer,
+)
+from solution.events import NullSink, use_sink  # noqa: E402
+from solution.planning import CargoOrder, plan_loading  # noqa: E402
+
+CARGO_TYPES = ("Fish", "Fruit", "Meat", "Dairy")
+ORDERS_PER_CONTAINER = 14
+
+
+def workload(size, seed=0):
+    rng = random.Random(seed)
+    containers = []
+    for _ in range(size):
+        capacity = rng.choice((20_000, 28_000, 32_000))
+        containers.append(Container(capacity, 259, 2_200, 606))
+        containers.append(ContainerForLiquids(capacity, 259, 2_200, 606))
+        containers.append(GasContainer(capacity, 259, 2_200, 606))
+        containers.append(
+            ChilledContainer(
+                capacity, 259, 2_200, 606, rng.choice(CARGO_TYPES), rng.randint(-25, 5)
+            )
+        )
+    orders = []
+    for _ in range(size * 4 * ORDERS_PER_CONTAINER):
+        cargo = Cargo(rng.random() < 0.85, rng.randint(200, 4_000))
+        if rng.random() < 0.25:
+            orders.append(CargoOrder(cargo, rng.choice(CARGO_TYPES), rng.randint(-25, 5)))
+        else:
+            orders.append(CargoOrder(cargo))
+    return containers, orders
+
+
+def linear_first_fit(containers, orders):
+    # Same decreasing order, but every order scans the containers from the start.
+    loaded = {container.serial: container.loaded_mass for container in containers}
+    hazardous = dict.fromkeys(loaded, 0)
+    placed = 0
+    for order in sorted(orders, key=lambda order: order.cargo.load_mass, reverse=True):
+        cargo = order.cargo
+        for container in containers:
+            if (container.kind == "chilled") != (order.type_of_cargo is not None):
+                continue
+            if order.type_of_cargo is not None and (
+                container.type_of_cargo != order.type_of_cargo
+                or container.temperature < order.required_temperature
+            ):
+                continue
+            serial = container.serial
+            if loaded[serial] + cargo.load_mass > container._load_limit(Cargo(True, 0)):
+                continue
+            if not cargo.safe and hazardous[serial] + cargo.load_mass > container._load_limit(cargo):
+                continue
+            loaded[serial] += cargo.load_mass
+            if not cargo.safe:
+                hazardous[serial] += cargo.load_mass
+            placed += 1
+            break
+    return placed
+
+
+def main(sizes):
+    print(
+        f"{'containers':>10} {'orders':>8} {'plan (s)':>9} {'orders/s':>10} "
+        f"{'apply (s)':>10} {'placed':>7} {'mass placed':>12}"
+    )
+    for size in sizes:
+        containers, orders = workload(size)
+        offered = sum(order.cargo.load_mass for order in orders)
+        start = time.perf_counter()
+        plan = plan_loading(containers, orders)
+        planning = time.perf_counter() - start
+        with use_sink(NullSink()):
+            start = time.perf_counter()
+            plan.apply()
+            applying = time.perf_counter() - start
+        print(
+            f"{len(containers):>10} {len(orders):>8} {planning:>9.3f} "
+            f"{len(orders) / planning:>10.0f} {applying:>10.3f} "
+            f"{plan.planned_count / len(orders):>7.1%} {plan.planned_mass / offered:>12.1%}"
+        )
+
+    size = min(sizes)
+    containers, orders = workload(size)
+    start = time.perf_counter()
+    placed = linear_first_fit(containers, orders)
+    scan = time.perf_counter() - start
+    start = time.perf_counter()
+    plan = plan_loading(containers, orders)
+    tree = time.perf_counter() - start
+    print(
+        f"\n{len(containers)} containers, linear first fit: {scan:.3f}s ({placed} placed), "
+        f"segment tree: {tree:.3f}s ({plan.planned_count} placed), {scan / tree:.0f}x"
+    )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [250, 2_500])
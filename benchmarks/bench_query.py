@@ -0,0 +1,96 @@
+"""Compare Storage.query against scanning every container.
+
+Run with ``python benchmarks/bench_query.py [size ...]``.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from solution import (  # noqa: E402
+    Cargo,
+    ChilledContainer,
+    Container,
+    ContainerForLiquids,
+    Storage,
+)
+from solution.events import NullSink, use_sink  # noqa: E402
+
+REPEATS = 20
+
+QUERIES = {
+    "chilled X <= -10C": {"type_of_cargo": "X", "max_temperature": -10},
+    "over 90% full": {"min_fill": 0.9},
+    "hazardous": {"hazardous": True},
+}
+
+
+def scan_chilled(storage):
+    return [
+        c
+        for c in storage.containers
+        if isinstance(c, ChilledContainer) and c.type_of_cargo == "X" and c.temperature <= -10
+    ]
+
+
+def scan_full(storage):
+    return [c for c in storage.containers if c.loaded_mass / c.capacity >= 0.9]
+
+
+def scan_hazardous(storage):
+    return [c for c in storage.containers if any(not item.safe for item in c.cargo)]
+
+
+SCANS = {
+    "chilled X <= -10C": scan_chilled,
+    "over 90% full": scan_full,
+    "hazardous": scan_hazardous,
+}
+
+
+def build(size):
+    rng = random.Random(size)
+    storage = Storage()
+    for i in range(size):
+        if i % 3 == 0:
+            container = ChilledContainer(
+                1000, 100, 100, 100, rng.choice("XYZW"), rng.randint(-30, 5)
+            )
+        elif i % 3 == 1:
+            container = ContainerForLiquids(1000, 100, 100, 100)
+        else:
+            container = Container(1000, 100, 100, 100)
+        if container.kind != "chilled" and rng.random() < 0.05:
+            mass = 950 if container.kind == "general" else 400
+            container.load_container(Cargo(rng.random() < 0.5, mass))
+        storage.add_container(container)
+    return storage
+
+
+def timed(function):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = function()
+    return (time.perf_counter() - start) / REPEATS, result
+
+
+def main(sizes):
+    print(f"{'size':>9} {'query':>18} {'scan (ms)':>10} {'index (ms)':>11} {'matches':>8}")
+    for size in sizes:
+        with use_sink(NullSink()):
+            storage = build(size)
+            start = time.perf_counter()
+            storage.indexes
+            print(f"{size:>9} {'build indexes':>18} {(time.perf_counter() - start) * 1e3:>10.1f}")
+            for name, predicates in QUERIES.items():
+                scan, expected = timed(lambda: SCANS[name](storage))
+                query, found = timed(lambda: storage.query(**predicates))
+                assert found == expected
+                print(f"{size:>9} {name:>18} {scan * 1e3:>10.2f} {query * 1e3:>11.3f} {len(found):>8}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
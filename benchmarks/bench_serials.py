@@ -0,0 +1,82 @@
+"""Serial number micro-benchmarks.
+
+Run with ``python benchmarks/bench_serials.py [count]``.
+"""
+
+import os
+import re
+import sys
+import timeit
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from solution.serials import (  # noqa: E402
+    SerialAllocator,
+    SerialNumber,
+    validate,
+    validate_many,
+)
+
+
+class LegacySerialNumber:
+    """The validation SerialNumber did before it had a precompiled pattern."""
+
+    def __init__(self, serial_number: str):
+        pattern = r"KON-\w*-\d*"
+        if re.match(pattern, serial_number):
+            self.serial_number = serial_number
+        else:
+            raise Exception("Invalid serial number. Received: " + serial_number)
+
+
+def report(name, seconds, count):
+    print(f"{name:<32} {seconds / count * 1e9:8.1f} ns/op")
+
+
+def bench_allocation(count):
+    allocator = SerialAllocator()
+    report("uuid4 string", timeit.timeit(lambda: str(uuid.uuid4()), number=count), count)
+    report("allocate", timeit.timeit(lambda: allocator.allocate("liquid"), number=count), count)
+    blocked = SerialAllocator(block_size=1024)
+    report(
+        "allocate (blocks of 1024)",
+        timeit.timeit(lambda: blocked.allocate("liquid"), number=count),
+        count,
+    )
+    report(
+        "reserve 1024 at once",
+        timeit.timeit(lambda: allocator.reserve("liquid", 1024), number=count // 1024) / 1024,
+        count // 1024,
+    )
+
+
+def bench_lookup(count):
+    strings = {str(uuid.uuid4()): i for i in range(10_000)}
+    keys = {SerialAllocator().allocate("gas") + 8 * i: i for i in range(10_000)}
+    string_probe = next(iter(strings))
+    key_probe = next(iter(keys))
+    report("dict lookup, uuid string", timeit.timeit(lambda: strings[string_probe], number=count), count)
+    report("dict lookup, integer key", timeit.timeit(lambda: keys[key_probe], number=count), count)
+
+
+def bench_validation(count):
+    serials = [f"KON-{'MLGC'[i % 4]}-{i + 1}" for i in range(count)]
+    report("legacy SerialNumber()", timeit.timeit(lambda: [LegacySerialNumber(s) for s in serials], number=1), count)
+    report("SerialNumber()", timeit.timeit(lambda: [SerialNumber(s) for s in serials], number=1), count)
+    report("validate()", timeit.timeit(lambda: [validate(s) for s in serials], number=1), count)
+    report(
+        "validate_many()",
+        timeit.timeit(lambda: sum(ok for _, ok in validate_many(serials)), number=1),
+        count,
+    )
+
+
+def main(count):
+    bench_allocation(count)
+    bench_lookup(count)
+    bench_validation(count)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,142 @@
+"""Generate load against a local container service.
+
+Starts ``python -m solution serve --port 0 --quiet`` in a subprocess
+(or uses ``--address host:port`` of one already running), fills its yard
+with containers, then opens ``connections`` connections that each send
+``requests`` requests, pipelined with at most ``window`` of them in flight.
+The mix is mostly cargo loads, with queries, stats and emptying. Latency is
+measured per request, from the moment it is written until its response
+arrives.
+
+Run with ``python benchmarks/bench_service.py [connections] [requests] [window] [--address host:port]``.
+"""
+
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import deque
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CONTAINERS = 1_000
+
+
+def encode(request):
+    return json.dumps(request, separators=(",", ":")).encode() + b"\n"
+
+
+def workload(serial_numbers, count, rng):
+    for _ in range(count):
+        roll = rng.random()
+        serial_number = rng.choice(serial_numbers)
+        if roll < 0.8:
+            cargo = [rng.random() < 0.7, rng.randint(1, 50)]
+            yield {"op": "load", "serial_number": serial_number, "cargo": cargo}
+        elif roll < 0.9:
+            yield {"op": "query", "hazardous": True, "min_fill": 0.99}
+        elif roll < 0.97:
+            yield {"op": "stats"}
+        else:
+            yield {"op": "empty", "serial_number": serial_number}
+
+
+async def setup(host, port):
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 24)
+    container = {
+        "type": "liquid",
+        "capacity": 30_000,
+        "height": 259,
+        "dry_mass": 2_000,
+        "depth": 606,
+    }
+    add = {"op": "add", "container": container}
+    writer.write(encode({"op": "batch", "requests": [add] * CONTAINERS}))
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    writer.close()
+    return [item["result"]["serial_number"] for item in response["result"]]
+
+
+async def client(host, port, requests, window, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    in_flight = asyncio.Semaphore(window)
+    sent = deque()
+    errors = 0
+
+    async def receive():
+        nonlocal errors
+        for _ in range(len(requests)):
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent.popleft())
+            errors += not response["ok"]
+            in_flight.release()
+
+    receiver = asyncio.create_task(receive())
+    for request in requests:
+        await in_flight.acquire()
+        sent.append(time.perf_counter())
+        writer.write(encode(request))
+        await writer.drain()
+    await receiver
+    writer.close()
+    return errors
+
+
+def percentile(values, share):
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+async def run(host, port, connections, requests, window):
+    serial_numbers = await setup(host, port)
+    rng = random.Random(0)
+    plans = [list(workload(serial_numbers, requests, rng)) for _ in range(connections)]
+    latencies = []
+    start = time.perf_counter()
+    errors = await asyncio.gather(
+        *(client(host, port, plan, window, latencies) for plan in plans)
+    )
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    total = connections * requests
+    print(f"{connections} connections x {requests} requests, window {window}")
+    print(f"  {total / elapsed:,.0f} requests/s over {elapsed:.2f} s")
+    print(
+        f"  latency p50 {percentile(latencies, 0.5) * 1000:.2f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms"
+    )
+    # Loads that would overfill a container count as rejected.
+    print(f"  rejected: {sum(errors)}")
+
+
+def main(argv):
+    address = None
+    if "--address" in argv:
+        position = argv.index("--address")
+        address = argv[position + 1]
+        del argv[position : position + 2]
+    connections, requests, window = [int(arg) for arg in argv] + [8, 5_000, 32][len(argv):]
+
+    server = None
+    if address is None:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "solution", "serve", "--port", "0", "--quiet"],
+            cwd=ROOT,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        line = server.stdout.readline()
+        address = line.rsplit(" ", 1)[-1].strip()
+    host, port = address.rsplit(":", 1)
+    try:
+        asyncio.run(run(host, int(port), connections, requests, window))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,55 @@
+"""Snapshot write, open and lookup times.
+
+Run with ``python benchmarks/bench_snapshot.py [count]``.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from solution import Cargo, Container, Storage  # noqa: E402
+from solution.events import NullSink, use_sink  # noqa: E402
+from solution.snapshot import Snapshot, restore, write_snapshot  # noqa: E402
+
+LOOKUPS = 1000
+
+
+def timed(action):
+    start = time.perf_counter()
+    result = action()
+    return result, time.perf_counter() - start
+
+
+def main(count):
+    storage = Storage()
+    with use_sink(NullSink()):
+        for i in range(count):
+            container = Container(1000, 100, 100, 100)
+            container.load_container(Cargo(i % 3 != 0, 10))
+            storage._add(container)
+    serials = [c.serial_number for c in random.Random(0).sample(list(storage.containers), LOOKUPS)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "yard.snap")
+        _, write_time = timed(lambda: write_snapshot(path, [storage]))
+        snapshot, open_time = timed(lambda: Snapshot(path))
+        _, lookup_time = timed(lambda: [snapshot.row(snapshot.find(s)) for s in serials])
+        snapshot.close()
+        with use_sink(NullSink()):
+            _, restore_time = timed(lambda: restore(path))
+        size = os.path.getsize(path)
+
+    print(f"containers:          {count}")
+    print(f"snapshot size:       {size / 1e6:.1f} MB")
+    print(f"write:               {write_time:.2f} s")
+    print(f"open (mmap):         {open_time * 1e3:.2f} ms")
+    print(f"lookup + row read:   {lookup_time / LOOKUPS * 1e6:.1f} us")
+    print(f"full restore:        {restore_time:.2f} s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
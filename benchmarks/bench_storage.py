@@ -0,0 +1,86 @@
+"""Compare serial-number operations of the indexed Storage with the old list scan.
+
+Run with ``python benchmarks/bench_storage.py [size ...]``.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from solution import Container, Storage  # noqa: E402
+from solution.events import NullSink, use_sink  # noqa: E402
+
+SAMPLES = 200
+
+
+class ListStorage:
+    """The list-scanning Storage this benchmark is measured against."""
+
+    def __init__(self):
+        self.containers = []
+
+    def add_container(self, container):
+        self.containers.append(container)
+
+    def get(self, serial_number):
+        for container in self.containers:
+            if container.serial_number == serial_number:
+                return container
+        return None
+
+    def replace_container(self, serial_number, new_container):
+        for container in self.containers:
+            if container.serial_number == serial_number:
+                self.containers[self.containers.index(container)] = new_container
+
+    def remove_container_by_serial_number(self, serial_number):
+        for container in self.containers:
+            if container.serial_number == serial_number:
+                self.containers.remove(container)
+
+
+def timed(operation, arguments):
+    start = time.perf_counter()
+    for argument in arguments:
+        operation(*argument)
+    return (time.perf_counter() - start) / len(arguments)
+
+
+def run(size):
+    containers = [Container(1000, 100, 100, 100) for _ in range(size)]
+    spares = [Container(1000, 100, 100, 100) for _ in range(SAMPLES)]
+    sample = random.Random(size).sample(containers, SAMPLES)
+    results = {}
+    for name, storage_type in (("list", ListStorage), ("indexed", Storage)):
+        storage = storage_type()
+        with use_sink(NullSink()):
+            for container in containers:
+                storage.add_container(container)
+            lookup = timed(storage.get, [(c.serial_number,) for c in sample])
+            replace = timed(
+                storage.replace_container,
+                [(c.serial_number, s) for c, s in zip(sample, spares)],
+            )
+            remove = timed(
+                storage.remove_container_by_serial_number,
+                [(s.serial_number,) for s in spares],
+            )
+        results[name] = (lookup, replace, remove)
+    return results
+
+
+def main(sizes):
+    print(f"{'size':>9} {'operation':>9} {'list (us)':>12} {'indexed (us)':>13} {'speedup':>9}")
+    for size in sizes:
+        results = run(size)
+        for i, operation in enumerate(("get", "replace", "remove")):
+            slow = results["list"][i] * 1e6
+            fast = results["indexed"][i] * 1e6
+            print(f"{size:>9} {operation:>9} {slow:>12.2f} {fast:>13.3f} {slow / fast:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
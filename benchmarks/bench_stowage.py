@@ -0,0 +1,70 @@
+"""Stow a large synthetic yard onto ships.
+
+Two fleets are planned for every yard size: a few large ships that could
+take every container but not all of the mass, and many small ships whose
+slot count and tonnage both bind. For each, the benchmark reports planning
+time and the tonnage left unused with the greedy answer alone
+(``time_budget=0``) and with the bucketed dynamic program.
+
+Run with ``python benchmarks/bench_stowage.py [containers ...]``.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from solution import Cargo, Container, Ship, Storage  # noqa: E402
+from solution.events import NullSink, use_sink  # noqa: E402
+from solution.stowage import plan_stowage  # noqa: E402
+
+SETTINGS = (
+    ("greedy only", {"time_budget": 0}),
+    ("100 buckets", {"buckets": 100}),
+    ("1000 buckets", {"buckets": 1000}),
+    ("1000 buckets, 0.5 s", {"buckets": 1000, "time_budget": 0.5}),
+)
+
+
+def yard(size, rng):
+    storage = Storage()
+    with use_sink(NullSink()):
+        for _ in range(size):
+            container = Container(30_000, 259, rng.randint(2_000, 4_000), 606)
+            container.load_container(Cargo(True, rng.randint(0, 26_000)))
+            storage.add_container(container)
+    return storage
+
+
+def fleets(size, rng):
+    large = [
+        Ship(20, size // 5, rng.randint(1_500, 2_500) * size + rng.randint(0, 999))
+        for _ in range(5)
+    ]
+    small = [Ship(20, 12, rng.randint(150_000, 200_000)) for _ in range(size // 100)]
+    return {"large ships": large, "small ships": small}
+
+
+def main(sizes):
+    print(
+        f"{'containers':>10} {'fleet':>12} {'settings':>20} {'time (s)':>9} {'unused (kg)':>12}"
+    )
+    for size in sizes:
+        rng = random.Random(size)
+        storage = yard(size, rng)
+        for fleet, ships in fleets(size, rng).items():
+            tonnage = sum(ship.max_tonnage for ship in ships)
+            for label, options in SETTINGS:
+                start = time.perf_counter()
+                plan = plan_stowage(storage, ships, **options)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{size:>10} {fleet:>12} {label:>20} {elapsed:>9.3f} "
+                    f"{tonnage - plan.total_mass:>12}"
+                )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 5_000])
@@ -0,0 +1,73 @@
+"""Where is a container: scanning every ship or asking the ``Terminal``.
+
+A fleet of ships is loaded with containers, then a sample of serial
+numbers is located by scanning every ship's ``storage.containers`` and
+through ``Terminal.locate``. Loading the fleet is also timed with and
+without the terminal, for the cost of keeping its index up to date.
+
+Run with ``python benchmarks/bench_terminal.py [ships] [containers per ship]``.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from solution import Container, Ship  # noqa: E402
+from solution.events import NullSink, use_sink  # noqa: E402
+from solution.terminal import Terminal  # noqa: E402
+
+LOOKUPS = 1_000
+
+
+def load_fleet(ship_count, per_ship, terminal=None):
+    ships = [Ship(20, per_ship, 10**12) for _ in range(ship_count)]
+    if terminal is not None:
+        for ship in ships:
+            terminal.add_ship(ship)
+    start = time.perf_counter()
+    for ship in ships:
+        for _ in range(per_ship):
+            ship.load_container(Container(30_000, 259, 2_000, 606))
+    return ships, time.perf_counter() - start
+
+
+def scan(ships, serial_number):
+    for ship in ships:
+        for container in ship.storage.containers:
+            if container.serial_number == serial_number:
+                return ship
+    return None
+
+
+def main(ship_count, per_ship):
+    with use_sink(NullSink()):
+        ships, plain = load_fleet(ship_count, per_ship)
+        terminal = Terminal()
+        ships, indexed = load_fleet(ship_count, per_ship, terminal)
+    serial_numbers = [
+        container.serial_number
+        for container in random.Random(0).sample(
+            [container for ship in ships for container in ship.storage.containers], LOOKUPS
+        )
+    ]
+
+    start = time.perf_counter()
+    scanned = [scan(ships, serial_number) for serial_number in serial_numbers]
+    scanning = time.perf_counter() - start
+    start = time.perf_counter()
+    located = [terminal.locate(serial_number) for serial_number in serial_numbers]
+    locating = time.perf_counter() - start
+    assert scanned == located
+
+    print(f"{ship_count} ships x {per_ship} containers, {LOOKUPS} lookups")
+    print(f"{'load without terminal':>24}: {plain:8.3f} s")
+    print(f"{'load with terminal':>24}: {indexed:8.3f} s")
+    print(f"{'scan every ship':>24}: {scanning / LOOKUPS * 1e6:8.1f} us/lookup")
+    print(f"{'Terminal.locate':>24}: {locating / LOOKUPS * 1e6:8.1f} us/lookup")
+
+
+if __name__ == "__main__":
+    main(*([int(arg) for arg in sys.argv[1:3]] or [100, 1_000]))
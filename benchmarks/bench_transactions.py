@@ -0,0 +1,91 @@
+"""Compare one-at-a-time operations with a single transaction.
+
+A yard of indexed containers and a fleet of ships get the same mix of work
+both ways: containers moved from the yard onto ships, cargo loaded into
+them and some of them emptied again. The benchmark reports both timings
+and checks that both end in the same state.
+
+Run with ``python benchmarks/bench_transactions.py [containers ...]``.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from solution import Cargo, Container, Ship, Storage  # noqa: E402
+from solution.events import NullSink, use_sink  # noqa: E402
+from solution.transactions import Transaction  # noqa: E402
+
+SHIPS = 10
+
+
+def setup(size):
+    yard = Storage()
+    for _ in range(size):
+        yard.add_container(Container(30_000, 259, 2_000, 606))
+    yard.query(hazardous=True)  # build the indexes
+    ships = [Ship(20, size, 10**9) for _ in range(SHIPS)]
+    for ship in ships:
+        ship.storage.query(hazardous=True)
+    return yard, ships
+
+
+def work(yard, ships, size, rng):
+    for container in list(yard.containers)[: size // 2]:
+        ship = rng.choice(ships)
+        yield "unload", yard, container
+        yield "load", ship, container
+        for _ in range(3):
+            yield "load_cargo", container, Cargo(rng.random() < 0.8, rng.randint(1, 5_000))
+        if rng.random() < 0.2:
+            yield "empty", container
+
+
+def one_by_one(operations):
+    for name, *args in operations:
+        match name:
+            case "unload":
+                args[0].remove_container(args[1])
+            case "load":
+                args[0].load_container(args[1])
+            case "load_cargo":
+                args[0].load_container(args[1])
+            case "empty":
+                args[0].empty_container()
+
+
+def in_transaction(operations):
+    transaction = Transaction()
+    for name, *args in operations:
+        getattr(transaction, name)(*args)
+    report = transaction.commit()
+    assert report.committed, report.rejected[:3]
+
+
+def summary(yard, ships):
+    return [
+        (storage.container_count, storage.loaded_mass, dict(storage.count_by_hazard))
+        for storage in [yard, *(ship.storage for ship in ships)]
+    ]
+
+
+def main(sizes):
+    print(f"{'containers':>10} {'operations':>10} {'one by one (s)':>15} {'transaction (s)':>16}")
+    for size in sizes:
+        results = []
+        for run in (one_by_one, in_transaction):
+            with use_sink(NullSink()):
+                yard, ships = setup(size)
+                operations = list(work(yard, ships, size, random.Random(size)))
+                start = time.perf_counter()
+                run(operations)
+                results.append((time.perf_counter() - start, summary(yard, ships)))
+        assert results[0][1] == results[1][1]
+        print(f"{size:>10} {len(operations):>10} {results[0][0]:>15.3f} {results[1][0]:>16.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 50_000])
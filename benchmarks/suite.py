@@ -0,0 +1,257 @@
+"""Run the benchmark suite over the hot paths and compare runs.
+
+Every case builds what it needs, then times one operation over ``n``
+items; the best of ``--repeat`` runs is kept. Every case runs at each size
+given with ``--sizes``, from 10**3 up to 10**6. Covered:
+
+* building each container type,
+* ``Storage`` add, and replace and remove by serial number,
+* ``Ship.load_container_group``,
+* ``Container.load_container`` with many ``Cargo`` items,
+* ``print_info`` of containers and of a ship, rendered to a string,
+* importing the package, in a fresh interpreter.
+
+``--save results.json`` writes the results. ``--baseline results.json``
+compares against an earlier run and exits with status 1 when a case got
+slower than ``--tolerance`` allows.
+
+Run with ``python benchmarks/suite.py [--sizes 1000 100000] [--only storage] [--save PATH] [--baseline PATH]``.
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bench_import import import_time_ms  # noqa: E402
+from solution import CONTAINER_TYPES, Cargo, Container, Ship, Storage  # noqa: E402
+from solution.events import NullSink, use_sink  # noqa: E402
+from solution.rendering import get_render_cache  # noqa: E402
+
+CASES = {}
+
+
+def case(name, max_n=None):
+    """Register a case: ``function(n)`` does the set-up and returns the callable to time.
+
+    Sizes above ``max_n`` are skipped for cases too slow to run at them.
+    """
+
+    def register(function):
+        CASES[name] = (function, max_n)
+        return function
+
+    return register
+
+
+def _build(kind):
+    container_type = CONTAINER_TYPES[kind]
+    if kind == "chilled":
+        return lambda: container_type(30_000, 259, 2_000, 606, "Fish", -5)
+    return lambda: container_type(30_000, 259, 2_000, 606)
+
+
+def _construct(kind):
+    def construct(n):
+        build = _build(kind)
+        return lambda: [build() for _ in range(n)]
+
+    return construct
+
+
+for _kind in CONTAINER_TYPES:
+    case(f"construct.{_kind}")(_construct(_kind))
+
+
+def _filled(n):
+    storage = Storage()
+    containers = [Container(30_000, 259, 2_000, 606) for _ in range(n)]
+    for container in containers:
+        storage.add_container(container)
+    return storage, containers
+
+
+@case("storage.add")
+def storage_add(n):
+    containers = [Container(30_000, 259, 2_000, 606) for _ in range(n)]
+
+    def run():
+        storage = Storage()
+        for container in containers:
+            storage.add_container(container)
+
+    return run
+
+
+@case("storage.replace")
+def storage_replace(n):
+    storage, containers = _filled(n)
+    spares = [Container(30_000, 259, 2_000, 606) for _ in range(n)]
+    pairs = [(container.serial_number, spare) for container, spare in zip(containers, spares)]
+
+    def run():
+        for serial_number, spare in pairs:
+            storage.replace_container(serial_number, spare)
+
+    return run
+
+
+@case("storage.remove")
+def storage_remove(n):
+    storage, containers = _filled(n)
+    serial_numbers = [container.serial_number for container in containers]
+
+    def run():
+        for serial_number in serial_numbers:
+            storage.remove_container_by_serial_number(serial_number)
+
+    return run
+
+
+@case("ship.load_container_group")
+def ship_load_group(n):
+    containers = [Container(30_000, 259, 2_000, 606) for _ in range(n)]
+    ship = Ship(20, n, 10**12)
+    return lambda: ship.load_container_group(containers)
+
+
+@case("container.load_container")
+def container_load(n):
+    container = Container(10**12, 259, 2_000, 606)
+    cargo = [Cargo(position % 4 != 0, 10) for position in range(n)]
+
+    def run():
+        for item in cargo:
+            container.load_container(item)
+
+    return run
+
+
+@case("render.container", max_n=10_000)
+def render_container(n):
+    containers = [Container(30_000, 259, 2_000, 606) for _ in range(n)]
+    for container in containers:
+        for _ in range(5):
+            container.load_container(Cargo(True, 10))
+    get_render_cache().clear()
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for container in containers:
+                container.print_info(max_pages=1)
+
+    return run
+
+
+@case("render.ship", max_n=100_000)
+def render_ship(n):
+    ship = Ship(20, n, 10**12)
+    ship.load_container_group([Container(30_000, 259, 2_000, 606) for _ in range(n)])
+    get_render_cache().clear()
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            ship.print_info()
+
+    return run
+
+
+def run_case(name, n, repeat):
+    function = CASES[name][0]
+    best = None
+    for _ in range(repeat):
+        with use_sink(NullSink()):
+            operation = function(n)
+            start = time.perf_counter()
+            operation()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {"n": n, "seconds": best, "us_per_item": best / n * 1e6}
+
+
+def run_suite(sizes, only=None, repeat=3, import_runs=10):
+    results = {}
+    for name, (_, max_n) in CASES.items():
+        if only and not any(part in name for part in only):
+            continue
+        for n in sizes:
+            if max_n is not None and n > max_n:
+                continue
+            key = f"{name}[{n}]"
+            result = results[key] = run_case(name, n, repeat)
+            print(f"{key:>40} {result['seconds']:>10.4f} s {result['us_per_item']:>10.3f} us/item")
+    if not only or any(part in "import" for part in only):
+        seconds = import_time_ms(import_runs) / 1000
+        results["import"] = {"n": 1, "seconds": seconds, "us_per_item": seconds * 1e6}
+        print(f"{'import':>40} {seconds:>10.4f} s")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print each case against ``baseline``; return the names that regressed."""
+    regressions = []
+    print(f"\n{'case':>40} {'baseline (s)':>13} {'now (s)':>10} {'change':>8}")
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        ratio = result["seconds"] / before["seconds"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(
+            f"{key:>40} {before['seconds']:>13.4f} {result['seconds']:>10.4f} "
+            f"{(ratio - 1) * 100:>+7.1f}%{flag}"
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument(
+        "--only", nargs="+", help="run only the cases whose name contains one of these"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against the results in this JSON file")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="allowed slow-down, 0.2 for 20%%"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.sizes, args.only, args.repeat)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.platform(),
+                    "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(
+                f"\nRegression: {len(regressions)} case(s) slower than {args.tolerance:.0%} allows"
+            )
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
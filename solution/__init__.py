@@ -1,84 +1,544 @@
-import re
-import uuid
-from tabulate import tabulate
+import threading
+from array import array
+from collections.abc import Sequence
+from contextlib import contextmanager
+
+from .events import (
+    ContainerAdded,
+    ContainerEmptied,
+    ContainerLoaded,
+    ContainerRemoved,
+    ContainerReplaced,
+    HazardRaised,
+    StorageEmptied,
+    emit,
+)
+from .hazards import get_hazard_pipeline
+from .indexes import StorageIndexes
+from .locking import container_lock, locked
+from .rendering import (
+    PAGE_SIZE,
+    cargo_pages,
+    container_table,
+    manifest_pages,
+    print_pages,
+    render_cached,
+    tabulate,
+)
+from .serials import (
+    InvalidSerialNumberException,
+    SerialNumber,
+    allocate_serial,
+    format_serial,
+    intern_serial,
+    serial_key,
+)
 
 
 class OverfillException(Exception):
     pass
 
 
-def generate_serial_number():
-    return str(uuid.uuid4())
+class TemperatureException(Exception):
+    pass
+
+
+def generate_serial_number(kind="general"):
+    return format_serial(allocate_serial(kind))
+
+
+class StorageView(Sequence):
+    """Read-only, insertion-ordered view over the containers of a Storage."""
+
+    def __init__(self, storage):
+        self._storage = storage
+
+    def __len__(self):
+        return len(self._storage._index)
+
+    def __iter__(self):
+        for container in self._storage._slots:
+            if container is not None:
+                yield container
+
+    def __contains__(self, container):
+        serial = getattr(container, "serial", None)
+        if serial is None:
+            return False
+        return self._storage.get(serial) == container
+
+    def __getitem__(self, index):
+        storage = self._storage
+        with storage._lock:
+            if storage._holes:
+                storage._compact()
+            return storage._slots[index]
+
+    def __repr__(self):
+        return repr(list(self))
 
 
 class Storage:
+    # Removed containers leave a hole in ``_slots`` so that positions stored in
+    # ``_index`` stay valid; the slots are compacted once holes dominate.
+    COMPACT_THRESHOLD = 32
+
     def __init__(self):
-        self.containers = []
+        # Guards everything below; see solution.locking for the lock order.
+        self._lock = threading.RLock()
+        self._slots = []
+        self._index = {}
+        self._holes = 0
+        self._indexes = None
+        # The Terminal this storage belongs to, told whenever a container
+        # comes or goes.
+        self._registry = None
+        self._reset_aggregates()
+
+    @property
+    def containers(self):
+        return StorageView(self)
+
+    @property
+    def indexes(self):
+        # Built on the first query, then kept up to date incrementally.
+        with self._lock:
+            if self._indexes is None:
+                self._indexes = StorageIndexes(self.containers)
+            return self._indexes
+
+    def query(
+        self,
+        kind=None,
+        type_of_cargo=None,
+        min_temperature=None,
+        max_temperature=None,
+        min_fill=None,
+        max_fill=None,
+        hazardous=None,
+    ):
+        """Return the containers matching every given predicate, in storage order.
+
+        ``kind`` is a container kind or class, the temperature and fill
+        bounds are inclusive and the fill ratio is loaded mass over capacity.
+        """
+        with self._lock:
+            return self.indexes.query(
+                self,
+                kind,
+                type_of_cargo,
+                min_temperature,
+                max_temperature,
+                min_fill,
+                max_fill,
+                hazardous,
+            )
 
-    def add_container(self, container):
+    @property
+    def container_count(self):
+        return len(self._index)
+
+    def _reset_aggregates(self):
+        # Running totals, updated as containers come and go and as they are
+        # loaded or emptied, so reading any of them is O(1).
+        self.total_mass = 0
+        self.loaded_mass = 0
+        self.count_by_type = {}
+        self.count_by_hazard = {"safe": 0, "hazardous": 0}
+
+    def _count(self, container, sign):
+        # Adds (sign 1) or takes out (sign -1) a container's share of the totals.
+        self.total_mass += sign * (container.dry_mass + container.loaded_mass)
+        self.loaded_mass += sign * container.loaded_mass
+        kind = container.kind
+        self.count_by_type[kind] = self.count_by_type.get(kind, 0) + sign
+        if not self.count_by_type[kind]:
+            del self.count_by_type[kind]
+        self.count_by_hazard["hazardous" if container.is_hazardous else "safe"] += sign
+
+    def _track(self, container):
+        container._storages.append(self)
+        self._count(container, 1)
+        if self._indexes is not None:
+            self._indexes.add(container)
+        if self._registry is not None:
+            self._registry._entered(container, self)
+
+    def _untrack(self, container):
+        container._storages.remove(self)
+        self._count(container, -1)
+        if self._indexes is not None:
+            self._indexes.remove(container)
+        if self._registry is not None:
+            self._registry._left(container, self)
+
+    def _container_changed(self, container, mass_delta, was_hazardous):
+        with self._lock:
+            self.total_mass += mass_delta
+            self.loaded_mass += mass_delta
+            if was_hazardous != container.is_hazardous:
+                change = 1 if container.is_hazardous else -1
+                self.count_by_hazard["hazardous"] += change
+                self.count_by_hazard["safe"] -= change
+            if self._indexes is not None:
+                self._indexes.changed(container)
+
+    def get(self, serial_number, default=None):
+        serial = serial_key(serial_number)
+        with self._lock:
+            position = self._index.get(serial)
+            if position is None:
+                return default
+            return self._slots[position]
+
+    @contextmanager
+    def _holding(self, serial, *containers):
+        # Locks the container stored under ``serial`` (or None), ``containers``
+        # and this storage, retrying if the serial changed hands meanwhile.
+        while True:
+            container = self.get(serial)
+            with locked((container, *containers), (self,)):
+                if self.get(serial) is container:
+                    yield container
+                    return
+
+    def _compact(self):
+        self._slots = [container for container in self._slots if container is not None]
+        self._index = {
+            container.serial: position
+            for position, container in enumerate(self._slots)
+        }
+        self._holes = 0
+
+    def _add(self, container):
         if container is None:
             raise Exception("Container cannot be None")
-        self.containers.append(container)
-        print(
-            f"Container with the serial number {container.serial_number} has been added to storage"
+        if container.serial in self._index:
+            raise Exception(
+                f"Container with the serial number {container.serial_number} is already in storage"
+            )
+        self._index[container.serial] = len(self._slots)
+        self._slots.append(container)
+        self._track(container)
+
+    def _add_many(self, containers):
+        # Callers have already checked for None and duplicate serial numbers.
+        start = len(self._slots)
+        self._slots.extend(containers)
+        self._index.update(
+            (container.serial, position)
+            for position, container in enumerate(containers, start)
         )
+        indexes, self._indexes = self._indexes, None
+        for container in containers:
+            self._track(container)
+        if indexes is not None:
+            indexes.add_many(containers)
+            self._indexes = indexes
+
+    def _compact_if_sparse(self):
+        if (
+            self._holes > self.COMPACT_THRESHOLD
+            and self._holes * 2 > len(self._slots)
+        ):
+            self._compact()
+
+    def _discard(self, serial):
+        position = self._index.pop(serial)
+        container = self._slots[position]
+        self._slots[position] = None
+        self._holes += 1
+        self._untrack(container)
+        self._compact_if_sparse()
+        return container
+
+    # _place and _unplace only change membership: no checks, totals, indexes
+    # or events. They are meant to run inside _deferred.
+
+    def _place(self, container, position=None):
+        if position is None:
+            position = len(self._slots)
+            self._slots.append(container)
+        else:
+            self._slots[position] = container
+            self._holes -= 1
+        self._index[container.serial] = position
+        container._storages.append(self)
+        if self._registry is not None:
+            self._registry._entered(container, self)
+        return position
+
+    def _unplace(self, serial):
+        position = self._index.pop(serial)
+        container = self._slots[position]
+        self._slots[position] = None
+        self._holes += 1
+        container._storages.remove(self)
+        if self._registry is not None:
+            self._registry._left(container, self)
+        return position
+
+    def _holds(self, container):
+        position = self._index.get(container.serial)
+        return position is not None and self._slots[position] is container
+
+    @contextmanager
+    def _deferred(self, containers):
+        # Takes ``containers`` out of the totals and indexes, and puts back
+        # whichever of them are stored on exit, as they are by then: one
+        # refresh for a whole batch of changes to them.
+        members = [container for container in containers if self._holds(container)]
+        for container in members:
+            self._count(container, -1)
+        indexes, self._indexes = self._indexes, None
+        if indexes is not None:
+            indexes.remove_many(members)
+        try:
+            yield
+        finally:
+            members = [container for container in containers if self._holds(container)]
+            for container in members:
+                self._count(container, 1)
+            if indexes is not None:
+                indexes.add_many(members)
+                self._indexes = indexes
+            self._compact_if_sparse()
+
+    def add_container(self, container):
+        with locked((container,), (self,)):
+            self._add(container)
+            emit(ContainerAdded, container.serial)
 
     def empty_warehouse(self):
-        self.containers = []
-        print("Storage has been emptied.")
+        with locked(storages=(self,), every_container=True):
+            for container in self._slots:
+                if container is not None:
+                    container._storages.remove(self)
+                    if self._registry is not None:
+                        self._registry._left(container, self)
+            self._slots = []
+            self._index = {}
+            self._holes = 0
+            self._indexes = None
+            self._reset_aggregates()
+            emit(StorageEmptied)
 
     def replace_container(self, serial_number, new_container):
+        """Put ``new_container`` in place of ``serial_number``; return whether it was there."""
         if serial_number is None or new_container is None:
             raise Exception("Serial number or new container is None")
-        for container in self.containers:
-            if container.serial_number == serial_number:
-                self.containers[self.containers.index(container)] = new_container
-                print(
-                    "Container with the following serial number: "
-                    + serial_number
-                    + " has been replaced with a new container."
-                )
+        serial = serial_key(serial_number)
+        with self._holding(serial, new_container) as old_container:
+            if old_container is None:
+                return False
+            position = self._index[serial]
+            if new_container.serial != serial:
+                if new_container.serial in self._index:
+                    raise Exception(
+                        f"Container with the serial number {new_container.serial_number} is already in storage"
+                    )
+                del self._index[serial]
+                self._index[new_container.serial] = position
+            self._untrack(old_container)
+            self._slots[position] = new_container
+            self._track(new_container)
+            emit(ContainerReplaced, serial, new_container.serial)
+            return True
 
     def remove_container(self, container):
-        self.containers.remove(container)
-        print(
-            f"Container with the following serial number: {container.serial_number} has been removed from the storage."
-        )
+        with locked((container,), (self,)):
+            if self.get(container.serial) != container:
+                raise ValueError(
+                    f"Container with the following serial number: {container.serial_number} is not in the storage."
+                )
+            self._discard(container.serial)
+            emit(ContainerRemoved, container.serial)
 
     def remove_container_by_serial_number(self, serial_number):
-        for container in self.containers:
-            if container.serial_number == serial_number:
-                self.containers.remove(container)
-                print(
-                    f"Container with the following serial number: {container.serial_number} has been removed from the storage."
-                )
+        serial = serial_key(serial_number)
+        with self._holding(serial) as container:
+            if container is None:
+                return
+            self._discard(serial)
+            emit(ContainerRemoved, serial)
 
 
 class HazardNotifier:
     def warn_hazard(self, container, exception):
-        if issubclass(exception, OverfillException):
-            print(
-                f"Warning! Container with the following serial number: {container.serial_number} has suffered a hazard: {exception.__name__}"
-            )
-
-
-class SerialNumber:
-    def __init__(self, serial_number: str):
-        pattern = r"KON-\w*-\d*"
-        if re.match(pattern, serial_number):
-            self.serial_number = serial_number
+        # With a hazard pipeline installed the report is only queued; the
+        # pipeline's worker deduplicates and delivers it.
+        pipeline = get_hazard_pipeline()
+        if pipeline is not None:
+            pipeline.report(container.serial, exception)
         else:
-            raise Exception("Invalid serial number. Received: " + serial_number)
+            emit(HazardRaised, container.serial, exception)
 
 
 class Cargo:
+    __slots__ = ("safe", "load_mass")
+
     def __init__(self, safe: bool, load_mass):
         self.safe = safe
         self.load_mass = load_mass
 
+    def __reduce__(self):
+        # Pickles as its two fields, which is much faster for large batches.
+        return type(self), (self.safe, self.load_mass)
+
+    def __repr__(self):
+        return f"Cargo(safe={self.safe}, load_mass={self.load_mass})"
+
+
+class CargoLedger:
+    """Compact cargo of one container: running sums plus an append-only item log.
+
+    ``safe_mass``, ``hazardous_mass``, ``safe_items`` and ``hazardous_items``
+    cover everything loaded since the container was last emptied. The items
+    themselves are kept as an array of masses and one of safety flags, and
+    read back as ``Cargo``; ``len``, indexing and iteration only cover the
+    items still kept. ``truncate`` drops the oldest items, ``spill`` appends
+    them to a ``safe,load_mass`` CSV file first. With ``max_items`` the ledger
+    does one or the other by itself whenever it outgrows that, keeping the
+    newest half. Manifests and snapshots save only the items still kept,
+    next to the container's full loaded mass.
+    """
+
+    __slots__ = (
+        "safe_mass",
+        "hazardous_mass",
+        "safe_items",
+        "hazardous_items",
+        "max_items",
+        "spill_path",
+        "_masses",
+        "_safe",
+    )
+
+    def __init__(self, items=(), max_items=None, spill_path=None):
+        self.safe_mass = 0
+        self.hazardous_mass = 0
+        self.safe_items = 0
+        self.hazardous_items = 0
+        self.max_items = max_items
+        self.spill_path = spill_path
+        self._masses = array("d")
+        self._safe = bytearray()
+        self.extend(items)
+
+    @property
+    def item_count(self):
+        return self.safe_items + self.hazardous_items
+
+    @property
+    def dropped(self):
+        """How many items were spilled or truncated away."""
+        return self.item_count - len(self._masses)
+
+    def append(self, cargo):
+        load_mass = cargo.load_mass
+        if cargo.safe:
+            self.safe_mass += load_mass
+            self.safe_items += 1
+            self._safe.append(1)
+        else:
+            self.hazardous_mass += load_mass
+            self.hazardous_items += 1
+            self._safe.append(0)
+        masses = self._masses
+        masses.append(load_mass)
+        if self.max_items is not None and len(masses) > self.max_items:
+            self._make_room()
+
+    def extend(self, items):
+        for cargo in items:
+            self.append(cargo)
+
+    def _make_room(self):
+        keep = self.max_items // 2
+        if self.spill_path is not None:
+            self.spill(keep)
+        else:
+            self.truncate(keep)
+
+    def truncate(self, keep=0):
+        """Drop all but the newest ``keep`` items; the sums are kept."""
+        drop = max(len(self._masses) - keep, 0)
+        del self._masses[:drop]
+        del self._safe[:drop]
+
+    def spill(self, keep=0, path=None):
+        """Append all but the newest ``keep`` items to ``path`` (or ``spill_path``), then drop them."""
+        path = self.spill_path if path is None else path
+        drop = max(len(self._masses) - keep, 0)
+        with open(path, "a", encoding="utf-8") as file:
+            file.writelines(
+                f"{self._safe[i]},{self._masses[i]!r}\n" for i in range(drop)
+            )
+        self.truncate(keep)
+
+    def emptied(self):
+        """Return an empty ledger with the same settings."""
+        return CargoLedger(max_items=self.max_items, spill_path=self.spill_path)
+
+    def copy(self):
+        ledger = self.emptied()
+        ledger.safe_mass = self.safe_mass
+        ledger.hazardous_mass = self.hazardous_mass
+        ledger.safe_items = self.safe_items
+        ledger.hazardous_items = self.hazardous_items
+        ledger._masses = array("d", self._masses)
+        ledger._safe = bytearray(self._safe)
+        return ledger
+
+    def __len__(self):
+        return len(self._masses)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [
+                Cargo(bool(self._safe[i]), self._masses[i])
+                for i in range(*index.indices(len(self._masses)))
+            ]
+        return Cargo(bool(self._safe[index]), self._masses[index])
+
+    def __iter__(self):
+        for safe, load_mass in zip(self._safe, self._masses):
+            yield Cargo(bool(safe), load_mass)
+
+    def __repr__(self):
+        return (
+            f"CargoLedger(items={self.item_count}, kept={len(self._masses)}, "
+            f"safe_mass={self.safe_mass}, hazardous_mass={self.hazardous_mass})"
+        )
+
+
+def _empty_like(cargo):
+    # Empty cargo of the same kind: a new list, or a ledger with the same settings.
+    return [] if type(cargo) is list else cargo.emptied()
+
 
 class Container:
-    def __init__(self, capacity, height, dry_mass, depth):
+    __slots__ = (
+        "capacity",
+        "loaded_mass",
+        "height",
+        "dry_mass",
+        "depth",
+        "serial",
+        "cargo",
+        "_hazardous_items",
+        "_storages",
+        "version",
+    )
+
+    # Discriminates the container types without isinstance/hasattr probing.
+    kind = "general"
+    # Share of the loaded mass left behind by empty_container.
+    residue_ratio = 0
+    # Containers never carry per-instance notifier state, so they share one.
+    hazard_notifier = HazardNotifier()
+
+    def __init__(self, capacity, height, dry_mass, depth, serial_number=None):
         if capacity <= 0 or height <= 0 or dry_mass <= 0 or depth <= 0:
             raise Exception(
                 "Invalid capacity, height, dry mass or depth cannot be lower than 0"
@@ -90,106 +550,150 @@ class Container:
         self.height = height
         self.dry_mass = dry_mass
         self.depth = depth
-        self.serial_number = generate_serial_number()
+        self.serial = (
+            allocate_serial(self.kind)
+            if serial_number is None
+            else intern_serial(serial_number)
+        )
         self.cargo = []
-        self.hazard_notifier = HazardNotifier()
+        self._hazardous_items = 0
+        self._storages = []
+        # Bumped whenever the cargo changes, so rendered views know when to redraw.
+        self.version = 0
+
+    @property
+    def serial_number(self):
+        return format_serial(self.serial)
+
+    @property
+    def is_hazardous(self):
+        return self._hazardous_items > 0
+
+    def _load_limit(self, cargo):
+        return self.capacity
+
+    def _notify_storages(self, mass_delta, was_hazardous):
+        for storage in self._storages:
+            storage._container_changed(self, mass_delta, was_hazardous)
 
     def load_container(self, cargo):
         if cargo is None:
             raise Exception("Cargo is None")
-        if self.loaded_mass + cargo.load_mass > self.capacity:
-            self.hazard_notifier.warn_hazard(self, OverfillException)
-        else:
-            self.cargo.append(cargo)
-            self.loaded_mass += cargo.load_mass
-            print(
-                f"Container {self.serial_number} has been loaded with {cargo.load_mass}kg of cargo."
-            )
+        # The limit check and the load happen under one lock, so concurrent
+        # loads can never take the container past its limit together.
+        with container_lock(self):
+            if self.loaded_mass + cargo.load_mass > self._load_limit(cargo):
+                self.hazard_notifier.warn_hazard(self, OverfillException)
+            else:
+                was_hazardous = self._hazardous_items > 0
+                self.cargo.append(cargo)
+                self.loaded_mass += cargo.load_mass
+                if not cargo.safe:
+                    self._hazardous_items += 1
+                self.version += 1
+                self._notify_storages(cargo.load_mass, was_hazardous)
+                emit(ContainerLoaded, self.serial, cargo.load_mass)
 
     def empty_container(self):
-        self.cargo = []
-        self.loaded_mass = 0
-        print(
-            f"Container with the following serial number: {self.serial_number} has been emptied."
-        )
-
-    def print_info(self):
-        container_info = [
-            ["Serial Number", self.serial_number],
-            ["Type", "Container"],
-            ["Capacity", f"{self.capacity} kg"],
-            [
-                "Loaded Mass",
-                f"{self.loaded_mass} kg ({self.loaded_mass/self.capacity*100}%)",
-            ],
-            ["Height", f"{self.height} cm"],
-            ["Depth", f"{self.depth} cm"],
-            ["Dry Mass", f"{self.dry_mass} kg"],
-            ["Total Mass", f"{self.dry_mass + self.loaded_mass} kg"],
-        ]
-
-        if hasattr(self, "temperature") and hasattr(self, "type_of_cargo"):
-            container_info.extend(
-                [
-                    ["Cargo Type", self.type_of_cargo],
-                    ["Temperature", f"{self.temperature}°C"],
-                ]
-            )
-
-        print(tabulate(container_info, headers=["Property", "Value"], tablefmt="grid"))
+        with container_lock(self):
+            was_hazardous = self._hazardous_items > 0
+            remaining = self.loaded_mass * self.residue_ratio if self.residue_ratio else 0
+            mass_delta = remaining - self.loaded_mass
+            # A ledger is replaced in O(1), however many items it held.
+            self.cargo = _empty_like(self.cargo)
+            self.loaded_mass = remaining
+            self._hazardous_items = 0
+            self.version += 1
+            self._notify_storages(mass_delta, was_hazardous)
+            emit(ContainerEmptied, self.serial, self.residue_ratio)
+
+    def _load_many(self, cargo_items):
+        # Loads cargo a load plan has already checked against the rules above,
+        # with a single storage notification for the whole batch.
+        mass = 0
+        hazardous_items = 0
+        for cargo in cargo_items:
+            mass += cargo.load_mass
+            if not cargo.safe:
+                hazardous_items += 1
+        with container_lock(self):
+            was_hazardous = self._hazardous_items > 0
+            self.cargo.extend(cargo_items)
+            self.loaded_mass += mass
+            self._hazardous_items += hazardous_items
+            self.version += 1
+            self._notify_storages(mass, was_hazardous)
+            for cargo in cargo_items:
+                emit(ContainerLoaded, self.serial, cargo.load_mass)
+
+    def _restore(self, cargo, loaded_mass, hazardous_items=None):
+        # Brings back a saved state as-is, without re-running the load rules.
+        if type(cargo) is CargoLedger:
+            hazardous_items = cargo.hazardous_items
+        else:
+            cargo = list(cargo)
+            if hazardous_items is None:
+                hazardous_items = sum(not item.safe for item in cargo)
+        with container_lock(self):
+            was_hazardous = self._hazardous_items > 0
+            mass_delta = loaded_mass - self.loaded_mass
+            self.cargo = cargo
+            self.loaded_mass = loaded_mass
+            self._hazardous_items = hazardous_items
+            self.version += 1
+            self._notify_storages(mass_delta, was_hazardous)
+
+    def use_cargo_ledger(self, max_items=None, spill_path=None):
+        """Keep the cargo in a ``CargoLedger`` from now on and return it."""
+        with container_lock(self):
+            if type(self.cargo) is not CargoLedger:
+                self.cargo = CargoLedger(self.cargo, max_items, spill_path)
+            return self.cargo
+
+    def print_info(self, page_size=PAGE_SIZE, max_pages=None):
+        print(render_cached(self, container_table))
 
         if self.cargo:
-            cargo_table = []
-            for i, item in enumerate(self.cargo, 1):
-                cargo_table.append(
-                    [i, item.load_mass, "Safe" if item.safe else "Hazardous"]
-                )
             print("\nCargo Contents:")
-            print(
-                tabulate(
-                    cargo_table,
-                    headers=["Item #", "Mass (kg)", "Safety Status"],
-                    tablefmt="grid",
-                )
+            print_pages(
+                cargo_pages(self, page_size), max_pages, len(self.cargo), page_size
             )
 
 
 class ContainerForLiquids(Container):
-    def __init__(self, capacity, height, dry_mass, depth):
-        super().__init__(capacity, height, dry_mass, depth)
+    __slots__ = ()
 
-    def load_container(self, cargo):
-        max_capacity = self.capacity * 0.9 if cargo.safe else self.capacity * 0.5
+    kind = "liquid"
 
-        if self.loaded_mass + cargo.load_mass > max_capacity:
-            self.hazard_notifier.warn_hazard(self, OverfillException)
-        else:
-            self.cargo.append(cargo)
-            self.loaded_mass += cargo.load_mass
-            print(
-                f"Container {self.serial_number} has been loaded with {cargo.load_mass}kg of cargo."
-            )
+    def __init__(self, capacity, height, dry_mass, depth, serial_number=None):
+        super().__init__(capacity, height, dry_mass, depth, serial_number)
+
+    def _load_limit(self, cargo):
+        return self.capacity * 0.9 if cargo.safe else self.capacity * 0.5
 
 
 class GasContainer(Container):
-    def __init__(self, capacity, height, dry_mass, depth):
+    __slots__ = ()
+
+    kind = "gas"
+    # Gas containers cannot be fully emptied; 5% of the load stays behind.
+    residue_ratio = 0.05
+
+    def __init__(self, capacity, height, dry_mass, depth, serial_number=None):
         if capacity <= 0 or height <= 0 or dry_mass <= 0 or depth <= 0:
             raise Exception(
                 "Invalid capacity, height, dry mass or depth cannot be lower than 0"
             )
         if capacity is None or height is None or dry_mass is None or depth is None:
             raise Exception("Capacity, height, dry mass or depth cannot be None")
-        super().__init__(capacity, height, dry_mass, depth)
-
-    def empty_container(self):
-        self.loaded_mass = self.loaded_mass * 0.05
-        self.cargo = []
-        print(
-            f"Container {self.serial_number} has been emptied with 5% of the load mass remaining due to the cargo being a gas"
-        )
+        super().__init__(capacity, height, dry_mass, depth, serial_number)
 
 
 class ChilledContainer(Container):
+    __slots__ = ("type_of_cargo", "temperature")
+
+    kind = "chilled"
+
     def __init__(
         self,
         capacity,
@@ -198,6 +702,7 @@ class ChilledContainer(Container):
         depth,
         type_of_cargo,
         temperature,
+        serial_number=None,
     ):
         if capacity <= 0 or height <= 0 or dry_mass <= 0 or depth <= 0:
             raise Exception(
@@ -205,11 +710,19 @@ class ChilledContainer(Container):
             )
         if capacity is None or height is None or dry_mass is None or depth is None:
             raise Exception("Capacity, height, dry mass or depth cannot be None")
-        super().__init__(capacity, height, dry_mass, depth)
+        super().__init__(capacity, height, dry_mass, depth, serial_number)
         self.type_of_cargo = type_of_cargo
         self.temperature = temperature
 
     def load_container(self, cargo, type_of_cargo, required_temperature):
+        try:
+            self._check_requirements(cargo, type_of_cargo, required_temperature)
+        except TemperatureException:
+            self.hazard_notifier.warn_hazard(self, TemperatureException)
+            raise
+        super().load_container(cargo)
+
+    def _check_requirements(self, cargo, type_of_cargo, required_temperature):
         if cargo is None:
             raise Exception("Cargo cannot be None")
         if type_of_cargo is None:
@@ -217,7 +730,7 @@ class ChilledContainer(Container):
         if required_temperature is None:
             raise Exception("Required temperature cannot be None")
         if self.temperature < required_temperature:
-            raise Exception(
+            raise TemperatureException(
                 f"Unable to load cargo with a required temperature higher than the container's temperature. Received: {required_temperature}, expected: {self.temperature} or lower"
             )
 
@@ -226,7 +739,33 @@ class ChilledContainer(Container):
                 f"Unable to load cargo with a different type of cargo. Received: {type_of_cargo}, expected: {self.type_of_cargo}"
             )
 
-        super().load_container(cargo)
+
+CONTAINER_TYPES = {
+    container_type.kind: container_type
+    for container_type in (Container, ContainerForLiquids, GasContainer, ChilledContainer)
+}
+
+
+class LoadReport:
+    """Outcome of loading a batch of containers onto a ship, or cargo into containers.
+
+    ``accepted`` lists what was loaded, ``rejected`` pairs everything else
+    with the reason it was turned away.
+    """
+
+    __slots__ = ("accepted", "rejected", "total_mass")
+
+    def __init__(self, accepted, rejected, total_mass):
+        self.accepted = accepted
+        self.rejected = rejected
+        self.total_mass = total_mass
+
+    @property
+    def ok(self):
+        return not self.rejected
+
+    def __repr__(self):
+        return f"LoadReport(accepted={len(self.accepted)}, rejected={len(self.rejected)}, total_mass={self.total_mass})"
 
 
 class Ship:
@@ -241,18 +780,79 @@ class Ship:
         self.max_speed = max_speed
         self.capacity = capacity  # in number of containers
         self.max_tonnage = max_tonnage
-        self.current_tonnage = 0
+
+    @property
+    def current_tonnage(self):
+        return self.storage.total_mass
+
+    def _check_room(self, container):
+        if self.storage.container_count >= self.capacity:
+            raise Exception(
+                f"Ship is full: it can carry at most {self.capacity} containers"
+            )
+        mass = container.dry_mass + container.loaded_mass
+        if self.current_tonnage + mass > self.max_tonnage:
+            raise Exception(
+                f"Container of {mass} kg exceeds the remaining tonnage of {self.max_tonnage - self.current_tonnage} kg"
+            )
 
     def load_container(self, container):
         if container is None:
             raise Exception("Container cannot be None")
-        self.storage.containers.append(container)
+        with locked((container,), (self.storage,)):
+            self._check_room(container)
+            self.storage._add(container)
 
     def load_container_group(self, container_group: list[Container]):
         if container_group is None:
             raise Exception("Container group cannot be None")
-        for container in container_group:
-            self.load_container(container)
+        return self.load_container_batch(container_group)
+
+    def load_container_batch(self, containers) -> LoadReport:
+        """Load all ``containers`` at once, or none of them.
+
+        The batch is checked in a single pass: every container must be
+        present and not already on board, and the batch as a whole must fit
+        within the ship's ``capacity`` and ``max_tonnage``.
+        """
+        if containers is None:
+            raise Exception("Container group cannot be None")
+        containers = list(containers)
+        with locked(containers, (self.storage,)):
+            return self._load_batch(containers)
+
+    def _load_batch(self, containers):
+        index = self.storage._index
+        accepted = []
+        rejected = []
+        seen = set()
+        total_mass = 0
+        for container in containers:
+            if container is None:
+                rejected.append((None, "Container cannot be None"))
+                continue
+            serial = container.serial
+            if serial in index or serial in seen:
+                rejected.append((container, "Container is already on board"))
+                continue
+            seen.add(serial)
+            accepted.append(container)
+            total_mass += container.dry_mass + container.loaded_mass
+
+        current_tonnage = self.current_tonnage
+        reason = None
+        if rejected:
+            reason = "Batch rejected: it contains invalid containers"
+        elif len(index) + len(accepted) > self.capacity:
+            reason = f"Batch rejected: {len(accepted)} containers exceed the remaining capacity of {self.capacity - len(index)}"
+        elif current_tonnage + total_mass > self.max_tonnage:
+            reason = f"Batch rejected: {total_mass} kg exceeds the remaining tonnage of {self.max_tonnage - current_tonnage} kg"
+
+        if reason is not None:
+            rejected.extend((container, reason) for container in accepted)
+            return LoadReport([], rejected, 0)
+        self.storage._add_many(accepted)
+        return LoadReport(accepted, rejected, total_mass)
 
     def unload_container(self, container):
         if container is None:
@@ -267,17 +867,27 @@ class Ship:
     def replace_container(self, serial_number, new_container):
         if serial_number is None or new_container is None:
             raise Exception("Serial number or new container cannot be None")
-        self.storage.replace_container(serial_number, new_container)
+        return self.storage.replace_container(serial_number, new_container)
 
     def transport_container(self, container, destination_ship):
         if container is None:
             raise Exception("Container cannot be None")
         if destination_ship is None:
             raise Exception("Destination ship cannot be None")
-        self.unload_container(container)
-        destination_ship.load_container(container)
+        # Both storages stay locked from the checks to the move, so the
+        # container is always on exactly one of the two ships.
+        with locked((container,), (self.storage, destination_ship.storage)):
+            if self.storage.get(container.serial) != container:
+                raise ValueError(
+                    f"Container with the following serial number: {container.serial_number} is not in the storage."
+                )
+            # Check first, so a container that does not fit stays on this ship.
+            destination_ship._check_room(container)
+            self.storage._discard(container.serial)
+            destination_ship.storage._add(container)
+            emit(ContainerRemoved, container.serial)
 
-    def print_info(self):
+    def print_info(self, page_size=PAGE_SIZE, max_pages=None):
         print("Ship Data:")
         data = [
             ["Max Speed", f"{self.max_speed} knots"],
@@ -288,66 +898,7 @@ class Ship:
 
         print(tabulate(data, tablefmt="grid"))
 
-        cargo_manifest = []
-        for container in self.storage.containers:
-            cargo_manifest.append(
-                [
-                    container.serial_number,
-                    container.capacity,
-                    container.loaded_mass,
-                    container.cargo,
-                ]
-            )
-        print(
-            tabulate(
-                cargo_manifest,
-                headers=["Serial Number", "Capacity", "Loaded Mass", "Cargo"],
-                tablefmt="grid",
-            )
+        containers = self.storage.containers
+        print_pages(
+            manifest_pages(containers, page_size), max_pages, len(containers), page_size
         )
-
-
-def main():
-    # Create a storage and add containers to it
-    storage = Storage()
-    storage.add_container(ContainerForLiquids(1000, 100, 100, 100))
-    storage.add_container(GasContainer(1000, 100, 100, 100))
-    storage.add_container(ChilledContainer(1000, 100, 100, 100, 10, -12))
-    # Load containers with cargo
-    storage.containers[0].load_container(Cargo(True, 950))
-    storage.containers[1].load_container(Cargo(True, 950))
-    storage.containers[1].empty_container()
-
-    # Create a ship
-    maersk = Ship(100, 1000, 10000)
-    # Load one container
-    maersk.load_container(storage.containers[0])
-    # Load a group of containers
-    maersk.load_container_group(storage.containers)
-
-    # Unload one containre from the ship
-    maersk.unload_container(maersk.storage.containers[0])
-
-    # Empty one container
-    maersk.storage.containers[0].empty_container()
-
-    # Replace one container
-    maersk.replace_container(
-        maersk.storage.containers[0].serial_number, storage.containers[1]
-    )
-
-    # Transport one container to another ship
-    maersk.transport_container(maersk.storage.containers[0], maersk)
-
-    # Print info about one container
-    maersk.storage.containers[0].print_info()
-
-    container2 = ContainerForLiquids(1000, 100, 100, 100)
-    container2.load_container(Cargo(True, 300))
-    maersk.load_container(container2)
-
-    maersk.print_info()
-    print(maersk.storage.containers[3].cargo[0].__dict__)
-
-
-main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m solution")
+    parser.add_argument(
+        "command",
+        choices=["demo", "console", "serve"],
+        help="demo: run the sample storage/ship scenario, console: start the console app, serve: start the JSON-over-TCP service",
+    )
+    parser.add_argument(
+        "--snapshot",
+        help="console, serve: restore the yard and ships from this snapshot file and save them back on exit",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="serve: address to listen on")
+    parser.add_argument(
+        "--port", type=int, default=8765, help="serve: port to listen on, 0 for any free port"
+    )
+    parser.add_argument(
+        "--quiet", action="store_true", help="serve: do not print container events"
+    )
+    args = parser.parse_args(argv)
+
+    match args.command:
+        case "demo":
+            from solution.demo import main as demo
+
+            demo()
+        case "console":
+            from solution.console_app import console_app
+
+            if args.snapshot is None:
+                console_app()
+                return
+
+            from solution import Storage
+            from solution.snapshot import restore, write_snapshot
+
+            if os.path.exists(args.snapshot):
+                storage, *ships = restore(args.snapshot)
+            else:
+                storage, ships = Storage(), []
+            terminal = console_app(storage, ships)
+            write_snapshot(args.snapshot, [*terminal.yards, *terminal.ships])
+        case "serve":
+            import asyncio
+            import contextlib
+
+            from solution import Storage
+            from solution.events import NullSink, use_sink
+            from solution.service import ContainerService, serve
+
+            storage, ships = Storage(), []
+            if args.snapshot is not None and os.path.exists(args.snapshot):
+                from solution.snapshot import restore
+
+                storage, *ships = restore(args.snapshot)
+            # Ships added over the wire only end up in the service's list.
+            service = ContainerService(storage, ships)
+            sink = use_sink(NullSink()) if args.quiet else contextlib.nullcontext()
+            with sink, contextlib.suppress(KeyboardInterrupt):
+                asyncio.run(serve(host=args.host, port=args.port, service=service))
+            if args.snapshot is not None:
+                from solution.snapshot import write_snapshot
+
+                write_snapshot(args.snapshot, [service.storage, *service.ships])
+
+
+if __name__ == "__main__":
+    main()
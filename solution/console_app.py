@@ -1,4 +1,63 @@
 from solution import *
+from solution.rendering import PAGE_SIZE, get_page, page_count, render_cached
+from solution.terminal import Terminal
+
+
+def _storage_entry(container):
+    return (
+        f"Numer seryjny: {container.serial_number}\n"
+        f"   Pojemność: {container.capacity} kg\n"
+        f"   Waga: {container.loaded_mass} kg"
+    )
+
+
+def _typed_storage_entry(container):
+    return f"{_storage_entry(container)}\n   Typ: {container.__class__.__name__}"
+
+
+def _overview_entry(container):
+    return (
+        f"- Numer seryjny: {container.serial_number}\n"
+        f"  Pojemność: {container.capacity} kg\n"
+        f"  Waga: {container.loaded_mass} kg"
+    )
+
+
+def _ship_entry(container):
+    return (
+        f"   - Numer seryjny: {container.serial_number}\n"
+        f"     Pojemność: {container.capacity} kg\n"
+        f"     Waga: {container.loaded_mass} kg"
+    )
+
+
+def console_print_page(containers, render, page=0, numbered=False):
+    """Print one page of ``containers`` and return the page actually shown."""
+    pages = page_count(len(containers))
+    page = min(max(page, 0), pages - 1)
+    start = page * PAGE_SIZE
+    for index, container in enumerate(get_page(containers, page), start):
+        entry = render_cached(container, render)
+        print(f"{index}. {entry}" if numbered else entry)
+    if pages > 1:
+        print(f"Strona {page + 1}/{pages} ({len(containers)} kontenerów)")
+    return page
+
+
+def console_select(containers, render, prompt):
+    """Page through ``containers`` until the user answers something else than n/p."""
+    page = 0
+    while True:
+        page = console_print_page(containers, render, page, numbered=True)
+        if len(containers) > PAGE_SIZE:
+            print("n - następna strona, p - poprzednia strona")
+        answer = input(prompt)
+        if answer == "n":
+            page += 1
+        elif answer == "p":
+            page -= 1
+        else:
+            return answer
 
 
 def console_add_container(storage):
@@ -35,16 +94,20 @@ def console_add_container(storage):
         print("Wprowadzono nieprawidłowe dane. Spróbuj ponownie.")
 
 
-def console_refresh_view(storage):
+def _refresh_entry(container):
+    return (
+        f"Numer seryjny: {container.serial_number}\n"
+        f"Pojemność: {container.capacity} kg\n"
+        f"Waga: {container.loaded_mass} kg\n" + "-" * 30
+    )
+
+
+def console_refresh_view(storage, page=0):
     print("\nLista kontenerów:")
     if not storage.containers:
         print("Brak kontenerów w magazynie.")
     else:
-        for container in storage.containers:
-            print(f"Numer seryjny: {container.serial_number}")
-            print(f"Pojemność: {container.capacity} kg")
-            print(f"Waga: {container.loaded_mass} kg")
-            print("-" * 30)
+        console_print_page(storage.containers, _refresh_entry, page)
     print("=" * 50 + "\n")
 
 
@@ -54,13 +117,12 @@ def console_remove_container(storage):
         return
 
     print("Dostępne kontenery:")
-    for index, container in enumerate(storage.containers):
-        print(f"{index}. Numer seryjny: {container.serial_number}")
-        print(f"   Pojemność: {container.capacity} kg")
-        print(f"   Waga: {container.loaded_mass} kg")
+    answer = console_select(
+        storage.containers, _storage_entry, "Wybierz numer kontenera do usunięcia: "
+    )
 
     try:
-        selected = int(input("Wybierz numer kontenera do usunięcia: "))
+        selected = int(answer)
         if 0 <= selected < len(storage.containers):
             print(f"Wybrano numer: {selected} ")
             serial_number = storage.containers[selected].serial_number
@@ -78,14 +140,14 @@ def console_modify_container(storage):
         return
 
     print("Dostępne kontenery:")
-    for index, container in enumerate(storage.containers):
-        print(f"{index}. Numer seryjny: {container.serial_number}")
-        print(f"   Pojemność: {container.capacity} kg")
-        print(f"   Waga: {container.loaded_mass} kg")
-        print(f"   Typ: {container.__class__.__name__}")
+    answer = console_select(
+        storage.containers,
+        _typed_storage_entry,
+        "Wybierz numer kontenera do modyfikacji: ",
+    )
 
     try:
-        selected = int(input("Wybierz numer kontenera do modyfikacji: "))
+        selected = int(answer)
         if 0 <= selected < len(storage.containers):
             container = storage.containers[selected]
             print(f"Modyfikujesz kontener: {container.serial_number}")
@@ -129,22 +191,68 @@ def console_ship_overview(ships):
         print(f"{index}. Maksymalna prędkość: {ship.max_speed} węzłów")
         print(f"   Maksymalna waga: {ship.max_tonnage} kg")
         print(f"   Aktualna waga: {ship.current_tonnage} kg")
-        print(f"   Aktualna prędkość: {ship.current_speed} węzłów")
+        print(
+            f"   Liczba kontenerów: {ship.storage.container_count}/{ship.capacity}"
+        )
 
         print("   Kontenery na statku:")
-        if not ship.containers:
+        if not ship.storage.container_count:
             print("   Brak kontenerów na statku.")
         else:
-            for container in ship.containers:
-                print(f"   - Numer seryjny: {container.serial_number}")
-                print(f"     Pojemność: {container.capacity} kg")
-                print(f"     Waga: {container.loaded_mass} kg")
+            console_print_page(ship.storage.containers, _ship_entry)
+
+
+def console_add_ship(terminal):
+    try:
+        max_speed = float(input("Podaj maksymalną prędkość statku: "))
+        capacity = int(input("Podaj maksymalną liczbę kontenerów: "))
+        max_tonnage = float(input("Podaj maksymalną wagę statku: "))
+        terminal.add_ship(Ship(max_speed, capacity, max_tonnage))
+        print(f"Dodano statek numer {len(terminal.ships) - 1}.")
+    except ValueError:
+        print("Wprowadzono nieprawidłowe dane. Spróbuj ponownie.")
+    except Exception as e:
+        print(f"Błąd: {e}")
+
+
+def _location_name(terminal, location):
+    if isinstance(location, Ship):
+        return f"statek {terminal.ships.index(location)}"
+    return "magazyn"
+
+
+def console_move_container(terminal):
+    serial_number = input("Podaj numer seryjny kontenera: ")
+    location = terminal.locate(serial_number)
+    if location is None:
+        print("Nie znaleziono kontenera o podanym numerze seryjnym.")
+        return
+    print(f"Kontener znajduje się: {_location_name(terminal, location)}")
+
+    answer = input("Podaj numer statku docelowego lub m, aby przenieść do magazynu: ")
+    if answer == "m":
+        destination = terminal.yards[0]
+    else:
+        try:
+            destination = terminal.ships[int(answer)]
+        except (ValueError, IndexError):
+            print("Nieprawidłowy numer statku.")
+            return
+
+    report = terminal.move([serial_number], destination)
+    if report.committed:
+        print(f"Przeniesiono kontener {serial_number}: {_location_name(terminal, destination)}")
+    else:
+        print(f"Błąd: {report.outcomes[0]}")
 
 
-def console_app():
-    storage = Storage()
-    ships = []  # Tu można dodać inicjalizację statków
+def console_app(storage=None, ships=None):
+    """Run the console; return the ``Terminal`` with the yard and every ship."""
+    if storage is None:
+        storage = Storage()
+    terminal = Terminal([storage], ships or ())
 
+    page = 0
     while True:
         print("\n=== SYSTEM ZARZĄDZANIA KONTENERAMI ===")
 
@@ -152,17 +260,18 @@ def console_app():
         if not storage.containers:
             print("Brak kontenerów w magazynie.")
         else:
-            for container in storage.containers:
-                print(f"- Numer seryjny: {container.serial_number}")
-                print(f"  Pojemność: {container.capacity} kg")
-                print(f"  Waga: {container.loaded_mass} kg")
+            page = console_print_page(storage.containers, _overview_entry, page)
 
         print("\nMożliwe akcje:")
         print("1. Dodaj kontener")
         print("2. Usuń kontener")
         print("3. Modyfikuj kontener")
         print("4. Przegląd statków")
-        print("5. Wyjście")
+        print("5. Dodaj statek")
+        print("6. Przenieś kontener")
+        print("7. Wyjście")
+        if len(storage.containers) > PAGE_SIZE:
+            print("n/p. Następna/poprzednia strona listy kontenerów")
 
         action = input("\nWybierz akcję: ")
         match action:
@@ -173,14 +282,23 @@ def console_app():
             case "3":
                 console_modify_container(storage)
             case "4":
-                console_ship_overview(ships)
+                console_ship_overview(terminal.ships)
             case "5":
+                console_add_ship(terminal)
+            case "6":
+                console_move_container(terminal)
+            case "7":
                 print("Dziękujemy za skorzystanie z systemu. Do widzenia!")
                 break
+            case "n":
+                page += 1
+            case "p":
+                page -= 1
             case "q":
                 break
             case _:
                 print("Nieprawidłowa akcja. Spróbuj ponownie.")
+    return terminal
 
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+from solution import (
+    Cargo,
+    ChilledContainer,
+    ContainerForLiquids,
+    GasContainer,
+    Ship,
+    Storage,
+)
+
+
+def main():
+    # Create a storage and add containers to it
+    storage = Storage()
+    storage.add_container(ContainerForLiquids(1000, 100, 100, 100))
+    storage.add_container(GasContainer(1000, 100, 100, 100))
+    storage.add_container(ChilledContainer(1000, 100, 100, 100, 10, -12))
+    # Load containers with cargo
+    storage.containers[0].load_container(Cargo(True, 950))
+    storage.containers[1].load_container(Cargo(True, 950))
+    storage.containers[1].empty_container()
+
+    # Create a ship
+    maersk = Ship(100, 1000, 10000)
+    # Load one container
+    maersk.load_container(storage.containers[0])
+    # Load a group of containers
+    maersk.load_container_group(storage.containers[1:])
+
+    # Unload one containre from the ship
+    maersk.unload_container(maersk.storage.containers[0])
+
+    # Empty one container
+    maersk.storage.containers[0].empty_container()
+
+    # Replace one container
+    maersk.replace_container(
+        maersk.storage.containers[0].serial_number, storage.containers[1]
+    )
+
+    # Transport one container to another ship
+    maersk.transport_container(maersk.storage.containers[0], maersk)
+
+    # Print info about one container
+    maersk.storage.containers[0].print_info()
+
+    container2 = ContainerForLiquids(1000, 100, 100, 100)
+    container2.load_container(Cargo(True, 300))
+    maersk.load_container(container2)
+
+    maersk.print_info()
+    print(maersk.storage.containers[-1].cargo[0])
+
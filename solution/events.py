@@ -0,0 +1,234 @@
+"""Structured events emitted by storages and containers.
+
+Operations report what happened by emitting an event to the active sink
+instead of printing. Events only keep the raw values, including the integer
+serial key; the message is built when a sink asks for it, so a disabled sink
+never formats a string.
+"""
+
+import threading
+import time
+from collections import deque
+
+from .serials import format_serial
+
+
+class Event:
+    __slots__ = ()
+
+    def format(self):
+        raise NotImplementedError
+
+    def __str__(self):
+        return self.format()
+
+
+class ContainerLoaded(Event):
+    __slots__ = ("serial", "load_mass")
+
+    def __init__(self, serial, load_mass):
+        self.serial = serial
+        self.load_mass = load_mass
+
+    def format(self):
+        return f"Container {format_serial(self.serial)} has been loaded with {self.load_mass}kg of cargo."
+
+
+class ContainerEmptied(Event):
+    __slots__ = ("serial", "residue")
+
+    def __init__(self, serial, residue=0):
+        self.serial = serial
+        self.residue = residue
+
+    def format(self):
+        if self.residue:
+            return f"Container {format_serial(self.serial)} has been emptied with {self.residue:.0%} of the load mass remaining due to the cargo being a gas"
+        return f"Container with the following serial number: {format_serial(self.serial)} has been emptied."
+
+
+class ContainerAdded(Event):
+    __slots__ = ("serial",)
+
+    def __init__(self, serial):
+        self.serial = serial
+
+    def format(self):
+        return f"Container with the serial number {format_serial(self.serial)} has been added to storage"
+
+
+class ContainerRemoved(Event):
+    __slots__ = ("serial",)
+
+    def __init__(self, serial):
+        self.serial = serial
+
+    def format(self):
+        return f"Container with the following serial number: {format_serial(self.serial)} has been removed from the storage."
+
+
+class ContainerReplaced(Event):
+    __slots__ = ("serial", "new_serial")
+
+    def __init__(self, serial, new_serial):
+        self.serial = serial
+        self.new_serial = new_serial
+
+    def format(self):
+        return f"Container with the following serial number: {format_serial(self.serial)} has been replaced with a new container."
+
+
+class StorageEmptied(Event):
+    __slots__ = ()
+
+    def format(self):
+        return "Storage has been emptied."
+
+
+class HazardRaised(Event):
+    __slots__ = ("serial", "hazard")
+
+    def __init__(self, serial, hazard):
+        self.serial = serial
+        self.hazard = hazard
+
+    def format(self):
+        return f"Warning! Container with the following serial number: {format_serial(self.serial)} has suffered a hazard: {self.hazard.__name__}"
+
+
+class NullSink:
+    """Discards every event; emitters skip building events altogether."""
+
+    enabled = False
+
+    def emit(self, event):
+        pass
+
+
+class StdoutSink:
+    """Prints every event as it happens, like the library always did."""
+
+    enabled = True
+
+    def emit(self, event):
+        print(event.format())
+
+
+class RingBufferSink:
+    """Keeps the most recent ``maxlen`` events in memory."""
+
+    enabled = True
+
+    def __init__(self, maxlen=10_000):
+        self.events = deque(maxlen=maxlen)
+
+    def emit(self, event):
+        self.events.append(event)
+
+    def messages(self):
+        return [event.format() for event in self.events]
+
+    def clear(self):
+        self.events.clear()
+
+
+class BatchedFileSink:
+    """Appends events to a file in batches.
+
+    Pending events are written once ``batch_size`` of them have accumulated
+    or ``flush_interval`` seconds have passed since the last write, whichever
+    comes first; a background thread writes them on time even when no more
+    events arrive. Call ``close`` (or use the sink as a context manager) to
+    stop it and write out whatever is still pending.
+    """
+
+    enabled = True
+
+    def __init__(self, path, batch_size=1000, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._run, name="batched-file-sink", daemon=True)
+        self._flusher.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                due = self._last_flush + self.flush_interval
+            if self._closed.wait(max(due - time.monotonic(), 0)):
+                return
+            with self._lock:
+                if time.monotonic() - self._last_flush >= self.flush_interval:
+                    self._flush()
+
+    def emit(self, event):
+        with self._lock:
+            self._pending.append(event)
+            if (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._file.write("".join(event.format() + "\n" for event in self._pending))
+            self._file.flush()
+            self._pending = []
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        self._closed.set()
+        self._flusher.join()
+        with self._lock:
+            if not self._file.closed:
+                self._flush()
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_sink = StdoutSink()
+
+
+def get_sink():
+    return _sink
+
+
+def set_sink(sink):
+    """Install ``sink`` for all subsequent events and return the previous one."""
+    global _sink
+    previous, _sink = _sink, sink
+    return previous
+
+
+class use_sink:
+    """Temporarily install a sink: ``with use_sink(RingBufferSink()) as sink: ...``."""
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def __enter__(self):
+        self._previous = set_sink(self.sink)
+        return self.sink
+
+    def __exit__(self, *exc_info):
+        set_sink(self._previous)
+
+
+def emit(event_type, *args):
+    if _sink.enabled:
+        _sink.emit(event_type(*args))
@@ -0,0 +1,195 @@
+"""Shared, background delivery of container hazards.
+
+By default ``HazardNotifier.warn_hazard`` emits a ``HazardRaised`` event
+right away, on the thread that hit the hazard. Installing a
+``HazardPipeline`` with ``set_hazard_pipeline`` (or ``use_hazard_pipeline``)
+routes every hazard to it instead. Reporting a hazard then only puts it on
+a queue; a background worker folds every report of the same hazard on the
+same container within ``window`` seconds into one ``HazardSummary``. Once
+its window has passed, a summary is handed to every subscriber, together
+with the others due at the same time: ``subscriber(summaries)``.
+
+``forward_to_sink`` is a subscriber that emits the summaries to the active
+event sink.
+"""
+
+import queue
+import threading
+import time
+
+from .events import Event, get_sink
+from .serials import format_serial
+
+
+class HazardSummary(Event):
+    """``count`` reports of ``hazard`` on one container, from ``first_seen`` to ``last_seen``."""
+
+    __slots__ = ("serial", "hazard", "count", "first_seen", "last_seen")
+
+    def __init__(self, serial, hazard, seen):
+        self.serial = serial
+        self.hazard = hazard
+        self.count = 1
+        self.first_seen = seen
+        self.last_seen = seen
+
+    @property
+    def serial_number(self):
+        return format_serial(self.serial)
+
+    def format(self):
+        message = f"Warning! Container with the following serial number: {format_serial(self.serial)} has suffered a hazard: {self.hazard.__name__}"
+        if self.count > 1:
+            return f"{message} ({self.count} times in {self.last_seen - self.first_seen:.1f}s)"
+        return message
+
+    def __repr__(self):
+        return f"HazardSummary({self.serial_number}, {self.hazard.__name__}, count={self.count})"
+
+
+def forward_to_sink(summaries):
+    """Subscriber that emits every summary to the active event sink."""
+    sink = get_sink()
+    if sink.enabled:
+        for summary in summaries:
+            sink.emit(summary)
+
+
+class _Flush:
+    __slots__ = ("done",)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class HazardPipeline:
+    """Queues hazards and delivers them, deduplicated, from a worker thread.
+
+    ``reported`` counts the reports folded so far and ``delivered`` the
+    summaries handed out; ``errors`` counts exceptions raised by subscribers,
+    which never stop the worker.
+    """
+
+    def __init__(self, window=1.0, subscribers=()):
+        self.window = window
+        self.reported = 0
+        self.delivered = 0
+        self.errors = 0
+        self._subscribers = list(subscribers)
+        self._queue = queue.SimpleQueue()
+        # Summaries still inside their window, oldest first.
+        self._open = {}
+        self._worker = threading.Thread(target=self._run, name="hazard-pipeline", daemon=True)
+        self._worker.start()
+
+    def subscribe(self, subscriber):
+        self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self._subscribers.remove(subscriber)
+
+    def report(self, serial, hazard):
+        """Queue a hazard on the container with the serial key ``serial``; never blocks."""
+        self._queue.put((serial, hazard, time.monotonic()))
+
+    def flush(self, timeout=None):
+        """Deliver everything reported so far without waiting for the windows to pass."""
+        marker = _Flush()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self):
+        """Deliver whatever is still open and stop the worker."""
+        if self._worker.is_alive():
+            self._queue.put(_STOP)
+            self._worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self):
+        pending = self._open
+        while True:
+            timeout = None
+            if pending:
+                oldest = next(iter(pending.values()))
+                timeout = max(oldest.first_seen + self.window - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._deliver(list(pending.values()))
+                pending.clear()
+                return
+            if isinstance(item, _Flush):
+                self._deliver(list(pending.values()))
+                pending.clear()
+                item.done.set()
+                continue
+            if item is not None:
+                serial, hazard, seen = item
+                self.reported += 1
+                summary = pending.get((serial, hazard))
+                if summary is None:
+                    pending[serial, hazard] = HazardSummary(serial, hazard, seen)
+                else:
+                    summary.count += 1
+                    summary.last_seen = seen
+            self._deliver_due(time.monotonic())
+
+    def _deliver_due(self, now):
+        pending = self._open
+        due = []
+        for key, summary in pending.items():
+            if summary.first_seen + self.window > now:
+                break
+            due.append(key)
+        if due:
+            self._deliver([pending.pop(key) for key in due])
+
+    def _deliver(self, summaries):
+        if not summaries:
+            return
+        self.delivered += len(summaries)
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber(summaries)
+            except Exception:
+                self.errors += 1
+
+
+_pipeline = None
+
+
+def get_hazard_pipeline():
+    return _pipeline
+
+
+def set_hazard_pipeline(pipeline):
+    """Route hazards to ``pipeline``, or back to events with None; return the previous one."""
+    global _pipeline
+    previous, _pipeline = _pipeline, pipeline
+    return previous
+
+
+class use_hazard_pipeline:
+    """Route hazards to a pipeline for a block, then close it: ``with use_hazard_pipeline(HazardPipeline()) as pipeline: ...``."""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
+    def __enter__(self):
+        self._previous = set_hazard_pipeline(self.pipeline)
+        return self.pipeline
+
+    def __exit__(self, *exc_info):
+        set_hazard_pipeline(self._previous)
+        self.pipeline.close()
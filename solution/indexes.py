@@ -0,0 +1,208 @@
+"""Secondary indexes behind ``Storage.query``.
+
+A ``StorageIndexes`` keeps, for the containers of one storage:
+
+* the serials of each container kind,
+* the serials of chilled containers by type of cargo,
+* chilled containers sorted by temperature,
+* every container sorted by fill ratio (loaded mass over capacity),
+* the serials of containers carrying hazardous cargo.
+
+The storage keeps the indexes up to date as containers are added, replaced,
+removed, loaded and emptied. Changing a chilled container's ``temperature``
+attribute in place is not tracked; replace the container instead.
+
+A query starts from whichever predicate matches the fewest containers,
+which is known from set sizes and two binary searches, and checks the
+remaining predicates on those candidates only.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+
+_INFINITY = float("inf")
+
+
+def _discard_sorted(entries, entry):
+    position = bisect_left(entries, entry)
+    if position < len(entries) and entries[position] == entry:
+        del entries[position]
+
+
+def _sorted_range(entries, low, high):
+    start = 0 if low is None else bisect_left(entries, (low,))
+    stop = len(entries) if high is None else bisect_right(entries, (high, _INFINITY))
+    return start, max(start, stop)
+
+
+class StorageIndexes:
+    def __init__(self, containers=()):
+        self.by_kind = {}
+        self.by_cargo_type = {}
+        self.hazardous = set()
+        self.temperatures = []
+        self.fill_ratios = []
+        self._temperature = {}
+        self._fill_ratio = {}
+        self.add_many(containers)
+
+    def _add_unsorted(self, container):
+        serial = container.serial
+        self.by_kind.setdefault(container.kind, set()).add(serial)
+        if container.kind == "chilled":
+            self.by_cargo_type.setdefault(container.type_of_cargo, set()).add(serial)
+            self._temperature[serial] = container.temperature
+        if container.is_hazardous:
+            self.hazardous.add(serial)
+        self._fill_ratio[serial] = container.loaded_mass / container.capacity
+
+    def add(self, container):
+        self._add_unsorted(container)
+        serial = container.serial
+        if serial in self._temperature:
+            insort(self.temperatures, (self._temperature[serial], serial))
+        insort(self.fill_ratios, (self._fill_ratio[serial], serial))
+
+    def add_many(self, containers):
+        """Index many containers at once with one sort per ordered index."""
+        containers = list(containers)
+        if len(containers) < 8:
+            for container in containers:
+                self.add(container)
+            return
+        for container in containers:
+            self._add_unsorted(container)
+            serial = container.serial
+            if serial in self._temperature:
+                self.temperatures.append((self._temperature[serial], serial))
+            self.fill_ratios.append((self._fill_ratio[serial], serial))
+        self.temperatures.sort()
+        self.fill_ratios.sort()
+
+    def remove(self, container):
+        serial = container.serial
+        kinds = self.by_kind[container.kind]
+        kinds.discard(serial)
+        if not kinds:
+            del self.by_kind[container.kind]
+        temperature = self._temperature.pop(serial, None)
+        if temperature is not None:
+            cargo_types = self.by_cargo_type[container.type_of_cargo]
+            cargo_types.discard(serial)
+            if not cargo_types:
+                del self.by_cargo_type[container.type_of_cargo]
+            _discard_sorted(self.temperatures, (temperature, serial))
+        self.hazardous.discard(serial)
+        _discard_sorted(self.fill_ratios, (self._fill_ratio.pop(serial), serial))
+
+    def remove_many(self, containers):
+        """Drop many containers at once with one pass over each ordered index."""
+        containers = list(containers)
+        if len(containers) < 8:
+            for container in containers:
+                self.remove(container)
+            return
+        gone = set()
+        for container in containers:
+            serial = container.serial
+            gone.add(serial)
+            kinds = self.by_kind[container.kind]
+            kinds.discard(serial)
+            if not kinds:
+                del self.by_kind[container.kind]
+            if self._temperature.pop(serial, None) is not None:
+                cargo_types = self.by_cargo_type[container.type_of_cargo]
+                cargo_types.discard(serial)
+                if not cargo_types:
+                    del self.by_cargo_type[container.type_of_cargo]
+            self.hazardous.discard(serial)
+            del self._fill_ratio[serial]
+        self.temperatures = [entry for entry in self.temperatures if entry[1] not in gone]
+        self.fill_ratios = [entry for entry in self.fill_ratios if entry[1] not in gone]
+
+    def changed(self, container):
+        serial = container.serial
+        if container.is_hazardous:
+            self.hazardous.add(serial)
+        else:
+            self.hazardous.discard(serial)
+        fill_ratio = container.loaded_mass / container.capacity
+        previous = self._fill_ratio[serial]
+        if fill_ratio != previous:
+            _discard_sorted(self.fill_ratios, (previous, serial))
+            insort(self.fill_ratios, (fill_ratio, serial))
+            self._fill_ratio[serial] = fill_ratio
+
+    def query(
+        self,
+        storage,
+        kind=None,
+        type_of_cargo=None,
+        min_temperature=None,
+        max_temperature=None,
+        min_fill=None,
+        max_fill=None,
+        hazardous=None,
+    ):
+        """Return the containers of ``storage`` matching every given predicate."""
+        sets = []
+        ranges = []
+        if kind is not None:
+            sets.append(self.by_kind.get(getattr(kind, "kind", kind), set()))
+        if type_of_cargo is not None:
+            sets.append(self.by_cargo_type.get(type_of_cargo, set()))
+        if hazardous:
+            sets.append(self.hazardous)
+        if min_temperature is not None or max_temperature is not None:
+            ranges.append(
+                (self.temperatures, self._temperature, min_temperature, max_temperature)
+            )
+        if min_fill is not None or max_fill is not None:
+            ranges.append((self.fill_ratios, self._fill_ratio, min_fill, max_fill))
+
+        # Start from the smallest candidate set, narrow it down with set
+        # intersections, then check range bounds against the indexed values.
+        sources = sets + [
+            _SortedSlice(entries, *_sorted_range(entries, low, high))
+            for entries, _, low, high in ranges
+        ]
+        if sources:
+            smallest = min(sources, key=len)
+            serials = smallest if isinstance(smallest, set) else set(smallest)
+            for other in sets:
+                if other is not smallest:
+                    serials = other.intersection(serials)
+        else:
+            serials = storage._index.keys()
+        if hazardous is False:
+            serials = serials - self.hazardous
+        for entries, values, low, high in ranges:
+            low = -_INFINITY if low is None else low
+            high = _INFINITY if high is None else high
+            serials = [
+                serial
+                for serial in serials
+                if serial in values and low <= values[serial] <= high
+            ]
+
+        positions = storage._index
+        slots = storage._slots
+        return [slots[position] for position in sorted(map(positions.__getitem__, serials))]
+
+
+class _SortedSlice:
+    """The serials in ``entries[start:stop]``, sized without copying."""
+
+    __slots__ = ("entries", "start", "stop")
+
+    def __init__(self, entries, start, stop):
+        self.entries = entries
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __iter__(self):
+        entries = self.entries
+        for position in range(self.start, self.stop):
+            yield entries[position][1]
@@ -0,0 +1,143 @@
+"""Stream cargo events from the gate scanners into the containers of a storage.
+
+An event is a ``(serial_number, mass, safe, cargo_type, required_temperature)``
+tuple; ``cargo_type`` and ``required_temperature`` are None except for cargo
+headed for a chilled container. ``ingest(storage, events)`` reads the events
+in micro-batches of ``batch_size`` and yields one ``(event, reason)`` pair per
+event, in order: ``reason`` is None if the cargo was loaded, otherwise why it
+was turned away, with the messages ``load_container`` would have raised. Only
+one batch is held at a time, so the stream may be endless.
+
+Within a batch the events are grouped by container, and every container is
+checked against the rules of its type: the limits of liquid and gas
+containers and a chilled container's cargo type and temperature. The batch
+is loaded under the locks of its containers and their storages, and each
+storage refreshes its totals and indexes once for the whole batch instead of
+once per item, which pays off once batches are larger than the number of
+containers they touch. Loads are then emitted as ``ContainerLoaded`` events
+in stream order; overfills and temperature violations go to the hazard
+notifier as they are found.
+"""
+
+import itertools
+from contextlib import ExitStack
+
+from solution import (
+    Cargo,
+    ChilledContainer,
+    OverfillException,
+    TemperatureException,
+    serial_key,
+)
+from solution.events import ContainerLoaded, emit, get_sink
+from solution.locking import locked
+from solution.parallel import OVERFILL, UNKNOWN_CONTAINER
+
+NOT_CHILLED = "Only chilled containers take cargo requirements"
+
+
+def _check_requirements(container, chilled, cargo, cargo_type, required_temperature):
+    if not chilled:
+        return NOT_CHILLED
+    try:
+        ChilledContainer._check_requirements(container, cargo, cargo_type, required_temperature)
+    except TemperatureException as error:
+        container.hazard_notifier.warn_hazard(container, TemperatureException)
+        return str(error)
+    except Exception as error:
+        return str(error)
+    return None
+
+
+def _load(batch, found, groups, reasons):
+    accepted = []
+    for container, indices in zip(found, groups.values()):
+        if container is None:
+            continue
+        chilled = container.kind == "chilled"
+        load_limit = container._load_limit
+        cargo_items = []
+        loaded_mass = container.loaded_mass
+        hazardous_items = container._hazardous_items
+        for position in indices:
+            _, mass, safe, cargo_type, required_temperature = batch[position]
+            cargo = Cargo(safe, mass)
+            if chilled or cargo_type is not None or required_temperature is not None:
+                reason = _check_requirements(
+                    container, chilled, cargo, cargo_type, required_temperature
+                )
+                if reason is not None:
+                    reasons[position] = reason
+                    continue
+            if loaded_mass + mass > load_limit(cargo):
+                container.hazard_notifier.warn_hazard(container, OverfillException)
+                reasons[position] = OVERFILL
+            else:
+                cargo_items.append(cargo)
+                loaded_mass += mass
+                hazardous_items += not safe
+        if cargo_items:
+            container.cargo.extend(cargo_items)
+            container.loaded_mass = loaded_mass
+            container._hazardous_items = hazardous_items
+            container.version += 1
+            accepted.append(container)
+    return accepted
+
+
+def _ingest_batch(storage, batch):
+    reasons = [None] * len(batch)
+    # Grouped by key, so a container named both as a string and as a key is
+    # still one group; unknown serial numbers share the group None.
+    groups = {}
+    for position, event in enumerate(batch):
+        key = serial_key(event[0])
+        indices = groups.get(key)
+        if indices is None:
+            groups[key] = [position]
+        else:
+            indices.append(position)
+    # The whole batch's serial numbers are resolved under one storage lock.
+    with storage._lock:
+        index, slots = storage._index, storage._slots
+        found = []
+        for key in groups:
+            slot = index.get(key)
+            found.append(None if slot is None else slots[slot])
+    containers = list({id(container): container for container in found if container is not None}.values())
+
+    while True:
+        homes = {}
+        for container in containers:
+            for home in container._storages:
+                homes.setdefault(id(home), (home, []))[1].append(container)
+        with locked(containers, [home for home, _ in homes.values()]):
+            # A container could have moved before the locks were taken;
+            # start over if so.
+            if any(
+                id(home) not in homes for container in containers for home in container._storages
+            ):
+                continue
+            # Every storage refreshes its totals and indexes once per batch.
+            with ExitStack() as stack:
+                for home, members in homes.values():
+                    stack.enter_context(home._deferred(members))
+                _load(batch, found, groups, reasons)
+            break
+
+    for container, indices in zip(found, groups.values()):
+        if container is None:
+            for position in indices:
+                reasons[position] = UNKNOWN_CONTAINER
+    if get_sink().enabled:
+        for event, reason in zip(batch, reasons):
+            if reason is None:
+                emit(ContainerLoaded, serial_key(event[0]), event[1])
+    return zip(batch, reasons)
+
+
+def ingest(storage, events, batch_size=10_000):
+    """Load the cargo of ``events`` into the containers of ``storage``, yielding ``(event, reason)``."""
+    iterator = iter(events)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        yield from _ingest_batch(storage, batch)
@@ -0,0 +1,70 @@
+"""Locks that let threads share storages, ships and containers.
+
+Every storage has a lock of its own. Containers are far more numerous, so
+they share a fixed set of striped locks picked by serial number. A
+container's lock guards its cargo and loaded mass, which is what keeps the
+check against its load limit and the load itself one step.
+
+To rule out deadlocks, locks are always taken in the same order: container
+stripes first, in stripe order, then storages, in ``id`` order.
+``locked`` takes any mix of them in that order. Code holding a storage lock
+never waits for a container lock.
+"""
+
+import threading
+
+from .serials import TYPE_BITS
+
+STRIPES = 64
+
+_stripes = [threading.RLock() for _ in range(STRIPES)]
+
+
+def _stripe(container):
+    # The low bits of a key are its type, so stripe on the number.
+    return (container.serial >> TYPE_BITS) % STRIPES
+
+
+def container_lock(container):
+    """Return the lock guarding ``container``."""
+    return _stripes[_stripe(container)]
+
+
+class locked:
+    """Hold the locks of ``containers`` and ``storages``, in lock order.
+
+    With ``every_container`` all stripes are taken, for operations on a
+    storage's whole contents.
+    """
+
+    __slots__ = ("_locks",)
+
+    def __init__(self, containers=(), storages=(), every_container=False):
+        if every_container:
+            stripes = _stripes
+        else:
+            stripes = [
+                _stripes[index]
+                for index in sorted(
+                    {_stripe(container) for container in containers if container is not None}
+                )
+            ]
+        self._locks = stripes + [
+            storage._lock for storage in sorted(set(storages), key=id)
+        ]
+
+    def __enter__(self):
+        acquired = 0
+        try:
+            for lock in self._locks:
+                lock.acquire()
+                acquired += 1
+        except BaseException:
+            for lock in reversed(self._locks[:acquired]):
+                lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        for lock in reversed(self._locks):
+            lock.release()
@@ -0,0 +1,214 @@
+"""Streaming import and export of container manifests.
+
+Two formats are supported:
+
+* CSV, one ``container`` row per container followed by one ``cargo`` row per
+  item of its cargo;
+* newline-delimited JSON, one object per container with its cargo inlined.
+
+Readers are generators that build one container at a time, so a manifest of
+any size can be fed into a ``Storage`` or ``Ship`` while only the current
+container is held in memory. Loaded mass is saved alongside the cargo, which
+keeps the residue a ``GasContainer`` retains after being emptied. For cargo
+kept in a ``CargoLedger`` the record also carries the ledger's sums and
+settings (``LEDGER_FIELDS``), so items it has already dropped still count,
+for example towards ``is_hazardous``.
+
+CSV has no types of its own: a chilled container's ``type_of_cargo`` comes
+back as a string. JSON keeps it as written.
+"""
+
+import csv
+import itertools
+import json
+
+from solution import CONTAINER_TYPES, Cargo, CargoLedger
+
+CSV_FIELDS = [
+    "record",
+    "type",
+    "serial_number",
+    "capacity",
+    "height",
+    "dry_mass",
+    "depth",
+    "loaded_mass",
+    "type_of_cargo",
+    "temperature",
+    "safe_mass",
+    "hazardous_mass",
+    "safe_items",
+    "hazardous_items",
+    "max_items",
+    "spill_path",
+    "safe",
+    "load_mass",
+]
+LEDGER_FIELDS = CSV_FIELDS[10:16]
+
+
+def _number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def container_record(container):
+    record = {
+        "type": container.kind,
+        "serial_number": container.serial_number,
+        "capacity": container.capacity,
+        "height": container.height,
+        "dry_mass": container.dry_mass,
+        "depth": container.depth,
+        "loaded_mass": container.loaded_mass,
+    }
+    if container.kind == "chilled":
+        record["type_of_cargo"] = container.type_of_cargo
+        record["temperature"] = container.temperature
+    if type(container.cargo) is CargoLedger:
+        for field in LEDGER_FIELDS:
+            record[field] = getattr(container.cargo, field)
+    return record
+
+
+def build_container(record, cargo):
+    container_type = CONTAINER_TYPES.get(record["type"])
+    if container_type is None:
+        raise Exception(f"Unknown container type in manifest. Received: {record['type']}")
+    dimensions = (record["capacity"], record["height"], record["dry_mass"], record["depth"])
+    if container_type.kind == "chilled":
+        container = container_type(
+            *dimensions,
+            record["type_of_cargo"],
+            record["temperature"],
+            serial_number=record["serial_number"],
+        )
+    else:
+        container = container_type(*dimensions, serial_number=record["serial_number"])
+    if record.get("safe_items") is not None:
+        ledger = CargoLedger(cargo, record.get("max_items"), record.get("spill_path"))
+        # The sums also cover the items the ledger had already dropped.
+        for field in LEDGER_FIELDS[:4]:
+            setattr(ledger, field, record[field])
+        cargo = ledger
+    container._restore(cargo, record["loaded_mass"])
+    return container
+
+
+def write_csv(containers, file):
+    """Write ``containers`` to an open text file and return how many were written."""
+    writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    count = 0
+    for container in containers:
+        writer.writerow({"record": "container", **container_record(container)})
+        writer.writerows(
+            {"record": "cargo", "safe": item.safe, "load_mass": item.load_mass}
+            for item in container.cargo
+        )
+        count += 1
+    return count
+
+
+def read_csv(file):
+    """Yield the containers stored in a CSV manifest, one at a time."""
+    record = None
+    cargo = []
+    for row in csv.DictReader(file):
+        if row["record"] == "container":
+            if record is not None:
+                yield build_container(record, cargo)
+            record = dict(row)
+            for field in ("capacity", "height", "dry_mass", "depth", "loaded_mass"):
+                record[field] = _number(record[field])
+            if record["type"] == "chilled":
+                record["temperature"] = _number(record["temperature"])
+            if record["safe_items"]:
+                for field in LEDGER_FIELDS[:4]:
+                    record[field] = _number(record[field])
+                record["max_items"] = _number(record["max_items"]) if record["max_items"] else None
+                record["spill_path"] = record["spill_path"] or None
+            else:
+                record["safe_items"] = None
+            cargo = []
+        elif row["record"] == "cargo":
+            if record is None:
+                raise Exception("Cargo row found before any container row")
+            cargo.append(Cargo(row["safe"] in ("True", "true", "1"), _number(row["load_mass"])))
+        else:
+            raise Exception(f"Unknown manifest record. Received: {row['record']}")
+    if record is not None:
+        yield build_container(record, cargo)
+
+
+def write_ndjson(containers, file):
+    """Write ``containers`` as one JSON object per line and return the count."""
+    count = 0
+    for container in containers:
+        record = container_record(container)
+        record["cargo"] = [[item.safe, item.load_mass] for item in container.cargo]
+        file.write(json.dumps(record, separators=(",", ":")))
+        file.write("\n")
+        count += 1
+    return count
+
+
+def read_ndjson(file):
+    """Yield the containers stored in a newline-delimited JSON manifest."""
+    for line in file:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        cargo = [Cargo(safe, load_mass) for safe, load_mass in record.pop("cargo", ())]
+        yield build_container(record, cargo)
+
+
+_FORMATS = {
+    ".csv": (write_csv, read_csv),
+    ".ndjson": (write_ndjson, read_ndjson),
+    ".jsonl": (write_ndjson, read_ndjson),
+}
+
+
+def _format(path):
+    for suffix, handlers in _FORMATS.items():
+        if str(path).endswith(suffix):
+            return handlers
+    raise Exception(f"Unknown manifest format. Expected one of: {', '.join(_FORMATS)}")
+
+
+def export_manifest(path, containers):
+    """Write ``containers`` to ``path``; the format follows the file extension."""
+    writer, _ = _format(path)
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        return writer(containers, file)
+
+
+def import_manifest(path):
+    """Yield the containers stored at ``path``; the format follows the extension."""
+    _, reader = _format(path)
+    with open(path, newline="", encoding="utf-8") as file:
+        yield from reader(file)
+
+
+def load_into_storage(storage, containers):
+    """Add every container from an iterable to ``storage``; return the count."""
+    count = 0
+    for container in containers:
+        storage.add_container(container)
+        count += 1
+    return count
+
+
+def load_into_ship(ship, containers, batch_size=1000):
+    """Load containers onto ``ship`` in all-or-nothing batches of ``batch_size``.
+
+    Returns the ``LoadReport`` of every batch.
+    """
+    reports = []
+    iterator = iter(containers)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        reports.append(ship.load_container_group(batch))
+    return reports
@@ -0,0 +1,315 @@
+"""Counters, latency histograms and profiles for the hot paths.
+
+``enable()`` wraps the storage, container and ship operations listed in
+``OPERATIONS`` so every call is counted and timed, and counts hazards
+raised through ``HazardNotifier.warn_hazard`` as rejections. ``disable()``
+puts the original methods back, so instrumentation costs nothing at all
+while it is off. Operations that raise are counted as errors.
+
+``snapshot()`` returns everything collected as a dict and
+``export_prometheus(path)`` writes it in the Prometheus text format,
+suitable for the node exporter's textfile collector.
+
+``capture_profile()`` runs a block under cProfile and, if asked to, under
+tracemalloc: ``with capture_profile(memory=True) as profile: ...``.
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+
+from solution import ChilledContainer, Container, HazardNotifier, Ship, Storage
+from solution.table import ContainerRow
+
+# Upper bounds of the latency buckets, in seconds.
+BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0,
+)  # fmt: skip
+
+OPERATIONS = {
+    "storage.add_container": [(Storage, "add_container")],
+    "storage.remove_container": [
+        (Storage, "remove_container"),
+        (Storage, "remove_container_by_serial_number"),
+    ],
+    "storage.replace_container": [(Storage, "replace_container")],
+    "storage.query": [(Storage, "query")],
+    "container.load_container": [
+        (Container, "load_container"),
+        (ChilledContainer, "load_container"),
+        (ContainerRow, "load_container"),
+    ],
+    "container.empty_container": [
+        (Container, "empty_container"),
+        (ContainerRow, "empty_container"),
+    ],
+    "container.print_info": [(Container, "print_info"), (ContainerRow, "print_info")],
+    "ship.load_container": [(Ship, "load_container")],
+    "ship.load_container_batch": [(Ship, "load_container_batch")],
+    "ship.unload_container": [(Ship, "unload_container")],
+    "ship.replace_container": [(Ship, "replace_container")],
+    "ship.transport_container": [(Ship, "transport_container")],
+    "ship.print_info": [(Ship, "print_info")],
+}
+
+
+class Histogram:
+    """Counts observations per bucket of ``BUCKETS``, plus their sum."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        """Return ``(upper bound, observations up to it)`` pairs, ending with +Inf."""
+        running = 0
+        pairs = []
+        for bound, count in zip((*BUCKETS, float("inf")), self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+    def quantile(self, share):
+        """Estimate a quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return None
+        target = share * self.count
+        for bound, running in self.cumulative():
+            if running >= target:
+                return bound
+
+
+class _Operation:
+    __slots__ = ("calls", "errors", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram()
+
+
+_lock = threading.Lock()
+_local = threading.local()
+_operations = {name: _Operation() for name in OPERATIONS}
+_rejections = {}
+_originals = []
+
+
+def _timed(name, function):
+    operation = _operations[name]
+
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        # A chilled load goes through Container.load_container as well;
+        # only the outermost call of an operation is counted.
+        inside = getattr(_local, "inside", None)
+        if inside is None:
+            inside = _local.inside = set()
+        if name in inside:
+            return function(*args, **kwargs)
+        inside.add(name)
+        start = time.perf_counter()
+        failed = False
+        try:
+            return function(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            inside.discard(name)
+            with _lock:
+                operation.calls += 1
+                operation.errors += failed
+                operation.latency.observe(elapsed)
+
+    return timed
+
+
+def _counted_hazard(function):
+    @functools.wraps(function)
+    def warn_hazard(self, container, exception):
+        with _lock:
+            _rejections[exception.__name__] = _rejections.get(exception.__name__, 0) + 1
+        return function(self, container, exception)
+
+    return warn_hazard
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def enable():
+    """Start counting and timing; does nothing if already enabled."""
+    if _originals:
+        return
+    for name, targets in OPERATIONS.items():
+        for owner, attribute in targets:
+            original = owner.__dict__[attribute]
+            _originals.append((owner, attribute, original))
+            setattr(owner, attribute, _timed(name, original))
+    original = HazardNotifier.__dict__["warn_hazard"]
+    _originals.append((HazardNotifier, "warn_hazard", original))
+    HazardNotifier.warn_hazard = _counted_hazard(original)
+
+
+def disable():
+    """Put the original methods back; what was collected is kept."""
+    while _originals:
+        owner, attribute, original = _originals.pop()
+        setattr(owner, attribute, original)
+
+
+def reset():
+    with _lock:
+        for name in _operations:
+            _operations[name] = _Operation()
+        _rejections.clear()
+
+
+class enabled:
+    """Enable metrics for a block: ``with enabled(): ...``."""
+
+    def __enter__(self):
+        self._was_enabled = is_enabled()
+        enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if not self._was_enabled:
+            disable()
+
+
+def _label(bound):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def snapshot():
+    """Return the collected counters and histograms as plain data."""
+    with _lock:
+        operations = {}
+        for name, operation in _operations.items():
+            latency = operation.latency
+            operations[name] = {
+                "calls": operation.calls,
+                "errors": operation.errors,
+                "seconds": latency.total,
+                "p50": latency.quantile(0.5),
+                "p99": latency.quantile(0.99),
+                "buckets": {_label(bound): count for bound, count in latency.cumulative()},
+            }
+        return {
+            "enabled": is_enabled(),
+            "operations": operations,
+            "rejections": dict(_rejections),
+        }
+
+
+def prometheus_text():
+    """Return the collected metrics in the Prometheus text exposition format."""
+    with _lock:
+        lines = [
+            "# HELP solution_operation_calls_total Calls of each instrumented operation.",
+            "# TYPE solution_operation_calls_total counter",
+        ]
+        for name, operation in _operations.items():
+            lines.append(f'solution_operation_calls_total{{operation="{name}"}} {operation.calls}')
+        lines += [
+            "# HELP solution_operation_errors_total Calls that raised an exception.",
+            "# TYPE solution_operation_errors_total counter",
+        ]
+        for name, operation in _operations.items():
+            lines.append(f'solution_operation_errors_total{{operation="{name}"}} {operation.errors}')
+        lines += [
+            "# HELP solution_operation_seconds Latency of each instrumented operation.",
+            "# TYPE solution_operation_seconds histogram",
+        ]
+        for name, operation in _operations.items():
+            latency = operation.latency
+            for bound, count in latency.cumulative():
+                labels = f'operation="{name}",le="{_label(bound)}"'
+                lines.append(f"solution_operation_seconds_bucket{{{labels}}} {count}")
+            lines.append(f'solution_operation_seconds_sum{{operation="{name}"}} {latency.total!r}')
+            lines.append(f'solution_operation_seconds_count{{operation="{name}"}} {latency.count}')
+        lines += [
+            "# HELP solution_rejections_total Hazards raised, by exception.",
+            "# TYPE solution_rejections_total counter",
+        ]
+        for reason, count in sorted(_rejections.items()):
+            lines.append(f'solution_rejections_total{{reason="{reason}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def export_prometheus(path):
+    """Write ``prometheus_text()`` to ``path``, replacing the file in one step."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        file.write(prometheus_text())
+    os.replace(temporary, path)
+
+
+class ProfileResult:
+    """What ``capture_profile`` collected: ``stats`` and, with memory, ``memory``."""
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.stats = None
+        self.memory = None
+
+    def report(self, limit=20):
+        """Return the top functions by cumulative time, and memory if captured."""
+        out = io.StringIO()
+        self.stats.stream = out
+        self.stats.sort_stats("cumulative").print_stats(limit)
+        if self.memory is not None:
+            out.write("Top allocations:\n")
+            for statistic in self.memory.statistics("lineno")[:limit]:
+                out.write(f"{statistic}\n")
+        return out.getvalue()
+
+
+class capture_profile:
+    """Profile a block with cProfile and, with ``memory=True``, tracemalloc.
+
+    With ``path`` the cProfile statistics are also written there, for
+    ``python -m pstats`` or snakeviz.
+    """
+
+    def __init__(self, path=None, memory=False):
+        self.path = path
+        self.memory = memory
+        self.result = ProfileResult()
+        self._tracing = False
+
+    def __enter__(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        self.result.profiler.enable()
+        return self.result
+
+    def __exit__(self, *exc_info):
+        self.result.profiler.disable()
+        if self.memory:
+            self.result.memory = tracemalloc.take_snapshot()
+            if self._tracing:
+                tracemalloc.stop()
+        self.result.stats = pstats.Stats(self.result.profiler)
+        if self.path is not None:
+            self.result.stats.dump_stats(self.path)
@@ -0,0 +1,358 @@
+"""Apply large batches of container operations on several processes.
+
+``ShardedExecutor.run(storage, operations)`` takes a list of operations on
+the containers of a ``Storage``:
+
+* ``("load", serial_number, cargo)``,
+* ``("load", serial_number, cargo, type_of_cargo, required_temperature)``
+  for chilled containers,
+* ``("empty", serial_number)``.
+
+The operations are split into shards by container. The parent resolves
+every distinct serial number once and routes the operations with a stable
+sort by shard; it runs no Python code per operation. Each worker process
+rebuilds the containers of its shard from their numbers, runs the shard
+through the regular ``load_container``/``empty_container`` of every
+container type, and sends back only the rejected operations and, for every
+container that changed, its final loaded mass and which loads make up its
+cargo. The parent then brings each of those containers to its final state
+with a single ``_restore``, which refreshes the storage aggregates and
+indexes once per container, and emits the events in the original order.
+
+With the ``fork`` start method the workers are forked for each batch and
+inherit the operations and the shard contents, so the parent neither
+converts nor pickles anything per operation and its share of the work stays
+small as workers are added. With ``spawn`` or ``forkserver`` the workers
+are reused and each shard's operations are pickled over to them, so the
+operations must be picklable.
+
+An operation only ever touches its own container, and the operations of a
+container stay in their original order within its shard, so the outcome is
+exactly what running them one by one gives. With ``workers=1`` they are
+run one by one, in this process.
+"""
+
+import multiprocessing
+import os
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+
+from solution import (
+    CONTAINER_TYPES,
+    OverfillException,
+    TemperatureException,
+    _empty_like,
+)
+from solution.events import (
+    ContainerEmptied,
+    ContainerLoaded,
+    NullSink,
+    emit,
+    get_sink,
+    use_sink,
+)
+from solution.hazards import get_hazard_pipeline
+from solution.serials import EXTERNAL_TYPE, TYPE_BITS, TYPE_MASK
+
+OVERFILL = "Cargo would overfill the container"
+# How ChilledContainer's temperature check starts its message.
+TEMPERATURE = "Unable to load cargo with a required temperature"
+UNKNOWN_CONTAINER = "Unknown container"
+
+
+class ExecutionReport:
+    """Outcome of a batch: ``outcomes[i]`` is None if operation ``i`` took effect,
+    otherwise the reason it did not."""
+
+    __slots__ = ("outcomes",)
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+
+    @property
+    def applied(self):
+        return sum(outcome is None for outcome in self.outcomes)
+
+    @property
+    def rejected(self):
+        return [
+            (index, outcome)
+            for index, outcome in enumerate(self.outcomes)
+            if outcome is not None
+        ]
+
+    def __repr__(self):
+        return f"ExecutionReport(applied={self.applied}, rejected={len(self.outcomes) - self.applied})"
+
+
+def _apply(container, operation):
+    """Apply one operation; return None if it took effect, else the reason."""
+    try:
+        match operation[0]:
+            case "load":
+                version = container.version
+                container.load_container(*operation[2:])
+                return None if container.version != version else OVERFILL
+            case "empty":
+                container.empty_container()
+                return None
+            case _:
+                return f"Unknown operation. Received: {operation[0]}"
+    except Exception as error:
+        return str(error)
+
+
+def _container_state(container):
+    chilled = container.kind == "chilled"
+    serial = container.serial
+    if serial & TYPE_MASK == EXTERNAL_TYPE:
+        # External keys are only valid in the process that interned the name.
+        serial = container.serial_number
+    return (
+        container.kind,
+        serial,
+        container.capacity,
+        container.height,
+        container.dry_mass,
+        container.depth,
+        container.loaded_mass,
+        container.type_of_cargo if chilled else None,
+        container.temperature if chilled else None,
+    )
+
+
+_name_of = itemgetter(1)
+_cargo_of = itemgetter(2)
+
+
+class _Shard:
+    """The containers of one shard and the indices of the operations on them."""
+
+    __slots__ = ("containers", "indices")
+
+    def __init__(self):
+        self.containers = []
+        self.indices = None
+
+
+class _Batch:
+    """One sharded run: the operations, the name each one uses, and where
+    each name's container sits in its shard."""
+
+    __slots__ = ("operations", "names", "position_of", "shards")
+
+    def __init__(self, operations, names, position_of, shards):
+        self.operations = operations
+        self.names = names
+        self.position_of = position_of
+        self.shards = shards
+
+    def payload(self, number):
+        """Everything the worker running shard ``number`` needs."""
+        shard = self.shards[number]
+        indices = shard.indices
+        operations = list(map(self.operations.__getitem__, indices))
+        positions = list(map(self.position_of.__getitem__, map(self.names.__getitem__, indices)))
+        return list(map(_container_state, shard.containers)), positions, operations
+
+
+# The batch of the current run, which forked workers inherit.
+_inherited = None
+
+
+def _run_inherited(number):
+    return _run_shard(_inherited.payload(number))
+
+
+def _run_shard(payload):
+    states, positions, operations = payload
+    containers = []
+    for kind, serial, *dimensions, loaded_mass, type_of_cargo, temperature in states:
+        if kind == "chilled":
+            container = CONTAINER_TYPES[kind](
+                *dimensions, type_of_cargo, temperature, serial_number=serial
+            )
+        else:
+            container = CONTAINER_TYPES[kind](*dimensions, serial_number=serial)
+        # Only the loaded mass decides what the rules accept.
+        container.loaded_mass = loaded_mass
+        containers.append(container)
+
+    rejected = []
+    emptied = bytearray(len(containers))
+    kept = [[] for _ in containers]
+    hazardous = [0] * len(containers)
+    with use_sink(NullSink()):
+        for number, operation in enumerate(operations):
+            position = positions[number]
+            outcome = _apply(containers[position], operation)
+            if outcome is not None:
+                rejected.append((number, outcome))
+            elif operation[0] == "empty":
+                emptied[position] = 1
+                kept[position] = []
+                hazardous[position] = 0
+            else:
+                kept[position].append(number)
+                hazardous[position] += not operation[2].safe
+    # Only the containers that changed: their final loaded mass, whether they
+    # were emptied, and which of the shard's loads, with how many hazardous
+    # ones, make up their cargo since the last emptying.
+    finals = [
+        (position, container.loaded_mass, emptied[position], kept[position], hazardous[position])
+        for position, container in enumerate(containers)
+        if emptied[position] or kept[position]
+    ]
+    return rejected, finals
+
+
+class ShardedExecutor:
+    """Runs operation batches on ``workers`` processes.
+
+    With the ``fork`` start method (``mp_context`` if given, else the
+    default) every batch gets freshly forked workers. Otherwise the pool is
+    started on the first parallel batch and reused until ``close``; use the
+    executor as a context manager to close it.
+    """
+
+    def __init__(self, workers=None, shards_per_worker=4, mp_context=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.shards_per_worker = shards_per_worker
+        self.mp_context = mp_context
+        self._pool = None
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _start_pool(self):
+        return ProcessPoolExecutor(self.workers, mp_context=self.mp_context)
+
+    def _forks(self):
+        context = self.mp_context or multiprocessing.get_context()
+        return context.get_start_method() == "fork"
+
+    def run(self, storage, operations):
+        """Apply ``operations`` to the containers of ``storage``; return an ``ExecutionReport``."""
+        if self.workers == 1:
+            return self._run_serial(storage, operations)
+        return self._run_sharded(storage, operations)
+
+    def _run_serial(self, storage, operations):
+        outcomes = []
+        for operation in operations:
+            container = storage.get(operation[1])
+            if container is None:
+                outcomes.append(UNKNOWN_CONTAINER)
+            else:
+                outcomes.append(_apply(container, operation))
+        return ExecutionReport(outcomes)
+
+    def _run_sharded(self, storage, operations):
+        global _inherited
+
+        shard_count = self.workers * self.shards_per_worker
+        shards = [_Shard() for _ in range(shard_count)]
+        outcomes = [None] * len(operations)
+
+        # Every distinct serial number is resolved once, to a shard (-1 for
+        # unknown containers) and a position within it.
+        names = list(map(_name_of, operations))
+        found = {}
+        shard_of = {}
+        position_of = {}
+        placed = {}
+        for name in dict.fromkeys(names):
+            container = found[name] = storage.get(name)
+            if container is None:
+                shard_of[name] = -1
+                continue
+            serial = container.serial
+            target = placed.get(serial)
+            if target is None:
+                number = (serial >> TYPE_BITS) % shard_count
+                shard = shards[number]
+                target = placed[serial] = (number, len(shard.containers))
+                shard.containers.append(container)
+            shard_of[name], position_of[name] = target
+
+        # A stable sort by shard keeps each container's operations in order;
+        # routing never runs Python code per operation.
+        op_shards = list(map(shard_of.__getitem__, names))
+        order = sorted(range(len(operations)), key=op_shards.__getitem__)
+        sorted_shards = list(map(op_shards.__getitem__, order))
+        for index in order[: bisect_left(sorted_shards, 0)]:
+            outcomes[index] = UNKNOWN_CONTAINER
+        for number, shard in enumerate(shards):
+            shard.indices = order[
+                bisect_left(sorted_shards, number) : bisect_right(sorted_shards, number)
+            ]
+        numbers = [number for number, shard in enumerate(shards) if shard.indices]
+        batch = _Batch(operations, names, position_of, shards)
+
+        if self._forks():
+            # The workers inherit the batch, so nothing is converted or
+            # pickled per operation on the way in.
+            _inherited = batch
+            pool = self._start_pool()
+            try:
+                results = list(pool.map(_run_inherited, numbers))
+            finally:
+                _inherited = None
+                pool.shutdown()
+        else:
+            if self._pool is None:
+                self._pool = self._start_pool()
+            results = self._pool.map(_run_shard, map(batch.payload, numbers))
+
+        for number, (rejected, finals) in zip(numbers, results):
+            shard = shards[number]
+            indices = shard.indices
+            for index, outcome in rejected:
+                outcomes[indices[index]] = outcome
+            for position, loaded_mass, emptied, kept, hazardous in finals:
+                container = shard.containers[position]
+                if emptied:
+                    cargo = _empty_like(container.cargo)
+                else:
+                    cargo = container.cargo.copy()
+                    hazardous += container._hazardous_items
+                cargo.extend(
+                    map(_cargo_of, map(operations.__getitem__, map(indices.__getitem__, kept)))
+                )
+                container._restore(cargo, loaded_mass, hazardous)
+
+        if get_sink().enabled or get_hazard_pipeline() is not None:
+            self._emit(operations, outcomes, found)
+        return ExecutionReport(outcomes)
+
+    def _emit(self, operations, outcomes, found):
+        # Containers are already in their final state; only replay the events
+        # and hazards.
+        for operation, outcome in zip(operations, outcomes):
+            container = found[operation[1]]
+            if container is None:
+                continue
+            if outcome is None:
+                if operation[0] == "load":
+                    emit(ContainerLoaded, container.serial, operation[2].load_mass)
+                else:
+                    emit(ContainerEmptied, container.serial, container.residue_ratio)
+            elif outcome == OVERFILL:
+                container.hazard_notifier.warn_hazard(container, OverfillException)
+            elif outcome.startswith(TEMPERATURE):
+                container.hazard_notifier.warn_hazard(container, TemperatureException)
+
+
+def run_operations(storage, operations, workers=None):
+    """Apply ``operations`` to ``storage`` with a one-off ``ShardedExecutor``."""
+    with ShardedExecutor(workers) as executor:
+        return executor.run(storage, operations)
@@ -0,0 +1,253 @@
+"""Plan how to load many cargo items into many containers at once.
+
+``plan_loading`` assigns cargo orders to containers with first-fit
+decreasing: orders are taken from the heaviest down, and each goes into the
+first container that can still take it. The free capacity of every
+container sits in a max segment tree, so finding that container costs
+O(log n) instead of a scan over all of them.
+
+The plan follows the same rules as loading one item at a time:
+
+* a container never goes over ``_load_limit`` for the cargo it receives,
+  which gives liquid containers their 90 % (safe) and 50 % (hazardous)
+  limits. Hazardous cargo is loaded before safe cargo, so both limits hold
+  at every step;
+* orders with a ``type_of_cargo`` only go to chilled containers of that
+  type whose temperature is at least ``required_temperature``, and orders
+  without one only go to the other containers. Among the chilled containers
+  that qualify, the coldest is tried first, which keeps the warmer ones,
+  which accept more orders, free for later;
+* with ``empty_first``, containers are planned as if they were emptied
+  beforehand, so a gas container starts from its 5 % residue.
+
+``LoadPlan.apply`` loads the whole plan with one storage notification per
+container. It refuses to run if any planned container changed since it was
+planned.
+"""
+
+from bisect import bisect_left
+
+from solution import Cargo, LoadReport
+
+_SAFE = Cargo(True, 0)
+_HAZARDOUS = Cargo(False, 0)
+_NO_ROOM = float("-inf")
+
+
+class CargoOrder:
+    """A cargo item waiting to be loaded, with a chilled container's requirements."""
+
+    __slots__ = ("cargo", "type_of_cargo", "required_temperature")
+
+    def __init__(self, cargo, type_of_cargo=None, required_temperature=None):
+        if cargo is None:
+            raise Exception("Cargo cannot be None")
+        if type_of_cargo is not None and required_temperature is None:
+            raise Exception("Required temperature cannot be None")
+        self.cargo = cargo
+        self.type_of_cargo = type_of_cargo
+        self.required_temperature = required_temperature
+
+    def __repr__(self):
+        if self.type_of_cargo is None:
+            return f"CargoOrder({self.cargo!r})"
+        return f"CargoOrder({self.cargo!r}, {self.type_of_cargo!r}, {self.required_temperature!r})"
+
+
+class _FreeCapacityTree:
+    """Max segment tree over the free capacity of a list of containers."""
+
+    def __init__(self, values):
+        size = 1
+        while size < len(values):
+            size *= 2
+        self._size = size
+        self._tree = [_NO_ROOM] * (2 * size)
+        self._tree[size : size + len(values)] = values
+        for node in range(size - 1, 0, -1):
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def update(self, index, value):
+        tree = self._tree
+        node = index + self._size
+        tree[node] = value
+        node //= 2
+        while node:
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+            node //= 2
+
+    def first_fit(self, mass, start=0):
+        """Return the lowest index from ``start`` on with room for ``mass``, or -1."""
+        return self._search(1, 0, self._size, mass, start)
+
+    def _search(self, node, low, high, mass, start):
+        if high <= start or self._tree[node] < mass:
+            return -1
+        if node >= self._size:
+            return low
+        middle = (low + high) // 2
+        found = self._search(2 * node, low, middle, mass, start)
+        if found < 0:
+            found = self._search(2 * node + 1, middle, high, mass, start)
+        return found
+
+
+class _Pool:
+    """Containers that accept the same orders, with their running totals."""
+
+    def __init__(self, containers, empty_first, chilled):
+        if chilled:
+            containers = sorted(containers, key=lambda container: container.temperature)
+            self.temperatures = [container.temperature for container in containers]
+        else:
+            self.temperatures = None
+        self.containers = containers
+        self.base = [
+            container.loaded_mass * container.residue_ratio
+            if empty_first
+            else container.loaded_mass
+            for container in containers
+        ]
+        self.safe_limit = [container._load_limit(_SAFE) for container in containers]
+        self.hazardous_limit = [
+            container._load_limit(_HAZARDOUS) for container in containers
+        ]
+        self.safe_mass = [0] * len(containers)
+        self.hazardous_mass = [0] * len(containers)
+        self.orders = [[] for _ in containers]
+        self.safe_free = _FreeCapacityTree(
+            [limit - base for limit, base in zip(self.safe_limit, self.base)]
+        )
+        self.hazardous_free = _FreeCapacityTree(
+            [
+                min(hazardous_limit, safe_limit) - base
+                for hazardous_limit, safe_limit, base in zip(
+                    self.hazardous_limit, self.safe_limit, self.base
+                )
+            ]
+        )
+
+    def _fits(self, index, cargo):
+        loaded = self.base[index] + self.hazardous_mass[index] + self.safe_mass[index]
+        if loaded + cargo.load_mass > self.safe_limit[index]:
+            return False
+        if cargo.safe:
+            return True
+        hazardous_loaded = self.base[index] + self.hazardous_mass[index]
+        return hazardous_loaded + cargo.load_mass <= self.hazardous_limit[index]
+
+    def place(self, order):
+        """Assign ``order`` to the first container with room; return whether it fit."""
+        cargo = order.cargo
+        tree = self.safe_free if cargo.safe else self.hazardous_free
+        start = 0
+        if self.temperatures is not None:
+            start = bisect_left(self.temperatures, order.required_temperature)
+        while True:
+            index = tree.first_fit(cargo.load_mass, start)
+            if index < 0:
+                return False
+            # The tree holds limit - loaded; recheck with the rule's own arithmetic.
+            if self._fits(index, cargo):
+                break
+            start = index + 1
+
+        if cargo.safe:
+            self.safe_mass[index] += cargo.load_mass
+        else:
+            self.hazardous_mass[index] += cargo.load_mass
+        self.orders[index].append(order)
+        hazardous_loaded = self.base[index] + self.hazardous_mass[index]
+        loaded = hazardous_loaded + self.safe_mass[index]
+        self.safe_free.update(index, self.safe_limit[index] - loaded)
+        self.hazardous_free.update(
+            index,
+            min(
+                self.hazardous_limit[index] - hazardous_loaded,
+                self.safe_limit[index] - loaded,
+            ),
+        )
+        return True
+
+
+class LoadPlan:
+    """Cargo orders assigned to containers, ready to be applied in one go.
+
+    ``assignments`` pairs each container that receives cargo with its orders,
+    hazardous cargo first. ``unassigned`` pairs every order that did not fit
+    anywhere with the reason.
+    """
+
+    def __init__(self, assignments, unassigned, empty_first):
+        self.assignments = assignments
+        self.unassigned = unassigned
+        self.empty_first = empty_first
+        self._versions = [container.version for container, _ in assignments]
+
+    @property
+    def planned_mass(self):
+        return sum(
+            order.cargo.load_mass for _, orders in self.assignments for order in orders
+        )
+
+    @property
+    def planned_count(self):
+        return sum(len(orders) for _, orders in self.assignments)
+
+    def apply(self):
+        """Load every assignment and return a ``LoadReport`` of the orders."""
+        for (container, _), version in zip(self.assignments, self._versions):
+            if container.version != version:
+                raise Exception(
+                    f"Load plan is out of date: container {container.serial_number} has changed since it was planned"
+                )
+        accepted = []
+        for container, orders in self.assignments:
+            if self.empty_first:
+                container.empty_container()
+            container._load_many([order.cargo for order in orders])
+            accepted.extend(orders)
+        self._versions = [None] * len(self.assignments)
+        return LoadReport(accepted, list(self.unassigned), self.planned_mass)
+
+    def __repr__(self):
+        return f"LoadPlan(containers={len(self.assignments)}, orders={self.planned_count}, unassigned={len(self.unassigned)})"
+
+
+def plan_loading(containers, orders, empty_first=False):
+    """Assign ``orders`` to ``containers`` with first-fit decreasing.
+
+    ``orders`` are ``CargoOrder`` objects, or plain ``Cargo`` for
+    non-chilled cargo. Nothing is loaded until the plan is applied.
+    """
+    # A container can be listed twice, for example when it is both in a yard
+    # and on a ship; planning it twice would overfill it.
+    containers = {container.serial: container for container in containers}.values()
+    groups = {}
+    for container in containers:
+        key = container.type_of_cargo if container.kind == "chilled" else None
+        groups.setdefault(key, []).append(container)
+    pools = {
+        key: _Pool(members, empty_first, chilled=key is not None)
+        for key, members in groups.items()
+    }
+
+    orders = [
+        order if isinstance(order, CargoOrder) else CargoOrder(order) for order in orders
+    ]
+    orders.sort(key=lambda order: order.cargo.load_mass, reverse=True)
+    unassigned = []
+    for order in orders:
+        pool = pools.get(order.type_of_cargo)
+        if pool is None:
+            unassigned.append((order, "No container takes this type of cargo"))
+        elif not pool.place(order):
+            unassigned.append((order, "No container has room for this cargo"))
+
+    assignments = []
+    for pool in pools.values():
+        for container, planned in zip(pool.containers, pool.orders):
+            if planned:
+                planned.sort(key=lambda order: order.cargo.safe)
+                assignments.append((container, planned))
+    return LoadPlan(assignments, unassigned, empty_first)
@@ -0,0 +1,165 @@
+"""Lazy, paginated rendering of containers, ships and console listings.
+
+Tables are produced one page at a time by generators, so printing a ship
+with thousands of containers never builds the whole manifest up front and a
+caller can stop after the first page. Text that depends on a single
+container is cached and reused until the container's ``version`` changes,
+which happens whenever it is loaded or emptied.
+"""
+
+import itertools
+from collections import OrderedDict
+
+PAGE_SIZE = 20
+
+
+def tabulate(*args, **kwargs):
+    # tabulate is only needed for printing, so keep it out of import time.
+    from tabulate import tabulate
+
+    return tabulate(*args, **kwargs)
+
+
+def pages(items, page_size=PAGE_SIZE):
+    """Yield lists of at most ``page_size`` items, pulling from ``items`` lazily."""
+    iterator = iter(items)
+    while page := list(itertools.islice(iterator, page_size)):
+        yield page
+
+
+def page_count(total, page_size=PAGE_SIZE):
+    return max(1, -(-total // page_size))
+
+
+def get_page(items, number, page_size=PAGE_SIZE):
+    """Return page ``number`` (counted from 0) of a sequence by slicing it."""
+    start = number * page_size
+    return items[start : start + page_size]
+
+
+class RenderCache:
+    """Rendered text per container and render function.
+
+    An entry is reused as long as it belongs to the same container and the
+    container's ``version`` has not moved on. The least recently used
+    entries are dropped once ``maxsize`` is exceeded.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, container, render):
+        key = (render, container.serial)
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] == container.version and entry[0] == container:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        text = render(container)
+        self._entries[key] = (container, container.version, text)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return text
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+_cache = RenderCache()
+
+
+def get_render_cache():
+    return _cache
+
+
+def render_cached(container, render):
+    """Return ``render(container)``, reusing the text while the container is unchanged."""
+    return _cache.get(container, render)
+
+
+def container_table(container):
+    container_info = [
+        ["Serial Number", container.serial_number],
+        ["Type", "Container"],
+        ["Capacity", f"{container.capacity} kg"],
+        [
+            "Loaded Mass",
+            f"{container.loaded_mass} kg ({container.loaded_mass/container.capacity*100}%)",
+        ],
+        ["Height", f"{container.height} cm"],
+        ["Depth", f"{container.depth} cm"],
+        ["Dry Mass", f"{container.dry_mass} kg"],
+        ["Total Mass", f"{container.dry_mass + container.loaded_mass} kg"],
+    ]
+
+    if container.kind == "chilled":
+        container_info.extend(
+            [
+                ["Cargo Type", container.type_of_cargo],
+                ["Temperature", f"{container.temperature}°C"],
+            ]
+        )
+
+    return tabulate(container_info, headers=["Property", "Value"], tablefmt="grid")
+
+
+def cargo_pages(container, page_size=PAGE_SIZE):
+    """Yield the cargo table of ``container`` one rendered page at a time."""
+    for number, page in enumerate(pages(container.cargo, page_size)):
+        yield tabulate(
+            [
+                [i, item.load_mass, "Safe" if item.safe else "Hazardous"]
+                for i, item in enumerate(page, number * page_size + 1)
+            ],
+            headers=["Item #", "Mass (kg)", "Safety Status"],
+            tablefmt="grid",
+        )
+
+
+def cargo_summary(container):
+    hazardous = container._hazardous_items
+    cargo = container.cargo
+    summary = f"{len(cargo) if type(cargo) is list else cargo.item_count} items"
+    return f"{summary}, {hazardous} hazardous" if hazardous else summary
+
+
+def manifest_row(container):
+    return (
+        container.serial_number,
+        container.capacity,
+        container.loaded_mass,
+        cargo_summary(container),
+    )
+
+
+def manifest_pages(containers, page_size=PAGE_SIZE):
+    """Yield a ship's cargo manifest one rendered page at a time."""
+    for page in pages(containers, page_size):
+        yield tabulate(
+            [render_cached(container, manifest_row) for container in page],
+            headers=["Serial Number", "Capacity", "Loaded Mass", "Cargo"],
+            tablefmt="grid",
+        )
+
+
+def print_pages(rendered_pages, max_pages=None, total=None, page_size=PAGE_SIZE):
+    """Print pages as they are rendered, stopping after ``max_pages``.
+
+    Pages past the limit are never rendered. When ``total`` is known, a last
+    line says how many items were left out.
+    """
+    printed = 0
+    for text in itertools.islice(rendered_pages, max_pages):
+        print(text)
+        printed += 1
+    if total is not None and total > printed * page_size:
+        print(f"... {total - printed * page_size} more not shown")
@@ -0,0 +1,284 @@
+"""Serial numbers for containers.
+
+Serials have the form ``KON-<TYPE>-<n>`` where ``TYPE`` is one letter per
+container kind and ``n`` comes from a per-type counter. Internally a serial
+is a single integer key, ``n << 3 | type``, which is what storages index on;
+it only becomes a string when it is displayed.
+
+Serial strings that do not follow the scheme (for example ones imported
+from an older system) are interned and get a key of their own.
+
+``validate``/``validate_many`` check strings against the scheme with a single
+precompiled, fully anchored pattern, and ``SerialNumber`` is a validated
+serial that hashes and compares like its key, so it can be used directly
+wherever a storage expects a serial.
+"""
+
+import os
+import re
+import threading
+import weakref
+
+TYPE_CODES = ("M", "L", "G", "C")
+KIND_TYPES = {"general": 0, "liquid": 1, "gas": 2, "chilled": 3}
+CODE_TYPES = {code: index for index, code in enumerate(TYPE_CODES)}
+EXTERNAL_TYPE = 7
+TYPE_BITS = 3
+TYPE_MASK = (1 << TYPE_BITS) - 1
+
+SERIAL_PATTERN = re.compile(rf"KON-([{''.join(TYPE_CODES)}])-([1-9][0-9]*)")
+_match_serial = SERIAL_PATTERN.fullmatch
+
+_external_keys = {}
+_external_names = []
+_external_lock = threading.Lock()
+
+
+def pack_serial(type_index, number):
+    return number << TYPE_BITS | type_index
+
+
+def format_serial(key):
+    type_index = key & TYPE_MASK
+    if type_index == EXTERNAL_TYPE:
+        return _external_names[key >> TYPE_BITS]
+    return f"KON-{TYPE_CODES[type_index]}-{key >> TYPE_BITS}"
+
+
+def _parse(serial_number):
+    match = _match_serial(serial_number)
+    if match is None:
+        return None
+    return pack_serial(CODE_TYPES[match[1]], int(match[2]))
+
+
+class InvalidSerialNumberException(Exception):
+    pass
+
+
+def validate(serial_number):
+    """Return whether ``serial_number`` is a well-formed ``KON-<TYPE>-<n>`` serial."""
+    return isinstance(serial_number, str) and _match_serial(serial_number) is not None
+
+
+def validate_many(serial_numbers):
+    """Yield ``(serial_number, is_valid)`` for every item of an iterable.
+
+    Items are checked one at a time as they are pulled, so arbitrarily long
+    manifests can be validated in constant memory.
+    """
+    match = _match_serial
+    for serial_number in serial_numbers:
+        yield serial_number, isinstance(serial_number, str) and match(serial_number) is not None
+
+
+# Bounded so that streaming millions of serials cannot grow it forever.
+INTERN_LIMIT = 1 << 16
+_interned = {}
+
+
+class SerialNumber(int):
+    """A validated ``KON-<TYPE>-<n>`` serial.
+
+    Instances are integers equal to the serial's key, so they hash and
+    compare like the keys storages index on. Recently used serials are
+    interned: constructing the same serial twice returns the same object.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, serial_number):
+        if type(serial_number) is str:
+            match = _match_serial(serial_number)
+            if match is None:
+                raise InvalidSerialNumberException(
+                    f"Invalid serial number. Received: {serial_number}"
+                )
+            key = int(match[2]) << TYPE_BITS | CODE_TYPES[match[1]]
+        elif isinstance(serial_number, int):
+            if serial_number & TYPE_MASK >= len(TYPE_CODES) or serial_number >> TYPE_BITS < 1:
+                raise InvalidSerialNumberException(
+                    f"Invalid serial number. Received: {serial_number}"
+                )
+            key = int(serial_number)
+        else:
+            raise InvalidSerialNumberException(
+                f"Invalid serial number. Received: {serial_number}"
+            )
+        instance = _interned.get(key)
+        if instance is None:
+            if len(_interned) >= INTERN_LIMIT:
+                _interned.clear()
+            instance = _interned[key] = int.__new__(cls, key)
+        return instance
+
+    @property
+    def serial_number(self):
+        return format_serial(self)
+
+    def __str__(self):
+        return format_serial(self)
+
+    def __repr__(self):
+        return f"SerialNumber({format_serial(self)!r})"
+
+
+def serial_key(serial_number):
+    """Return the integer key of ``serial_number``, or None if it is unknown.
+
+    Accepts keys, ``KON-<TYPE>-<n>`` strings and previously interned
+    external serial strings.
+    """
+    if isinstance(serial_number, int):
+        return serial_number
+    if not isinstance(serial_number, str):
+        return None
+    key = _parse(serial_number)
+    if key is None:
+        key = _external_keys.get(serial_number)
+    return key
+
+
+def _valid_key(key):
+    type_index = key & TYPE_MASK
+    number = key >> TYPE_BITS
+    if type_index == EXTERNAL_TYPE:
+        return 0 <= number < len(_external_names)
+    return type_index < len(TYPE_CODES) and number >= 1
+
+
+def intern_serial(serial_number):
+    """Return the key for ``serial_number``, registering it if necessary.
+
+    Integer keys must be ``KON-<TYPE>-<n>`` keys or keys of interned
+    external serials.
+    """
+    if isinstance(serial_number, int):
+        if not _valid_key(serial_number):
+            raise InvalidSerialNumberException(
+                f"Invalid serial number. Received: {serial_number}"
+            )
+        if serial_number & TYPE_MASK != EXTERNAL_TYPE:
+            _allocator.observe(serial_number)
+        return serial_number
+    if not serial_number:
+        raise Exception("Serial number cannot be empty")
+    key = _parse(serial_number)
+    if key is not None:
+        _allocator.observe(key)
+        return key
+    with _external_lock:
+        key = _external_keys.get(serial_number)
+        if key is None:
+            key = pack_serial(EXTERNAL_TYPE, len(_external_names))
+            _external_names.append(serial_number)
+            _external_keys[serial_number] = key
+    return key
+
+
+class SerialAllocator:
+    """Hands out serial keys from one counter per container type.
+
+    ``reserve`` claims a contiguous block of numbers in one step, which is
+    what batch creation should use. With ``block_size`` above one,
+    ``allocate`` also reserves blocks behind the scenes and hands them out
+    per thread, so most allocations never touch the shared lock.
+
+    ``SerialAllocator.shared()`` keeps the counters in shared memory so
+    worker processes started from it (for example through a pool
+    initializer) never hand out the same serial twice.
+    """
+
+    def __init__(self, block_size=1):
+        self.block_size = block_size
+        self._counters = [1] * len(TYPE_CODES)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        _allocators.add(self)
+
+    @classmethod
+    def shared(cls, block_size=256):
+        import multiprocessing
+
+        allocator = cls(block_size)
+        allocator._counters = multiprocessing.RawArray("q", [1] * len(TYPE_CODES))
+        allocator._lock = multiprocessing.Lock()
+        return allocator
+
+    def __getstate__(self):
+        return {
+            "block_size": self.block_size,
+            "_counters": self._counters,
+            "_lock": self._lock,
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+        _allocators.add(self)
+
+    def reserve(self, kind, count):
+        """Reserve ``count`` consecutive serials and return their keys."""
+        type_index = KIND_TYPES[kind]
+        with self._lock:
+            start = self._counters[type_index]
+            self._counters[type_index] = start + count
+        return range(
+            pack_serial(type_index, start),
+            pack_serial(type_index, start + count),
+            1 << TYPE_BITS,
+        )
+
+    def allocate(self, kind):
+        if self.block_size == 1:
+            type_index = KIND_TYPES[kind]
+            with self._lock:
+                number = self._counters[type_index]
+                self._counters[type_index] = number + 1
+            return number << TYPE_BITS | type_index
+        local = self._local
+        try:
+            return next(local.blocks[kind])
+        except (AttributeError, KeyError, StopIteration):
+            pass
+        if not hasattr(local, "blocks"):
+            local.blocks = {}
+        block = local.blocks[kind] = iter(self.reserve(kind, self.block_size))
+        return next(block)
+
+    def observe(self, key):
+        """Make sure an explicitly assigned serial is never allocated again."""
+        type_index = key & TYPE_MASK
+        number = key >> TYPE_BITS
+        with self._lock:
+            if self._counters[type_index] <= number:
+                self._counters[type_index] = number + 1
+
+
+_allocators = weakref.WeakSet()
+
+
+def _forget_blocks():
+    # A forked child must not keep handing out blocks its parent reserved.
+    for allocator in _allocators:
+        allocator._local = threading.local()
+
+
+os.register_at_fork(after_in_child=_forget_blocks)
+
+_allocator = SerialAllocator()
+
+
+def get_allocator():
+    return _allocator
+
+
+def set_allocator(allocator):
+    """Install ``allocator`` for new containers and return the previous one."""
+    global _allocator
+    previous, _allocator = _allocator, allocator
+    return previous
+
+
+def allocate_serial(kind):
+    return _allocator.allocate(kind)
@@ -0,0 +1,318 @@
+"""Serve storage and ship operations to many clients over TCP.
+
+The protocol is newline-delimited JSON. Every request is an object with an
+``op`` and an optional ``id`` that is echoed back; every response is
+``{"id": ..., "ok": true, "result": ...}`` or
+``{"id": ..., "ok": false, "error": "..."}``.
+
+``target`` picks the storage an operation works on: ``"storage"`` (the
+default) for the yard, or the index of a ship. Operations:
+
+* ``add_ship`` with ``max_speed``, ``capacity`` and ``max_tonnage``;
+* ``add`` with a ``container`` record as written by ``solution.manifest``,
+  without ``loaded_mass`` or ledger fields and optionally with ``cargo`` as
+  ``[safe, load_mass]`` pairs, which are loaded one by one under the usual
+  rules;
+* ``remove`` and ``empty`` with a ``serial_number``;
+* ``replace`` with a ``serial_number`` and a ``container`` record;
+* ``load`` with a ``serial_number`` and ``cargo`` as ``[safe, load_mass]``,
+  plus ``type_of_cargo`` and ``required_temperature`` for chilled
+  containers;
+* ``transport`` with a ``serial_number``, a ``source`` and a
+  ``destination`` ship;
+* ``query`` with any of the ``Storage.query`` predicates, answered with
+  serial numbers, or with container records if ``records`` is true;
+* ``stats`` for the running totals of a storage;
+* ``batch`` with a list of ``requests``, answered with a list of responses.
+
+Clients may pipeline: send any number of requests without waiting, and the
+responses come back in the same order. Requests from all connections go
+through one bounded queue and are handled in batches of up to
+``max_batch``, with the responses of a connection written out together.
+When the queue is full, connections stop being read, and a connection
+whose client does not read its responses stops being read once
+``max_pending`` of them are waiting, so clients feel backpressure through
+TCP instead of the service buffering without bound.
+"""
+
+import asyncio
+import json
+
+from solution import Cargo, Ship, Storage
+from solution.manifest import LEDGER_FIELDS, build_container, container_record
+from solution.parallel import OVERFILL
+
+# The longest request line accepted, which bounds the size of a batch.
+MAX_LINE = 1 << 20
+
+_CLOSED = object()
+INVALID_JSON = b'{"id":null,"ok":false,"error":"Invalid JSON"}\n'
+
+
+def _cargo(pair):
+    safe, load_mass = pair
+    return Cargo(bool(safe), load_mass)
+
+
+def _build(record):
+    # Requests come from the network: the container starts empty and every
+    # item goes through the regular load rules.
+    for field in ("loaded_mass", *LEDGER_FIELDS):
+        if field in record:
+            raise Exception(f"Field not allowed: {field}")
+    container = build_container({"serial_number": None, **record, "loaded_mass": 0}, [])
+    extra = ()
+    if container.kind == "chilled":
+        extra = (container.type_of_cargo, container.temperature)
+    for pair in record.get("cargo", ()):
+        version = container.version
+        container.load_container(_cargo(pair), *extra)
+        if container.version == version:
+            raise Exception(OVERFILL)
+    return container
+
+
+class ContainerService:
+    """Handles requests against one yard ``storage`` and a list of ``ships``."""
+
+    def __init__(self, storage=None, ships=(), max_batch=256, max_pending=1024):
+        self.storage = Storage() if storage is None else storage
+        self.ships = list(ships)
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.handled = 0
+        self.batches = 0
+        self._queue = None
+        self._dispatcher = None
+        self._server = None
+        self._handlers = {
+            "add_ship": self._add_ship,
+            "add": self._add,
+            "remove": self._remove,
+            "replace": self._replace,
+            "load": self._load,
+            "empty": self._empty,
+            "transport": self._transport,
+            "query": self._query,
+            "stats": self._stats,
+            "batch": self._batch,
+        }
+
+    def _ship(self, index):
+        if (
+            isinstance(index, bool)
+            or not isinstance(index, int)
+            or not 0 <= index < len(self.ships)
+        ):
+            raise Exception(f"Unknown ship. Received: {index}")
+        return self.ships[index]
+
+    def _target(self, request):
+        target = request.get("target", "storage")
+        if target == "storage":
+            return self.storage
+        return self._ship(target).storage
+
+    def _container(self, request):
+        serial_number = request.get("serial_number")
+        container = self._target(request).get(serial_number)
+        if container is None:
+            raise Exception(f"Unknown container. Received: {serial_number}")
+        return container
+
+    def _add_ship(self, request):
+        ship = Ship(request["max_speed"], request["capacity"], request["max_tonnage"])
+        self.ships.append(ship)
+        return {"ship": len(self.ships) - 1}
+
+    def _add(self, request):
+        container = _build(request["container"])
+        target = request.get("target", "storage")
+        if target == "storage":
+            self.storage.add_container(container)
+        else:
+            self._ship(target).load_container(container)
+        return {"serial_number": container.serial_number}
+
+    def _remove(self, request):
+        self._target(request).remove_container(self._container(request))
+
+    def _replace(self, request):
+        container = _build(request["container"])
+        self._container(request)
+        self._target(request).replace_container(request["serial_number"], container)
+        return {"serial_number": container.serial_number}
+
+    def _load(self, request):
+        container = self._container(request)
+        extra = ()
+        if container.kind == "chilled":
+            extra = (request.get("type_of_cargo"), request.get("required_temperature"))
+        version = container.version
+        container.load_container(_cargo(request["cargo"]), *extra)
+        if container.version == version:
+            raise Exception(OVERFILL)
+        return {"loaded_mass": container.loaded_mass}
+
+    def _empty(self, request):
+        container = self._container(request)
+        container.empty_container()
+        return {"loaded_mass": container.loaded_mass}
+
+    def _transport(self, request):
+        source = self._ship(request.get("source"))
+        destination = self._ship(request.get("destination"))
+        container = source.storage.get(request.get("serial_number"))
+        if container is None:
+            raise Exception(f"Unknown container. Received: {request.get('serial_number')}")
+        source.transport_container(container, destination)
+
+    def _query(self, request):
+        predicates = {
+            name: request[name]
+            for name in (
+                "kind",
+                "type_of_cargo",
+                "min_temperature",
+                "max_temperature",
+                "min_fill",
+                "max_fill",
+                "hazardous",
+            )
+            if name in request
+        }
+        found = self._target(request).query(**predicates)
+        if request.get("records"):
+            return [container_record(container) for container in found]
+        return [container.serial_number for container in found]
+
+    def _stats(self, request):
+        storage = self._target(request)
+        return {
+            "container_count": storage.container_count,
+            "total_mass": storage.total_mass,
+            "loaded_mass": storage.loaded_mass,
+            "count_by_type": dict(storage.count_by_type),
+            "count_by_hazard": dict(storage.count_by_hazard),
+        }
+
+    def _batch(self, request):
+        return [self.handle(item) for item in request["requests"]]
+
+    def handle(self, request):
+        """Run one decoded request and return its response object."""
+        if not isinstance(request, dict):
+            return {"id": None, "ok": False, "error": "Request must be a JSON object"}
+        self.handled += 1
+        response = {"id": request.get("id")}
+        handler = self._handlers.get(request.get("op"))
+        try:
+            if handler is None:
+                raise Exception(f"Unknown operation. Received: {request.get('op')}")
+            response["result"] = handler(request)
+            response["ok"] = True
+        except KeyError as error:
+            response["ok"] = False
+            response["error"] = f"Missing field: {error.args[0]}"
+        except Exception as error:
+            response["ok"] = False
+            response["error"] = str(error)
+        return response
+
+    def _respond(self, line):
+        # Never raises: an exception here would stop the dispatcher, and with
+        # it every connection.
+        try:
+            request = json.loads(line)
+        except Exception:
+            # ValueError, or RecursionError for deeply nested input.
+            return INVALID_JSON
+        try:
+            return json.dumps(self.handle(request), separators=(",", ":")).encode() + b"\n"
+        except Exception as error:
+            response = {"id": None, "ok": False, "error": f"Request failed: {error}"}
+            return json.dumps(response, separators=(",", ":")).encode() + b"\n"
+
+    async def _dispatch(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            for line, future in batch:
+                if not future.cancelled():
+                    future.set_result(self._respond(line))
+            self.batches += 1
+            # Let readers and writers run before the next batch.
+            await asyncio.sleep(0)
+
+    async def _send(self, writer, responses):
+        # Writes responses in request order, with everything already answered
+        # going out in the same write.
+        future = await responses.get()
+        while future is not _CLOSED:
+            chunks = [await future]
+            future = None
+            while not responses.empty():
+                future = responses.get_nowait()
+                if future is _CLOSED or not future.done():
+                    break
+                chunks.append(future.result())
+                future = None
+            writer.write(b"".join(chunks))
+            await writer.drain()
+            if future is None:
+                future = await responses.get()
+
+    async def _serve_client(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        responses = asyncio.Queue(self.max_pending)
+        sender = loop.create_task(self._send(writer, responses))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    future = loop.create_future()
+                    future.set_result(b'{"id":null,"ok":false,"error":"Request too long"}\n')
+                    await responses.put(future)
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                future = loop.create_future()
+                await responses.put(future)
+                await self._queue.put((line, future))
+            await responses.put(_CLOSED)
+            await sender
+        except (ConnectionError, asyncio.CancelledError):
+            sender.cancel()
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start listening and return the ``(host, port)`` actually bound."""
+        self._queue = asyncio.Queue(self.max_pending)
+        self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+        self._server = await asyncio.start_server(
+            self._serve_client, host, port, limit=MAX_LINE
+        )
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._dispatcher.cancel()
+
+
+async def serve(storage=None, ships=(), host="127.0.0.1", port=8765, service=None):
+    """Run ``service``, or a new ``ContainerService`` over ``storage`` and ``ships``, until cancelled."""
+    if service is None:
+        service = ContainerService(storage, ships)
+    host, port = await service.start(host, port)
+    print(f"Listening on {host}:{port}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
@@ -0,0 +1,483 @@
+"""Binary snapshots of storages and ships, with an append-only journal.
+
+``write_snapshot`` saves a list of locations (``Storage`` or ``Ship``
+objects) into a single file of fixed-size records:
+
+* a header with the section offsets,
+* one record per location (ship parameters),
+* one record per container, pointing at a contiguous run of cargo records
+  and, for cargo kept in a ``CargoLedger``, holding the ledger's sums and
+  settings,
+* the cargo records,
+* a serial index of ``(key, row)`` pairs sorted by key,
+* a JSON string table for chilled cargo types, non-standard serials and
+  ledger spill paths.
+
+The file is written to a temporary file and renamed into place, so a crash
+never leaves a half-written snapshot behind. ``Snapshot`` opens it with
+``mmap`` and answers lookups straight from the mapped records with a binary
+search over the index; containers are only turned into objects when asked
+for.
+
+A ``Journal`` records every change made through it since the last snapshot.
+``checkpoint`` folds the journal into a new snapshot; ``restore`` rebuilds
+the locations from a snapshot and replays the journal on top.
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+from solution import CONTAINER_TYPES, Cargo, CargoLedger, Ship, Storage
+from solution.manifest import build_container, container_record
+from solution.serials import EXTERNAL_TYPE, TYPE_MASK, pack_serial, serial_key
+
+MAGIC = b"KONSNAP1"
+VERSION = 2
+
+HEADER = struct.Struct("<8sIIQQQQQQQQ")
+LOCATION = struct.Struct("<Bddd")
+CONTAINER = struct.Struct("<qBIddddddqqiiddqqqi")
+CARGO = struct.Struct("<?d")
+INDEX = struct.Struct("<qq")
+
+KINDS = list(CONTAINER_TYPES)
+STORAGE_LOCATION, SHIP_LOCATION = 0, 1
+
+
+def _atomic_write(path, chunks):
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as file:
+        try:
+            for chunk in chunks:
+                file.write(chunk)
+            file.flush()
+            os.fsync(file.fileno())
+        except BaseException:
+            file.close()
+            os.unlink(file.name)
+            raise
+    os.replace(file.name, path)
+
+
+def write_snapshot(path, locations):
+    """Atomically write ``locations`` (storages and ships) to ``path``."""
+    strings = []
+    string_ids = {}
+
+    def string_id(value):
+        marker = json.dumps(value)
+        if marker not in string_ids:
+            string_ids[marker] = len(strings)
+            strings.append(value)
+        return string_ids[marker]
+
+    location_records = bytearray()
+    container_records = bytearray()
+    cargo_records = bytearray()
+    index = []
+    cargo_count = 0
+    for location_id, location in enumerate(locations):
+        if isinstance(location, Ship):
+            location_records += LOCATION.pack(
+                SHIP_LOCATION, location.max_speed, location.capacity, location.max_tonnage
+            )
+            storage = location.storage
+        else:
+            location_records += LOCATION.pack(STORAGE_LOCATION, 0, 0, 0)
+            storage = location
+        for container in storage.containers:
+            key = container.serial
+            serial_text = -1
+            if key & TYPE_MASK == EXTERNAL_TYPE:
+                # Interned keys only mean something inside this process.
+                serial_text = string_id(container.serial_number)
+                key = pack_serial(EXTERNAL_TYPE, serial_text)
+            chilled = container.kind == "chilled"
+            cargo = container.cargo
+            if type(cargo) is CargoLedger:
+                ledger = (
+                    cargo.safe_mass,
+                    cargo.hazardous_mass,
+                    cargo.safe_items,
+                    cargo.hazardous_items,
+                    -1 if cargo.max_items is None else cargo.max_items,
+                    -1 if cargo.spill_path is None else string_id(cargo.spill_path),
+                )
+            else:
+                ledger = (0, 0, -1, 0, -1, -1)
+            index.append((key, len(index)))
+            container_records += CONTAINER.pack(
+                key,
+                KINDS.index(container.kind),
+                location_id,
+                container.capacity,
+                container.height,
+                container.dry_mass,
+                container.depth,
+                container.loaded_mass,
+                container.temperature if chilled else 0,
+                cargo_count,
+                len(container.cargo),
+                string_id(container.type_of_cargo) if chilled else -1,
+                serial_text,
+                *ledger,
+            )
+            for item in container.cargo:
+                cargo_records += CARGO.pack(item.safe, item.load_mass)
+            cargo_count += len(container.cargo)
+
+    index.sort()
+    index_records = b"".join(INDEX.pack(key, row) for key, row in index)
+    string_table = json.dumps(strings).encode()
+
+    offset = HEADER.size
+    offsets = []
+    for section in (location_records, container_records, cargo_records, index_records):
+        offsets.append(offset)
+        offset += len(section)
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        len(locations),
+        len(index),
+        cargo_count,
+        *offsets,
+        offset,
+        len(string_table),
+    )
+    _atomic_write(
+        path,
+        [header, location_records, container_records, cargo_records, index_records, string_table],
+    )
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            self.location_count,
+            self.container_count,
+            self.cargo_count,
+            self._locations_offset,
+            self._containers_offset,
+            self._cargo_offset,
+            self._index_offset,
+            strings_offset,
+            strings_length,
+        ) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise Exception(f"Not a container snapshot. Received: {path}")
+        self._strings = json.loads(self._map[strings_offset : strings_offset + strings_length])
+        self._external_serials = None
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.container_count
+
+    def _snapshot_key(self, serial_number):
+        key = serial_key(serial_number)
+        if key is not None and key & TYPE_MASK != EXTERNAL_TYPE:
+            return key
+        if self._external_serials is None:
+            self._external_serials = {
+                text: pack_serial(EXTERNAL_TYPE, position)
+                for position, text in enumerate(self._strings)
+                if isinstance(text, str)
+            }
+        if not isinstance(serial_number, str):
+            return None
+        return self._external_serials.get(serial_number)
+
+    def find(self, serial_number):
+        """Return the row of ``serial_number`` by binary search, or None."""
+        key = self._snapshot_key(serial_number)
+        if key is None:
+            return None
+        low, high = 0, self.container_count
+        while low < high:
+            middle = (low + high) // 2
+            found, row = INDEX.unpack_from(self._map, self._index_offset + middle * INDEX.size)
+            if found < key:
+                low = middle + 1
+            elif found > key:
+                high = middle
+            else:
+                return row
+        return None
+
+    def row(self, row):
+        """Return the raw fields of container ``row`` as a dict."""
+        (
+            key,
+            kind,
+            location,
+            capacity,
+            height,
+            dry_mass,
+            depth,
+            loaded_mass,
+            temperature,
+            cargo_start,
+            cargo_count,
+            cargo_type,
+            serial_text,
+            safe_mass,
+            hazardous_mass,
+            safe_items,
+            hazardous_items,
+            max_items,
+            spill_path,
+        ) = CONTAINER.unpack_from(self._map, self._containers_offset + row * CONTAINER.size)
+        record = {
+            "serial_number": key if serial_text < 0 else self._strings[serial_text],
+            "type": KINDS[kind],
+            "location": location,
+            "capacity": capacity,
+            "height": height,
+            "dry_mass": dry_mass,
+            "depth": depth,
+            "loaded_mass": loaded_mass,
+            "cargo_start": cargo_start,
+            "cargo_count": cargo_count,
+        }
+        if cargo_type >= 0:
+            record["type_of_cargo"] = self._strings[cargo_type]
+            record["temperature"] = temperature
+        if safe_items >= 0:
+            record["safe_mass"] = safe_mass
+            record["hazardous_mass"] = hazardous_mass
+            record["safe_items"] = safe_items
+            record["hazardous_items"] = hazardous_items
+            record["max_items"] = None if max_items < 0 else max_items
+            record["spill_path"] = None if spill_path < 0 else self._strings[spill_path]
+        return record
+
+    def cargo(self, row):
+        record = self.row(row)
+        start = self._cargo_offset + record["cargo_start"] * CARGO.size
+        return [
+            Cargo(*CARGO.unpack_from(self._map, start + i * CARGO.size))
+            for i in range(record["cargo_count"])
+        ]
+
+    def container(self, row):
+        """Build the container stored at ``row``."""
+        return build_container(self.row(row), self.cargo(row))
+
+    def get(self, serial_number):
+        row = self.find(serial_number)
+        return None if row is None else self.container(row)
+
+    def locations(self):
+        """Rebuild every location with its containers."""
+        locations = []
+        for location in range(self.location_count):
+            kind, max_speed, capacity, max_tonnage = LOCATION.unpack_from(
+                self._map, self._locations_offset + location * LOCATION.size
+            )
+            if kind == SHIP_LOCATION:
+                locations.append(Ship(max_speed, int(capacity), max_tonnage))
+            else:
+                locations.append(Storage())
+        for row in range(self.container_count):
+            location = locations[self.row(row)["location"]]
+            storage = location.storage if isinstance(location, Ship) else location
+            storage._add(self.container(row))
+        return locations
+
+
+def _repair_tail(path):
+    """Make the journal at ``path`` end with a complete line.
+
+    A line torn by a crash is cut off, so the next entry does not run into
+    it; a last entry that is only missing its newline is kept, since
+    ``replay`` already applied it.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "r+b") as file:
+        end = file.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(position - 4096, 0)
+            file.seek(start)
+            newline = file.read(position - start).rfind(b"\n")
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        if position == end:
+            return
+        file.seek(position)
+        try:
+            json.loads(file.read())
+        except ValueError:
+            file.truncate(position)
+        else:
+            file.write(b"\n")
+
+
+class Journal:
+    """Append-only log of the changes made since the last snapshot.
+
+    Operations go through the journal, which applies them to ``locations``
+    and appends one JSON line per change that actually happened. A line torn
+    by an earlier crash is cut off when the journal is opened.
+    """
+
+    def __init__(self, path, locations):
+        self.path = path
+        self.locations = locations
+        _repair_tail(path)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _storage(self, location):
+        location = self.locations[location]
+        return location.storage if isinstance(location, Ship) else location
+
+    def _append(self, *entry):
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def add_container(self, location, container):
+        self._storage(location).add_container(container)
+        self._append("add", location, _record(container))
+
+    def remove_container(self, location, container):
+        self._storage(location).remove_container(container)
+        self._append("remove", location, container.serial_number)
+
+    def replace_container(self, location, serial_number, new_container):
+        storage = self._storage(location)
+        old = storage.get(serial_number)
+        if old is None:
+            return
+        storage.replace_container(serial_number, new_container)
+        # The serial number may have been given as a key; replay needs the string.
+        self._append("replace", location, old.serial_number, _record(new_container))
+
+    def load_container(self, container, cargo, *requirements):
+        # Only an accepted load bumps the version; a ledger may keep the
+        # number of items the same.
+        version = container.version
+        container.load_container(cargo, *requirements)
+        if container.version != version:
+            self._append("load", container.serial_number, cargo.safe, cargo.load_mass)
+
+    def empty_container(self, container):
+        container.empty_container()
+        self._append("empty", container.serial_number)
+
+    def truncate(self):
+        self._file.truncate(0)
+        self._file.seek(0)
+
+
+def _record(container):
+    record = container_record(container)
+    record["cargo"] = [[item.safe, item.load_mass] for item in container.cargo]
+    return record
+
+
+def _build(record):
+    cargo = [Cargo(safe, load_mass) for safe, load_mass in record.pop("cargo")]
+    return build_container(record, cargo)
+
+
+def _find(locations, serial_number):
+    for location in locations:
+        storage = location.storage if isinstance(location, Ship) else location
+        container = storage.get(serial_number)
+        if container is not None:
+            return container
+    raise Exception(f"Journal refers to an unknown container. Received: {serial_number}")
+
+
+def replay(path, locations):
+    """Apply the journal at ``path`` to ``locations``; return the entry count.
+
+    A torn last line, left by a crash in the middle of an append, is ignored.
+    """
+    if not os.path.exists(path):
+        return 0
+    count = 0
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            operation, *arguments = entry
+            match operation:
+                case "add":
+                    location, record = arguments
+                    storage = locations[location]
+                    storage = storage.storage if isinstance(storage, Ship) else storage
+                    storage._add(_build(record))
+                case "remove":
+                    location, serial_number = arguments
+                    storage = locations[location]
+                    storage = storage.storage if isinstance(storage, Ship) else storage
+                    storage.remove_container_by_serial_number(serial_number)
+                case "replace":
+                    location, serial_number, record = arguments
+                    storage = locations[location]
+                    storage = storage.storage if isinstance(storage, Ship) else storage
+                    storage.replace_container(serial_number, _build(record))
+                case "load":
+                    # The load was accepted when it was journaled, and the
+                    # rules are deterministic, so running it again reproduces it.
+                    serial_number, safe, load_mass = arguments
+                    container = _find(locations, serial_number)
+                    requirements = (
+                        (container.type_of_cargo, container.temperature)
+                        if container.kind == "chilled"
+                        else ()
+                    )
+                    container.load_container(Cargo(safe, load_mass), *requirements)
+                case "empty":
+                    (serial_number,) = arguments
+                    _find(locations, serial_number).empty_container()
+            count += 1
+    return count
+
+
+def checkpoint(snapshot_path, journal):
+    """Write the journal's locations to a new snapshot and clear the journal."""
+    write_snapshot(snapshot_path, journal.locations)
+    journal.truncate()
+
+
+def restore(snapshot_path, journal_path=None):
+    """Rebuild the locations saved at ``snapshot_path`` plus any journaled changes."""
+    with Snapshot(snapshot_path) as snapshot:
+        locations = snapshot.locations()
+    if journal_path is not None:
+        replay(journal_path, locations)
+    return locations
@@ -0,0 +1,199 @@
+"""Decide which yard containers go on which ships.
+
+``plan_stowage`` fills the ships one after another from the containers left
+in a ``Storage``. Each ship is a knapsack: at most ``capacity`` containers
+in total and at most ``max_tonnage`` kilograms, counting what is already on
+board.
+
+By default the loaded mass is maximized. Every ship first gets a greedy
+answer (heaviest containers first). Unless that is already within one bucket
+of full, a dynamic program over bucketed masses then tries to do better. Masses are rounded up to ``buckets`` equal steps
+of the remaining tonnage, so whatever the program picks is guaranteed to
+fit. The bucket sums reachable with ``k`` containers are kept as one integer
+bitset per ``k``, so the work is about ``containers * capacity`` big-integer
+shifts. The program gives up once the ship's share of ``time_budget`` runs
+out, and the greedy answer is kept. More buckets get closer to the optimum
+and cost more time.
+
+With a ``priority`` function the ships take containers by descending
+priority instead, heaviest first among equal priorities, skipping any that
+no longer fit.
+"""
+
+import math
+import time
+
+from solution import LoadReport
+from solution.locking import locked
+
+
+def _not_in_yard(container):
+    return f"Container with the following serial number: {container.serial_number} is not in the storage."
+
+
+class ShipStowage:
+    """The containers planned for one ship and how they were chosen."""
+
+    __slots__ = ("ship", "containers", "mass", "method")
+
+    def __init__(self, ship, containers, mass, method):
+        self.ship = ship
+        self.containers = containers
+        self.mass = mass
+        self.method = method
+
+    def __repr__(self):
+        return f"ShipStowage(containers={len(self.containers)}, mass={self.mass}, method={self.method!r})"
+
+
+class StowagePlan:
+    """Containers assigned to ships; ``unassigned`` were left in the yard."""
+
+    def __init__(self, storage, stowages, unassigned):
+        self.storage = storage
+        self.stowages = stowages
+        self.unassigned = unassigned
+
+    @property
+    def total_mass(self):
+        return sum(stowage.mass for stowage in self.stowages)
+
+    def apply(self):
+        """Move the planned containers from the yard onto their ships.
+
+        Each ship is loaded as one all-or-nothing batch, under the locks of
+        the yard, the ship and the containers, and only if every container
+        is still in the yard. Containers of a rejected batch stay where they
+        are. Returns one ``LoadReport`` per ship.
+        """
+        return [self._apply(stowage) for stowage in self.stowages]
+
+    def _apply(self, stowage):
+        containers = stowage.containers
+        if not containers:
+            return LoadReport([], [], 0)
+        storage = self.storage
+        with locked(containers, (storage, stowage.ship.storage)):
+            # A container may have moved since the plan was made.
+            missing = {
+                id(container)
+                for container in containers
+                if storage.get(container.serial) is not container
+            }
+            if missing:
+                reason = "Batch rejected: it contains invalid containers"
+                rejected = [
+                    (container, _not_in_yard(container) if id(container) in missing else reason)
+                    for container in containers
+                ]
+                return LoadReport([], rejected, 0)
+            report = stowage.ship._load_batch(containers)
+            for container in report.accepted:
+                storage.remove_container(container)
+        return report
+
+    def __repr__(self):
+        return f"StowagePlan(ships={len(self.stowages)}, total_mass={self.total_mass}, unassigned={len(self.unassigned)})"
+
+
+def _mass(container):
+    return container.dry_mass + container.loaded_mass
+
+
+def _greedy(candidates, slots, tonnage, key):
+    chosen = []
+    mass = 0
+    for container in sorted(candidates, key=key, reverse=True):
+        if len(chosen) == slots:
+            break
+        container_mass = _mass(container)
+        if mass + container_mass <= tonnage:
+            chosen.append(container)
+            mass += container_mass
+    return chosen, mass
+
+
+def _bucketed(candidates, slots, tonnage, buckets, deadline):
+    """Best bucket-rounded subset of at most ``slots`` containers, or None on timeout."""
+    unit = tonnage / buckets
+    weights = [math.ceil(_mass(container) / unit) for container in candidates]
+    mask = (1 << (buckets + 1)) - 1
+    reachable = [1] + [0] * slots
+    # (k, bucket sum) -> index of the container that first reached it; that
+    # state was built from one reached earlier, which makes backtracking safe.
+    first = {}
+    for index, weight in enumerate(weights):
+        if time.perf_counter() > deadline:
+            return None
+        for count in range(min(index + 1, slots), 0, -1):
+            previous = reachable[count - 1]
+            if not previous:
+                continue
+            added = (previous << weight) & mask & ~reachable[count]
+            if added:
+                reachable[count] |= added
+                while added:
+                    lowest = added & -added
+                    first[count, lowest.bit_length() - 1] = index
+                    added ^= lowest
+        if any(row >> buckets for row in reachable):
+            break  # The ship is full to the last bucket.
+
+    count, total = max(
+        ((count, row.bit_length() - 1) for count, row in enumerate(reachable) if row),
+        key=lambda state: (state[1], -state[0]),
+    )
+    chosen = []
+    while count:
+        index = first[count, total]
+        chosen.append(candidates[index])
+        total -= weights[index]
+        count -= 1
+    chosen.reverse()
+    return chosen
+
+
+def plan_stowage(storage, ships, priority=None, buckets=1000, time_budget=None):
+    """Assign the containers in ``storage`` to ``ships`` and return a ``StowagePlan``.
+
+    Nothing is moved until the plan is applied.
+    """
+    start = time.perf_counter()
+    remaining = list(storage.containers)
+    stowages = []
+    for position, ship in enumerate(ships):
+        slots = ship.capacity - ship.storage.container_count
+        tonnage = ship.max_tonnage - ship.current_tonnage
+        candidates = [container for container in remaining if _mass(container) <= tonnage]
+        if slots <= 0 or not candidates:
+            stowages.append(ShipStowage(ship, [], 0, "empty"))
+            continue
+
+        if priority is not None:
+            chosen, mass = _greedy(
+                candidates, slots, tonnage, lambda c: (priority(c), _mass(c))
+            )
+            method = "priority"
+        else:
+            chosen, mass = _greedy(candidates, slots, tonnage, _mass)
+            method = "greedy"
+            # Within one bucket of full, rounding leaves the program nothing to win.
+            if tonnage - mass > tonnage / buckets and len(chosen) < len(candidates):
+                if time_budget is None:
+                    deadline = float("inf")
+                else:
+                    left = time_budget - (time.perf_counter() - start)
+                    deadline = time.perf_counter() + left / (len(ships) - position)
+                better = _bucketed(
+                    candidates, min(slots, len(candidates)), tonnage, buckets, deadline
+                )
+                if better is not None:
+                    better_mass = sum(_mass(container) for container in better)
+                    # Rounding up keeps the pick within tonnage; check anyway.
+                    if mass < better_mass <= tonnage:
+                        chosen, mass, method = better, better_mass, "bucketed"
+
+        stowages.append(ShipStowage(ship, chosen, mass, method))
+        taken = {container.serial for container in chosen}
+        remaining = [container for container in remaining if container.serial not in taken]
+    return StowagePlan(storage, stowages, remaining)
@@ -0,0 +1,243 @@
+"""Columnar storage for very large numbers of containers.
+
+A ``ContainerTable`` keeps every numeric container attribute in a typed
+``array`` column, so a row costs a few dozen bytes instead of a full Python
+object graph. ``table[row]`` returns a ``ContainerRow``, a two-field view
+that behaves like the matching ``Container`` subclass: it can be loaded,
+emptied, printed and put into a ``Storage``.
+
+Cargo items and storage memberships are only kept for rows that have them.
+"""
+
+from array import array
+
+from solution import (
+    ChilledContainer,
+    Container,
+    ContainerForLiquids,
+    GasContainer,
+    HazardNotifier,
+    TemperatureException,
+)
+from solution.serials import allocate_serial, format_serial, intern_serial, serial_key
+
+KINDS = (Container, ContainerForLiquids, GasContainer, ChilledContainer)
+CHILLED = KINDS.index(ChilledContainer)
+
+NUMERIC_COLUMNS = ("capacity", "height", "dry_mass", "depth", "loaded_mass", "temperature")
+
+
+class ContainerTable:
+    def __init__(self):
+        self.kind = array("b")
+        self.serial = array("q")
+        for name in NUMERIC_COLUMNS:
+            setattr(self, name, array("d"))
+        self.hazardous_items = array("I")
+        self.version = array("I")
+        self.cargo_type = array("i")
+        self._cargo_types = []
+        self._cargo_type_codes = {}
+        self._rows_by_serial = None
+        self._cargo = {}
+        self._storages = {}
+
+    def append(
+        self,
+        container_type,
+        capacity,
+        height,
+        dry_mass,
+        depth,
+        type_of_cargo=None,
+        temperature=None,
+        serial_number=None,
+    ):
+        """Add an empty container of ``container_type`` and return its row."""
+        if capacity is None or height is None or dry_mass is None or depth is None:
+            raise Exception("Capacity, height, dry mass or depth cannot be None")
+        if capacity <= 0 or height <= 0 or dry_mass <= 0 or depth <= 0:
+            raise Exception(
+                "Invalid capacity, height, dry mass or depth cannot be lower than 0"
+            )
+        kind = KINDS.index(container_type)
+        if kind == CHILLED:
+            if type_of_cargo is None or temperature is None:
+                raise Exception("Type of cargo and temperature cannot be None")
+            code = self._cargo_type_codes.get(type_of_cargo)
+            if code is None:
+                code = self._cargo_type_codes[type_of_cargo] = len(self._cargo_types)
+                self._cargo_types.append(type_of_cargo)
+        else:
+            code = -1
+            temperature = float("nan")
+
+        row = len(self.kind)
+        serial = (
+            allocate_serial(container_type.kind)
+            if serial_number is None
+            else intern_serial(serial_number)
+        )
+        self.kind.append(kind)
+        self.serial.append(serial)
+        self.capacity.append(capacity)
+        self.height.append(height)
+        self.dry_mass.append(dry_mass)
+        self.depth.append(depth)
+        self.loaded_mass.append(0)
+        self.temperature.append(temperature)
+        self.hazardous_items.append(0)
+        self.version.append(0)
+        self.cargo_type.append(code)
+        if self._rows_by_serial is not None:
+            self._rows_by_serial[serial] = row
+        return row
+
+    def __len__(self):
+        return len(self.kind)
+
+    def __getitem__(self, row):
+        if not -len(self.kind) <= row < len(self.kind):
+            raise IndexError("container table row out of range")
+        return ContainerRow(self, row % len(self.kind))
+
+    def __iter__(self):
+        for row in range(len(self.kind)):
+            yield ContainerRow(self, row)
+
+    def find(self, serial_number):
+        """Return the row view for ``serial_number``, or None.
+
+        The serial index is only built on the first lookup, since it costs
+        far more memory per row than the columns themselves.
+        """
+        if self._rows_by_serial is None:
+            self._rows_by_serial = {serial: row for row, serial in enumerate(self.serial)}
+        row = self._rows_by_serial.get(serial_key(serial_number))
+        return None if row is None else ContainerRow(self, row)
+
+    def total_mass(self):
+        return sum(self.dry_mass) + sum(self.loaded_mass)
+
+    @property
+    def nbytes(self):
+        columns = (
+            "kind",
+            "serial",
+            "hazardous_items",
+            "version",
+            "cargo_type",
+        ) + NUMERIC_COLUMNS
+        return sum(
+            getattr(self, name).itemsize * len(getattr(self, name)) for name in columns
+        )
+
+
+def _column(name):
+    def get(self):
+        return getattr(self._table, name)[self._row]
+
+    def set(self, value):
+        getattr(self._table, name)[self._row] = value
+
+    return property(get, set)
+
+
+class ContainerRow:
+    """A view of one ``ContainerTable`` row with the ``Container`` API."""
+
+    __slots__ = ("_table", "_row")
+
+    hazard_notifier = HazardNotifier()
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    capacity = _column("capacity")
+    height = _column("height")
+    dry_mass = _column("dry_mass")
+    depth = _column("depth")
+    loaded_mass = _column("loaded_mass")
+    _hazardous_items = _column("hazardous_items")
+    version = _column("version")
+
+    @property
+    def container_type(self):
+        return KINDS[self._table.kind[self._row]]
+
+    @property
+    def kind(self):
+        return self.container_type.kind
+
+    @property
+    def serial(self):
+        return self._table.serial[self._row]
+
+    @property
+    def serial_number(self):
+        return format_serial(self._table.serial[self._row])
+
+    @property
+    def temperature(self):
+        if self._table.kind[self._row] != CHILLED:
+            raise AttributeError("temperature")
+        return self._table.temperature[self._row]
+
+    @property
+    def type_of_cargo(self):
+        if self._table.kind[self._row] != CHILLED:
+            raise AttributeError("type_of_cargo")
+        return self._table._cargo_types[self._table.cargo_type[self._row]]
+
+    @property
+    def residue_ratio(self):
+        return self.container_type.residue_ratio
+
+    @property
+    def cargo(self):
+        return self._table._cargo.setdefault(self._row, [])
+
+    @cargo.setter
+    def cargo(self, items):
+        if items or type(items) is not list:
+            self._table._cargo[self._row] = items
+        else:
+            self._table._cargo.pop(self._row, None)
+
+    @property
+    def _storages(self):
+        return self._table._storages.setdefault(self._row, [])
+
+    def _load_limit(self, cargo):
+        return self.container_type._load_limit(self, cargo)
+
+    def load_container(self, cargo, *requirements):
+        if self._table.kind[self._row] == CHILLED:
+            try:
+                ChilledContainer._check_requirements(self, cargo, *requirements)
+            except TemperatureException:
+                self.hazard_notifier.warn_hazard(self, TemperatureException)
+                raise
+        elif requirements:
+            raise TypeError("Only chilled containers take cargo requirements")
+        Container.load_container(self, cargo)
+
+    is_hazardous = Container.is_hazardous
+    empty_container = Container.empty_container
+    print_info = Container.print_info
+    _notify_storages = Container._notify_storages
+    _load_many = Container._load_many
+    _restore = Container._restore
+    use_cargo_ledger = Container.use_cargo_ledger
+
+    def __eq__(self, other):
+        if not isinstance(other, ContainerRow):
+            return NotImplemented
+        return self._table is other._table and self._row == other._row
+
+    def __hash__(self):
+        return hash((id(self._table), self._row))
+
+    def __repr__(self):
+        return f"<ContainerRow {self.serial_number} of {self.container_type.__name__}>"
@@ -0,0 +1,163 @@
+"""A terminal: its ships and yard storages, and where every container is.
+
+``Terminal`` registers ships and yard storages and keeps an index from
+serial numbers to the ship or yard each container is in. The storages
+report every container that comes or goes, whichever way it happens:
+``load_container``, ``unload_container``, ``replace_container``,
+``transport_container``, the storage methods, transactions. ``locate`` is
+therefore a dictionary lookup instead of a scan of every ship.
+
+``move(serial_numbers, destination)`` moves containers from wherever they
+are to a ship or yard, as one all-or-nothing ``Transaction``.
+
+A storage belongs to at most one terminal. Should a container sit in more
+than one of its locations at once, ``locate`` returns the one it entered
+last and ``locations`` all of them.
+"""
+
+import threading
+
+from solution import Ship, serial_key
+from solution.transactions import Transaction, TransactionReport
+
+
+NOT_REGISTERED = "Destination does not belong to the terminal"
+
+
+def _not_in_terminal(serial_number):
+    return f"Container with the following serial number: {serial_number} is not in the terminal."
+
+
+class Terminal:
+    """Ships and yard storages of one terminal, with the location of every container."""
+
+    def __init__(self, yards=(), ships=()):
+        self.yards = []
+        self.ships = []
+        # Ship or yard for each registered storage, by id.
+        self._owners = {}
+        # Serial key to the locations holding that container, oldest first.
+        self._locations = {}
+        # Only guards the two dicts above; nothing else is locked under it.
+        self._lock = threading.Lock()
+        for yard in yards:
+            self.add_yard(yard)
+        for ship in ships:
+            self.add_ship(ship)
+
+    def _register(self, location, storage):
+        with storage._lock:
+            if storage._registry is not None:
+                raise Exception("Storage already belongs to a terminal")
+            storage._registry = self
+            with self._lock:
+                self._owners[id(storage)] = location
+            for container in storage.containers:
+                self._entered(container, storage)
+
+    def _unregister(self, storage):
+        with storage._lock:
+            for container in storage.containers:
+                self._left(container, storage)
+            storage._registry = None
+            with self._lock:
+                del self._owners[id(storage)]
+
+    def add_yard(self, storage):
+        self._register(storage, storage)
+        self.yards.append(storage)
+        return storage
+
+    def add_ship(self, ship):
+        self._register(ship, ship.storage)
+        self.ships.append(ship)
+        return ship
+
+    def remove_yard(self, storage):
+        self.yards.remove(storage)
+        self._unregister(storage)
+
+    def remove_ship(self, ship):
+        self.ships.remove(ship)
+        self._unregister(ship.storage)
+
+    # Called by the registered storages, under their lock.
+
+    def _entered(self, container, storage):
+        with self._lock:
+            location = self._owners[id(storage)]
+            self._locations.setdefault(container.serial, []).append(location)
+
+    def _left(self, container, storage):
+        with self._lock:
+            location = self._owners[id(storage)]
+            locations = self._locations[container.serial]
+            locations.remove(location)
+            if not locations:
+                del self._locations[container.serial]
+
+    def locate(self, serial_number):
+        """Return the ship or yard holding ``serial_number``, or None."""
+        with self._lock:
+            locations = self._locations.get(serial_key(serial_number))
+            return locations[-1] if locations else None
+
+    def locations(self, serial_number):
+        with self._lock:
+            return list(self._locations.get(serial_key(serial_number), ()))
+
+    def find(self, serial_number):
+        """Return the container with ``serial_number``, or None."""
+        location = self.locate(serial_number)
+        if location is None:
+            return None
+        return _storage(location).get(serial_number)
+
+    def __contains__(self, serial_number):
+        return self.locate(serial_number) is not None
+
+    @property
+    def container_count(self):
+        with self._lock:
+            return len(self._locations)
+
+    def move(self, serial_numbers, destination):
+        """Move the containers to ``destination``, a ship or yard, all or none.
+
+        Returns a ``TransactionReport`` with one outcome per serial number.
+        """
+        if isinstance(serial_numbers, (str, int)):
+            serial_numbers = [serial_numbers]
+        if _storage(destination)._registry is not self:
+            # The index would lose track of anything moved there.
+            return TransactionReport([NOT_REGISTERED] * len(serial_numbers), False)
+        transaction = Transaction()
+        outcomes = []
+        moved = []
+        for number, serial_number in enumerate(serial_numbers):
+            location = self.locate(serial_number)
+            container = None if location is None else _storage(location).get(serial_number)
+            if container is None:
+                outcomes.append(_not_in_terminal(serial_number))
+                continue
+            outcomes.append(None)
+            if location is not destination:
+                transaction.unload(location, container).load(destination, container)
+                moved.append(number)
+        if any(outcome is not None for outcome in outcomes):
+            return TransactionReport(outcomes, False)
+
+        report = transaction.commit()
+        if not report.committed:
+            # Each move is an unload and a load; report whichever failed.
+            pairs = zip(report.outcomes[::2], report.outcomes[1::2])
+            for number, (unload, load) in zip(moved, pairs):
+                outcomes[number] = unload or load
+        return TransactionReport(outcomes, report.committed)
+
+    def __repr__(self):
+        return f"Terminal(yards={len(self.yards)}, ships={len(self.ships)}, containers={self.container_count})"
+
+
+def _storage(location):
+    return location.storage if isinstance(location, Ship) else location
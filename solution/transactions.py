@@ -0,0 +1,477 @@
+"""Apply many container operations as one all-or-nothing transaction.
+
+A ``Transaction`` collects operations on ships, storages and containers:
+
+* ``load(target, container)`` and ``unload(target, container)``,
+* ``replace(target, serial_number, new_container)``,
+* ``transport(container, source, destination)`` between ships,
+* ``load_cargo(container, cargo[, type_of_cargo, required_temperature])``,
+* ``empty(container)``.
+
+A target is a ``Ship`` or a ``Storage``. ``commit`` first checks every
+operation, in order, against what the earlier ones will have done, with
+the same rules and messages as the one-at-a-time methods; a replace of a
+serial number that is not there fails instead of being skipped. If any
+operation fails, nothing is changed. Otherwise the whole transaction is
+applied under the locks of everything it touches, and every storage
+refreshes its running totals and indexes once for the batch instead of once
+per operation. Should applying still raise, every change made so far is
+undone before the error propagates.
+
+Events are emitted after the transaction is applied, as the one-at-a-time
+methods would have emitted them. A transaction that is not applied emits
+only the hazards of its failed operations.
+"""
+
+from contextlib import ExitStack
+
+from solution import OverfillException, Ship, TemperatureException, _empty_like, serial_key
+from solution.events import (
+    ContainerAdded,
+    ContainerEmptied,
+    ContainerLoaded,
+    ContainerRemoved,
+    ContainerReplaced,
+    emit,
+    get_sink,
+)
+from solution.hazards import get_hazard_pipeline
+from solution.locking import locked
+from solution.parallel import OVERFILL, TEMPERATURE, ExecutionReport
+
+
+class TransactionReport(ExecutionReport):
+    """``outcomes[i]`` is None if operation ``i`` passed its checks, otherwise
+    the reason it failed; ``committed`` tells whether anything was applied."""
+
+    __slots__ = ("committed",)
+
+    def __init__(self, outcomes, committed):
+        super().__init__(outcomes)
+        self.committed = committed
+
+    def __repr__(self):
+        return f"TransactionReport(committed={self.committed}, rejected={len(self.rejected)})"
+
+
+def _storage_of(target):
+    return target.storage if isinstance(target, Ship) else target
+
+
+def _not_in_storage(container):
+    return f"Container with the following serial number: {container.serial_number} is not in the storage."
+
+
+def _already_in_storage(container):
+    return f"Container with the serial number {container.serial_number} is already in storage"
+
+
+class _Members:
+    """What a storage will hold once the operations checked so far are applied."""
+
+    __slots__ = ("storage", "added", "removed", "count", "tonnage")
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.added = {}
+        self.removed = set()
+        self.count = storage.container_count
+        self.tonnage = storage.total_mass
+
+    def get(self, serial):
+        container = self.added.get(serial)
+        if container is None and serial not in self.removed:
+            position = self.storage._index.get(serial)
+            if position is not None:
+                container = self.storage._slots[position]
+        return container
+
+    def add(self, container, mass):
+        self.added[container.serial] = container
+        self.count += 1
+        self.tonnage += mass
+
+    def remove(self, container, mass):
+        if self.added.pop(container.serial, None) is None:
+            self.removed.add(container.serial)
+        self.count -= 1
+        self.tonnage -= mass
+
+
+class _Draft:
+    """What a container will look like once the operations checked so far are applied."""
+
+    __slots__ = (
+        "container",
+        "cargo",
+        "added",
+        "loaded_mass",
+        "hazardous_items",
+        "homes",
+        "changed",
+    )
+
+    def __init__(self, container, homes):
+        self.container = container
+        # The cargo to start from and what gets loaded on top of it; a
+        # ledger is only copied once the transaction is applied.
+        self.cargo = container.cargo
+        self.added = []
+        self.loaded_mass = container.loaded_mass
+        self.hazardous_items = container._hazardous_items
+        self.homes = homes
+        self.changed = False
+
+    @property
+    def mass(self):
+        return self.container.dry_mass + self.loaded_mass
+
+    def change(self, cargo, added, loaded_mass, hazardous_items):
+        for members in self.homes:
+            members.tonnage += loaded_mass - self.loaded_mass
+        self.cargo = cargo
+        self.added = added
+        self.loaded_mass = loaded_mass
+        self.hazardous_items = hazardous_items
+        self.changed = True
+
+
+class _Check:
+    """Checks operations in order against the state left by the earlier ones."""
+
+    def __init__(self):
+        self.members = {}
+        self.drafts = {}
+
+    def storage(self, storage):
+        members = self.members.get(id(storage))
+        if members is None:
+            members = self.members[id(storage)] = _Members(storage)
+        return members
+
+    def draft(self, container):
+        if container is None:
+            raise Exception("Container cannot be None")
+        draft = self.drafts.get(id(container))
+        if draft is None:
+            homes = {self.storage(storage) for storage in container._storages}
+            draft = self.drafts[id(container)] = _Draft(container, homes)
+        return draft
+
+    def _check_room(self, target, members, mass, leaving=None):
+        # The same limits as Ship._check_room, against the planned contents,
+        # less the container ``leaving`` to make room.
+        if not isinstance(target, Ship):
+            return
+        count = members.count
+        tonnage = members.tonnage
+        if leaving is not None:
+            count -= 1
+            tonnage -= leaving.mass
+        if count >= target.capacity:
+            raise Exception(f"Ship is full: it can carry at most {target.capacity} containers")
+        if tonnage + mass > target.max_tonnage:
+            raise Exception(
+                f"Container of {mass} kg exceeds the remaining tonnage of {target.max_tonnage - tonnage} kg"
+            )
+
+    def _enter(self, members, draft):
+        if members.get(draft.container.serial) is not None:
+            raise Exception(_already_in_storage(draft.container))
+        members.add(draft.container, draft.mass)
+        draft.homes.add(members)
+
+    def _leave(self, members, draft):
+        if members.get(draft.container.serial) is not draft.container:
+            raise ValueError(_not_in_storage(draft.container))
+        members.remove(draft.container, draft.mass)
+        draft.homes.discard(members)
+
+    def load(self, target, container):
+        draft = self.draft(container)
+        members = self.storage(_storage_of(target))
+        self._check_room(target, members, draft.mass)
+        self._enter(members, draft)
+
+    def unload(self, target, container):
+        self._leave(self.storage(_storage_of(target)), self.draft(container))
+
+    def replace(self, target, serial_number, new_container):
+        if serial_number is None or new_container is None:
+            raise Exception("Serial number or new container cannot be None")
+        members = self.storage(_storage_of(target))
+        old = members.get(serial_key(serial_number))
+        if old is None:
+            raise Exception(f"Container with the serial number {serial_number} is not in the storage")
+        new = self.draft(new_container)
+        if new_container.serial != old.serial and members.get(new_container.serial) is not None:
+            raise Exception(_already_in_storage(new_container))
+        old = self.draft(old)
+        self._check_room(target, members, new.mass, leaving=old)
+        self._leave(members, old)
+        self._enter(members, new)
+
+    def transport(self, container, source, destination):
+        if destination is None:
+            raise Exception("Destination ship cannot be None")
+        draft = self.draft(container)
+        source_members = self.storage(source.storage)
+        if source_members.get(container.serial) is not container:
+            raise ValueError(_not_in_storage(container))
+        members = self.storage(destination.storage)
+        self._check_room(destination, members, draft.mass)
+        self._leave(source_members, draft)
+        self._enter(members, draft)
+
+    def load_cargo(self, container, cargo, type_of_cargo=None, required_temperature=None):
+        draft = self.draft(container)
+        if container.kind == "chilled":
+            container._check_requirements(cargo, type_of_cargo, required_temperature)
+        elif cargo is None:
+            raise Exception("Cargo is None")
+        if draft.loaded_mass + cargo.load_mass > container._load_limit(cargo):
+            raise OverfillException(OVERFILL)
+        # Appended in place; copying the list each time would make many
+        # loads into one container quadratic.
+        draft.added.append(cargo)
+        draft.change(
+            draft.cargo,
+            draft.added,
+            draft.loaded_mass + cargo.load_mass,
+            draft.hazardous_items + (not cargo.safe),
+        )
+
+    def empty(self, container):
+        draft = self.draft(container)
+        residue_ratio = container.residue_ratio
+        draft.change(
+            _empty_like(draft.cargo), [], draft.loaded_mass * residue_ratio if residue_ratio else 0, 0
+        )
+
+
+class _Apply:
+    """Applies checked operations, keeping what it takes to undo them."""
+
+    def __init__(self):
+        self.undo = []
+        self.saved = set()
+
+    def _save(self, container):
+        if id(container) not in self.saved:
+            self.saved.add(id(container))
+            state = (
+                container.cargo,
+                container.loaded_mass,
+                container._hazardous_items,
+                container.version,
+            )
+            self.undo.append(lambda: _set_state(container, *state))
+
+    def _place(self, storage, container, position=None):
+        storage._place(container, position)
+        if position is None:
+            def undo():
+                storage._unplace(container.serial)
+                storage._slots.pop()
+                storage._holes -= 1
+        else:
+            def undo():
+                storage._unplace(container.serial)
+        self.undo.append(undo)
+
+    def _unplace(self, storage, container):
+        position = storage._unplace(container.serial)
+        self.undo.append(lambda: storage._place(container, position))
+        return position
+
+    def load(self, target, container):
+        self._place(_storage_of(target), container)
+
+    def unload(self, target, container):
+        self._unplace(_storage_of(target), container)
+
+    def replace(self, target, serial_number, new_container):
+        storage = _storage_of(target)
+        old = storage.get(serial_key(serial_number))
+        self._place(storage, new_container, self._unplace(storage, old))
+
+    def transport(self, container, source, destination):
+        self._unplace(source.storage, container)
+        self._place(destination.storage, container)
+
+    def content(self, draft):
+        container = draft.container
+        self._save(container)
+        cargo = draft.cargo.copy()
+        cargo.extend(draft.added)
+        _set_state(
+            container,
+            cargo,
+            draft.loaded_mass,
+            draft.hazardous_items,
+            container.version + 1,
+        )
+
+    def rollback(self):
+        for undo in reversed(self.undo):
+            undo()
+
+
+def _set_state(container, cargo, loaded_mass, hazardous_items, version):
+    container.cargo = cargo
+    container.loaded_mass = loaded_mass
+    container._hazardous_items = hazardous_items
+    container.version = version
+
+
+def _emit(operation, outcome, committed):
+    name, args = operation
+    if outcome is not None:
+        # Only a failed cargo load can have hit a hazard.
+        if name == "load_cargo":
+            container = args[0]
+            if outcome == OVERFILL:
+                container.hazard_notifier.warn_hazard(container, OverfillException)
+            elif outcome.startswith(TEMPERATURE):
+                container.hazard_notifier.warn_hazard(container, TemperatureException)
+        return
+    if not committed:
+        return
+    match name:
+        case "load":
+            if not isinstance(args[0], Ship):
+                emit(ContainerAdded, args[1].serial)
+        case "unload" | "transport":
+            container = args[1] if name == "unload" else args[0]
+            emit(ContainerRemoved, container.serial)
+        case "replace":
+            emit(ContainerReplaced, serial_key(args[1]), args[2].serial)
+        case "load_cargo":
+            emit(ContainerLoaded, args[0].serial, args[1].load_mass)
+        case "empty":
+            emit(ContainerEmptied, args[0].serial, args[0].residue_ratio)
+
+
+class Transaction:
+    """Operations to apply together; nothing happens until ``commit``.
+
+    Every method returns the transaction, so calls can be chained.
+    """
+
+    def __init__(self):
+        self._operations = []
+
+    def __len__(self):
+        return len(self._operations)
+
+    def _add(self, name, *args):
+        self._operations.append((name, args))
+        return self
+
+    def load(self, target, container):
+        return self._add("load", target, container)
+
+    def unload(self, target, container):
+        return self._add("unload", target, container)
+
+    def replace(self, target, serial_number, new_container):
+        return self._add("replace", target, serial_number, new_container)
+
+    def transport(self, container, source, destination):
+        return self._add("transport", container, source, destination)
+
+    def load_cargo(self, container, cargo, type_of_cargo=None, required_temperature=None):
+        return self._add("load_cargo", container, cargo, type_of_cargo, required_temperature)
+
+    def empty(self, container):
+        return self._add("empty", container)
+
+    def _involved(self):
+        containers = {}
+        storages = {}
+        # (storage, serial number, container found there) for every replace.
+        replaced = []
+        for name, args in self._operations:
+            match name:
+                case "load" | "unload":
+                    storage = _storage_of(args[0])
+                    storages[id(storage)] = storage
+                    containers[id(args[1])] = args[1]
+                case "replace":
+                    storage = _storage_of(args[0])
+                    storages[id(storage)] = storage
+                    if args[1] is not None:
+                        old = storage.get(args[1])
+                        replaced.append((storage, args[1], old))
+                        containers[id(old)] = old
+                    containers[id(args[2])] = args[2]
+                case "transport":
+                    containers[id(args[0])] = args[0]
+                    for ship in args[1:]:
+                        if ship is not None:
+                            storages[id(ship.storage)] = ship.storage
+                case _:
+                    containers[id(args[0])] = args[0]
+        containers.pop(id(None), None)
+        for container in containers.values():
+            for storage in container._storages:
+                storages[id(storage)] = storage
+        return containers, storages, replaced
+
+    def commit(self):
+        """Check every operation, apply them all if they pass, and return a ``TransactionReport``."""
+        while True:
+            containers, storages, replaced = self._involved()
+            with locked(containers.values(), storages.values()):
+                # Until the locks were taken, a replaced serial number could
+                # change hands and containers could move; start over if so.
+                if all(storage.get(serial) is old for storage, serial, old in replaced) and all(
+                    id(storage) in storages
+                    for container in containers.values()
+                    for storage in container._storages
+                ):
+                    report = self._commit()
+                    break
+        if get_sink().enabled or get_hazard_pipeline() is not None:
+            for operation, outcome in zip(self._operations, report.outcomes):
+                _emit(operation, outcome, report.committed)
+        return report
+
+    def _commit(self):
+        check = _Check()
+        outcomes = []
+        for name, args in self._operations:
+            try:
+                getattr(check, name)(*args)
+                outcomes.append(None)
+            except Exception as error:
+                outcomes.append(str(error))
+        if any(outcome is not None for outcome in outcomes):
+            return TransactionReport(outcomes, False)
+
+        # Every storage a checked container was in, or ends up in, refreshes
+        # its totals and indexes for those containers once, on the way out.
+        touched = {}
+        for draft in check.drafts.values():
+            for storage in draft.container._storages:
+                touched.setdefault(id(storage), (storage, []))[1].append(draft.container)
+            for members in draft.homes:
+                if members.storage not in draft.container._storages:
+                    touched.setdefault(id(members.storage), (members.storage, []))[1].append(
+                        draft.container
+                    )
+        apply = _Apply()
+        with ExitStack() as stack:
+            for storage, members in touched.values():
+                stack.enter_context(storage._deferred(members))
+            try:
+                for name, args in self._operations:
+                    if name in ("load", "unload", "replace", "transport"):
+                        getattr(apply, name)(*args)
+                for draft in check.drafts.values():
+                    if draft.changed:
+                        apply.content(draft)
+            except BaseException:
+                apply.rollback()
+                raise
+        return TransactionReport(outcomes, True)
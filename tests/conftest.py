@@ -0,0 +1,9 @@
+import pytest
+from solution.events import NullSink, use_sink
+
+
+@pytest.fixture
+def quiet():
+    """Send events to a NullSink; modules opt in with ``pytestmark``."""
+    with use_sink(NullSink()):
+        yield
@@ -0,0 +1,110 @@
+import sys
+import threading
+
+import pytest
+from solution import Cargo, Container, ContainerForLiquids, Ship, Storage
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+@pytest.fixture(autouse=True)
+def frequent_switches():
+    # Switch threads as often as possible to shake out races.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def run_threads(target, count, *args):
+    threads = [threading.Thread(target=target, args=args) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_concurrent_loads_never_exceed_the_limit():
+    storage = Storage()
+    container = ContainerForLiquids(1000, 200, 500, 100)
+    storage.add_container(container)
+
+    def load():
+        for _ in range(100):
+            container.load_container(Cargo(False, 7))
+
+    run_threads(load, 8)
+    assert container.loaded_mass <= 500
+    assert container.loaded_mass == 7 * len(container.cargo) == 497
+    assert storage.loaded_mass == container.loaded_mass
+
+
+def test_racing_transports_leave_the_container_on_one_ship():
+    ships = [Ship(20, 10, 1_000_000), Ship(20, 10, 1_000_000)]
+    container = Container(1000, 200, 500, 100)
+    ships[0].load_container(container)
+
+    def move(source, destination):
+        for _ in range(200):
+            try:
+                source.transport_container(container, destination)
+            except ValueError:
+                pass  # Another thread moved it first.
+
+    threads = [
+        threading.Thread(target=move, args=pair)
+        for pair in [(ships[0], ships[1]), (ships[1], ships[0])] * 3
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert not any(thread.is_alive() for thread in threads)
+
+    on_board = [ship for ship in ships if container in ship.storage.containers]
+    assert len(on_board) == 1
+    assert container._storages == [on_board[0].storage]
+    assert sum(ship.storage.container_count for ship in ships) == 1
+    assert sum(ship.current_tonnage for ship in ships) == 500
+
+
+def test_ship_capacity_holds_under_concurrent_loads():
+    ship = Ship(20, 10, 1_000_000)
+    containers = [Container(1000, 200, 500, 100) for _ in range(40)]
+    failures = []
+
+    def load(batch):
+        for container in batch:
+            try:
+                ship.load_container(container)
+            except Exception:
+                failures.append(container)
+
+    threads = [
+        threading.Thread(target=load, args=(containers[start::4],)) for start in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert ship.storage.container_count == 10
+    assert len(failures) == 30
+    assert ship.current_tonnage == 5000
+
+
+def test_storage_aggregates_stay_consistent():
+    storage = Storage()
+    containers = [Container(10_000, 200, 500, 100) for _ in range(8)]
+    for container in containers:
+        storage.add_container(container)
+
+    def work():
+        for round_number in range(50):
+            for container in containers:
+                container.load_container(Cargo(round_number % 2 == 0, 3))
+            storage.query(hazardous=True)
+
+    run_threads(work, 4)
+    assert storage.loaded_mass == sum(container.loaded_mass for container in containers)
+    assert storage.count_by_hazard == {"safe": 0, "hazardous": 8}
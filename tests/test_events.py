@@ -0,0 +1,73 @@
+import time
+
+from solution import Cargo, Container, GasContainer, Storage
+from solution.events import (
+    BatchedFileSink,
+    ContainerAdded,
+    ContainerEmptied,
+    ContainerLoaded,
+    HazardRaised,
+    NullSink,
+    RingBufferSink,
+    use_sink,
+)
+
+
+def test_stdout_sink_prints_messages(capsys):
+    container = Container(1000, 200, 500, 100)
+    container.load_container(Cargo(True, 200))
+    captured = capsys.readouterr().out
+    assert (
+        f"Container {container.serial_number} has been loaded with 200kg of cargo."
+        in captured
+    )
+
+
+def test_ring_buffer_sink_records_events(capsys):
+    storage = Storage()
+    container = GasContainer(1000, 200, 500, 100)
+    with use_sink(RingBufferSink(maxlen=3)) as sink:
+        storage.add_container(container)
+        container.load_container(Cargo(True, 200))
+        container.load_container(Cargo(True, 900))
+        container.empty_container()
+    assert capsys.readouterr().out == ""
+    assert [type(event) for event in sink.events] == [
+        ContainerLoaded,
+        HazardRaised,
+        ContainerEmptied,
+    ]
+    assert "5% of the load mass remaining" in sink.messages()[-1]
+
+
+def test_null_sink_never_builds_events(monkeypatch, capsys):
+    def fail(*args):
+        raise AssertionError("event built for a disabled sink")
+
+    monkeypatch.setattr(ContainerAdded, "__init__", fail)
+    with use_sink(NullSink()):
+        Storage().add_container(Container(1000, 200, 500, 100))
+    assert capsys.readouterr().out == ""
+
+
+def test_batched_file_sink_flushes_on_size_and_close(tmp_path):
+    path = tmp_path / "events.log"
+    sink = BatchedFileSink(path, batch_size=2, flush_interval=3600)
+    with use_sink(sink):
+        storage = Storage()
+        for _ in range(3):
+            storage.add_container(Container(1000, 200, 500, 100))
+        assert len(path.read_text().splitlines()) == 2
+        sink.close()
+    assert len(path.read_text().splitlines()) == 3
+
+
+def test_batched_file_sink_flushes_on_time_without_more_events(tmp_path):
+    path = tmp_path / "events.log"
+    with BatchedFileSink(path, batch_size=1000, flush_interval=0.05) as sink:
+        with use_sink(sink):
+            Storage().add_container(Container(1000, 200, 500, 100))
+        deadline = time.monotonic() + 5
+        while not path.read_text() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(path.read_text().splitlines()) == 1
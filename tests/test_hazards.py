@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+from solution import (
+    Cargo,
+    ChilledContainer,
+    ContainerForLiquids,
+    OverfillException,
+    TemperatureException,
+)
+from solution.events import HazardRaised, RingBufferSink, use_sink
+from solution.hazards import (
+    HazardPipeline,
+    HazardSummary,
+    forward_to_sink,
+    get_hazard_pipeline,
+    use_hazard_pipeline,
+)
+from solution.table import ContainerTable
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+def overfill(container, times):
+    for _ in range(times):
+        container.load_container(Cargo(False, 600))
+
+
+def test_without_a_pipeline_hazards_are_events():
+    chilled = ChilledContainer(1000, 200, 500, 100, "Fish", -5)
+    with use_sink(RingBufferSink()) as sink:
+        with pytest.raises(TemperatureException):
+            chilled.load_container(Cargo(True, 10), "Fish", 0)
+        overfill(ContainerForLiquids(1000, 200, 500, 100), 1)
+    assert [event.hazard for event in sink.events] == [TemperatureException, OverfillException]
+    assert all(isinstance(event, HazardRaised) for event in sink.events)
+
+
+def test_reports_are_deduplicated_per_container_and_hazard():
+    batches = []
+    first, second = (ContainerForLiquids(1000, 200, 500, 100) for _ in range(2))
+    chilled = ChilledContainer(1000, 200, 500, 100, "Fish", -5)
+    with use_hazard_pipeline(HazardPipeline(window=60, subscribers=[batches.append])) as pipeline:
+        overfill(first, 500)
+        overfill(second, 3)
+        for _ in range(2):
+            with pytest.raises(TemperatureException):
+                chilled.load_container(Cargo(True, 10), "Fish", 0)
+        pipeline.flush()
+        assert pipeline.reported == 505
+    assert get_hazard_pipeline() is None
+    summaries = [summary for batch in batches for summary in batch]
+    assert [(s.serial, s.hazard, s.count) for s in summaries] == [
+        (first.serial, OverfillException, 500),
+        (second.serial, OverfillException, 3),
+        (chilled.serial, TemperatureException, 2),
+    ]
+
+
+def test_summaries_are_delivered_once_their_window_passes():
+    delivered = threading.Event()
+    with use_hazard_pipeline(HazardPipeline(window=0.05)) as pipeline:
+        pipeline.subscribe(lambda summaries: delivered.set())
+        overfill(ContainerForLiquids(1000, 200, 500, 100), 2)
+        assert delivered.wait(5)
+        assert pipeline.delivered == 1
+
+
+def test_a_failing_subscriber_does_not_stop_the_others():
+    def broken(summaries):
+        raise RuntimeError("pager down")
+
+    with use_sink(RingBufferSink()) as sink:
+        with use_hazard_pipeline(HazardPipeline(subscribers=[broken, forward_to_sink])) as pipeline:
+            overfill(ContainerForLiquids(1000, 200, 500, 100), 2)
+        assert pipeline.errors == 1
+    [summary] = sink.events
+    assert isinstance(summary, HazardSummary)
+    assert "has suffered a hazard: OverfillException (2 times" in summary.format()
+
+
+def test_table_rows_report_temperature_violations():
+    batches = []
+    table = ContainerTable()
+    row = table[table.append(ChilledContainer, 1000, 200, 500, 100, "Fish", -5)]
+    with use_hazard_pipeline(HazardPipeline(subscribers=[batches.append])):
+        with pytest.raises(TemperatureException):
+            row.load_container(Cargo(True, 10), "Fish", 0)
+    assert batches[0][0].serial == row.serial
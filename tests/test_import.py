@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def run_python(code):
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_has_no_side_effects():
+    result = run_python("import solution")
+    assert result.stdout == ""
+    assert result.stderr == ""
+
+
+def test_import_does_not_load_tabulate():
+    result = run_python("import sys, solution; print('tabulate' in sys.modules)")
+    assert result.stdout.strip() == "False"
+
+
+def test_demo_entry_point_runs():
+    result = subprocess.run(
+        [sys.executable, "-m", "solution", "demo"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert "Ship Data:" in result.stdout
@@ -0,0 +1,131 @@
+import random
+
+import pytest
+from solution import (
+    Cargo,
+    ChilledContainer,
+    Container,
+    ContainerForLiquids,
+    GasContainer,
+    Ship,
+    Storage,
+)
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+def scan(storage, **predicates):
+    # The straightforward answer the indexes have to agree with.
+    def matches(container):
+        chilled = container.kind == "chilled"
+        fill = container.loaded_mass / container.capacity
+        kind = getattr(predicates.get("kind"), "kind", predicates.get("kind"))
+        return (
+            (kind is None or container.kind == kind)
+            and (
+                predicates.get("type_of_cargo") is None
+                or chilled and container.type_of_cargo == predicates["type_of_cargo"]
+            )
+            and (
+                predicates.get("max_temperature") is None
+                or chilled and container.temperature <= predicates["max_temperature"]
+            )
+            and (
+                predicates.get("min_temperature") is None
+                or chilled and container.temperature >= predicates["min_temperature"]
+            )
+            and (predicates.get("min_fill") is None or fill >= predicates["min_fill"])
+            and (predicates.get("max_fill") is None or fill <= predicates["max_fill"])
+            and (
+                predicates.get("hazardous") is None
+                or container.is_hazardous == predicates["hazardous"]
+            )
+        )
+
+    return [container for container in storage.containers if matches(container)]
+
+
+@pytest.fixture
+def storage():
+    random.seed(7)
+    storage = Storage()
+    for i in range(300):
+        match i % 4:
+            case 0:
+                container = Container(1000, 200, 100, 100)
+            case 1:
+                container = ContainerForLiquids(1000, 200, 100, 100)
+            case 2:
+                container = GasContainer(1000, 200, 100, 100)
+            case 3:
+                container = ChilledContainer(
+                    1000, 200, 100, 100, random.choice("ABC"), random.randint(-25, 5)
+                )
+        storage.add_container(container)
+    return storage
+
+
+QUERIES = [
+    {"kind": "chilled"},
+    {"kind": ChilledContainer, "type_of_cargo": "A", "max_temperature": -10},
+    {"min_temperature": -20, "max_temperature": -5},
+    {"min_fill": 0.9},
+    {"max_fill": 0.1, "kind": GasContainer},
+    {"hazardous": True},
+    {"hazardous": False, "kind": "liquid", "min_fill": 0.2},
+    {},
+]
+
+
+def load_randomly(storage):
+    for container in storage.containers:
+        for _ in range(random.randint(0, 3)):
+            cargo = Cargo(random.random() < 0.8, random.randint(100, 400))
+            if container.kind == "chilled":
+                container.load_container(
+                    cargo, container.type_of_cargo, container.temperature
+                )
+            else:
+                container.load_container(cargo)
+
+
+@pytest.mark.parametrize("predicates", QUERIES)
+def test_query_matches_scan_after_updates(storage, predicates):
+    assert storage.query(**predicates) == scan(storage, **predicates)
+    load_randomly(storage)
+    assert storage.query(**predicates) == scan(storage, **predicates)
+    for container in list(storage.containers)[::5]:
+        container.empty_container()
+    for container in list(storage.containers)[::7]:
+        storage.remove_container(container)
+    first = storage.containers[0]
+    storage.replace_container(
+        first.serial_number, ChilledContainer(1000, 200, 100, 100, "A", -30)
+    )
+    assert storage.query(**predicates) == scan(storage, **predicates)
+
+
+def test_indexes_are_built_lazily(storage):
+    assert storage._indexes is None
+    storage.query(kind="gas")
+    assert storage._indexes is not None
+    storage.empty_warehouse()
+    assert storage._indexes is None
+    assert storage.query(kind="gas") == []
+
+
+def test_hazardous_query_follows_loading_and_emptying(storage):
+    container = storage.containers[0]
+    container.load_container(Cargo(False, 10))
+    assert container in storage.query(hazardous=True)
+    container.empty_container()
+    assert container not in storage.query(hazardous=True)
+
+
+def test_ship_storage_query_after_batch_load():
+    ship = Ship(20, 100, 1_000_000)
+    ship.storage.query()
+    containers = [GasContainer(1000, 200, 100, 100) for _ in range(20)]
+    containers[3].load_container(Cargo(True, 950))
+    ship.load_container_batch(containers)
+    assert ship.storage.query(kind="gas", min_fill=0.9) == [containers[3]]
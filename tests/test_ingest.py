@@ -0,0 +1,126 @@
+import random
+
+import pytest
+from solution import (
+    Cargo,
+    ChilledContainer,
+    Container,
+    ContainerForLiquids,
+    GasContainer,
+    Storage,
+)
+from solution.events import ContainerLoaded, RingBufferSink, use_sink
+from solution.ingest import NOT_CHILLED, ingest
+from solution.parallel import OVERFILL, UNKNOWN_CONTAINER
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+def yard(serial_numbers=(None,) * 4):
+    storage = Storage()
+    dry, liquid, gas, chilled = serial_numbers
+    for container in (
+        Container(10_000, 200, 500, 100, dry),
+        ContainerForLiquids(10_000, 200, 500, 100, liquid),
+        GasContainer(10_000, 200, 500, 100, gas),
+        ChilledContainer(10_000, 200, 500, 100, "Fish", -5, chilled),
+    ):
+        storage.add_container(container)
+    return storage
+
+
+def events(storage, count, rng):
+    serial_numbers = [container.serial_number for container in storage.containers]
+    for _ in range(count):
+        serial_number = rng.choice(serial_numbers)
+        cargo_type = required_temperature = None
+        if serial_number.startswith("KON-C"):
+            cargo_type = rng.choice(["Fish", "Fish", "Fruits"])
+            required_temperature = rng.choice([-10, -5, 0])
+        yield serial_number, rng.randint(1, 1500), rng.random() < 0.7, cargo_type, required_temperature
+
+
+def one_by_one(storage, stream):
+    reasons = []
+    for serial_number, mass, safe, *requirements in stream:
+        container = storage.get(serial_number)
+        count = len(container.cargo)
+        try:
+            container.load_container(Cargo(safe, mass), *requirements[: 2 if requirements[0] else 0])
+            reasons.append(None if len(container.cargo) > count else OVERFILL)
+        except Exception as error:
+            reasons.append(str(error))
+    return reasons
+
+
+def test_ingest_matches_loading_one_by_one():
+    first = yard()
+    second = yard([container.serial_number for container in first.containers])
+    second.query(hazardous=True)  # build the indexes
+    stream = list(events(first, 2000, random.Random(7)))
+    expected = one_by_one(first, stream)
+    results = list(ingest(second, iter(stream), batch_size=64))
+    assert [event for event, _ in results] == stream
+    assert [reason for _, reason in results] == expected
+    assert [(c.loaded_mass, len(c.cargo), c.is_hazardous) for c in second.containers] == [
+        (c.loaded_mass, len(c.cargo), c.is_hazardous) for c in first.containers
+    ]
+    assert second.loaded_mass == first.loaded_mass
+    assert dict(second.count_by_hazard) == dict(first.count_by_hazard)
+    assert [c.serial for c in second.query(hazardous=True)] == [
+        c.serial for c in first.query(hazardous=True)
+    ]
+
+
+def test_rejections_are_explained():
+    storage = yard()
+    dry, liquid, _, chilled = storage.containers
+    results = list(
+        ingest(
+            storage,
+            [
+                ("KON-M-999999", 10, True, None, None),
+                ("not a serial", 10, True, None, None),
+                (liquid.serial_number, 6000, False, None, None),
+                (dry.serial_number, 10, True, "Fish", -5),
+                (chilled.serial_number, 10, True, "Fish", 0),
+                (chilled.serial_number, 10, True, "Fish", -5),
+            ],
+        )
+    )
+    reasons = [reason for _, reason in results]
+    assert reasons[0] == UNKNOWN_CONTAINER
+    assert reasons[1] is not None
+    assert reasons[2:4] == [OVERFILL, NOT_CHILLED]
+    assert reasons[4].startswith("Unable to load cargo with a required temperature")
+    assert reasons[5] is None
+    assert chilled.loaded_mass == 10
+
+
+def test_ingest_is_lazy():
+    storage = yard()
+    dry = storage.containers[0]
+
+    def endless():
+        while True:
+            yield dry.serial_number, 1, True, None, None
+
+    with use_sink(RingBufferSink()) as sink:
+        results = ingest(storage, endless(), batch_size=10)
+        for _ in range(25):
+            next(results)
+    assert dry.loaded_mass == 30  # three batches read so far
+    assert len(sink.events) == 30
+    assert all(isinstance(event, ContainerLoaded) for event in sink.events)
+
+
+def test_a_container_named_both_ways_is_loaded_once():
+    storage = yard()
+    storage.query(hazardous=True)  # build the indexes
+    dry = storage.containers[0]
+    total_mass = storage.total_mass
+    batch = [(dry.serial_number, 1, True, None, None), (dry.serial, 2, True, None, None)]
+    assert [reason for _, reason in ingest(storage, batch)] == [None, None]
+    assert dry.loaded_mass == 3
+    assert storage.total_mass == total_mass + 3
+    assert storage.query(kind="general") == [dry]
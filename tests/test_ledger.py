@@ -0,0 +1,165 @@
+import io
+
+import pytest
+from solution import (
+    Cargo,
+    CargoLedger,
+    Container,
+    ContainerForLiquids,
+    GasContainer,
+    Ship,
+    Storage,
+)
+from solution.manifest import read_csv, read_ndjson, write_csv, write_ndjson
+from solution.parallel import ShardedExecutor
+from solution.rendering import cargo_summary
+from solution.service import ContainerService
+from solution.snapshot import Journal, restore, write_snapshot
+from solution.transactions import Transaction
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+def test_ledger_keeps_sums_and_items():
+    container = Container(10_000, 200, 500, 100)
+    container.load_container(Cargo(True, 100))
+    ledger = container.use_cargo_ledger()
+    container.load_container(Cargo(False, 50))
+    container.load_container(Cargo(True, 25))
+    assert container.cargo is ledger
+    assert (ledger.safe_mass, ledger.hazardous_mass) == (125, 50)
+    assert (ledger.safe_items, ledger.hazardous_items) == (2, 1)
+    assert [(item.safe, item.load_mass) for item in ledger] == [(True, 100), (False, 50), (True, 25)]
+    assert ledger[-1].load_mass == 25
+    assert [item.load_mass for item in ledger[1:]] == [50, 25]
+    assert container.loaded_mass == 175 and container.is_hazardous
+
+
+def test_liquid_limits_still_apply():
+    container = ContainerForLiquids(1000, 200, 500, 100)
+    container.use_cargo_ledger()
+    container.load_container(Cargo(False, 400))
+    container.load_container(Cargo(False, 200))  # over the hazardous limit
+    assert container.loaded_mass == 400
+    assert container.cargo.item_count == 1
+
+
+def test_truncating_keeps_the_newest_items_and_the_sums():
+    container = Container(10**6, 200, 500, 100)
+    ledger = container.use_cargo_ledger(max_items=10)
+    for mass in range(1, 101):
+        container.load_container(Cargo(mass % 10 != 0, mass))
+    assert len(ledger) <= 10
+    assert ledger.item_count == 100
+    assert ledger.dropped == 100 - len(ledger)
+    assert ledger[-1].load_mass == 100
+    assert ledger.safe_mass + ledger.hazardous_mass == container.loaded_mass == 5050
+    assert ledger.hazardous_items == 10
+    assert cargo_summary(container) == "100 items, 10 hazardous"
+
+
+def test_spilling_writes_the_dropped_items(tmp_path):
+    path = tmp_path / "cargo.csv"
+    container = Container(10**6, 200, 500, 100)
+    ledger = container.use_cargo_ledger(max_items=4, spill_path=path)
+    for mass in range(1, 11):
+        container.load_container(Cargo(mass != 3, mass))
+    ledger.spill()
+    lines = path.read_text().splitlines()
+    assert len(lines) == 10 and len(ledger) == 0
+    assert lines[:3] == ["1,1.0", "1,2.0", "0,3.0"]
+
+
+def test_emptying_keeps_the_ledger_and_the_gas_residue():
+    gas = GasContainer(10_000, 200, 500, 100)
+    ledger = gas.use_cargo_ledger(max_items=100)
+    for _ in range(1000):
+        gas.load_container(Cargo(True, 5))
+    gas.empty_container()
+    assert type(gas.cargo) is CargoLedger and gas.cargo is not ledger
+    assert gas.cargo.max_items == 100 and gas.cargo.item_count == 0
+    assert gas.loaded_mass == pytest.approx(250)
+
+
+def test_transactions_and_sharded_runs_keep_the_ledger():
+    ship = Ship(20, 5, 100_000)
+    container = Container(10_000, 200, 500, 100)
+    ship.load_container(container)
+    ledger = container.use_cargo_ledger()
+    Transaction().load_cargo(container, Cargo(False, 10)).load_cargo(container, Cargo(True, 5)).commit()
+    assert type(container.cargo) is CargoLedger and container.cargo is not ledger
+    assert (container.cargo.hazardous_mass, container.cargo.safe_mass) == (10, 5)
+
+    storage = Storage()
+    storage.add_container(container)
+    operations = [("load", container.serial_number, Cargo(True, 1)) for _ in range(3)]
+    with ShardedExecutor(workers=2) as executor:
+        executor.run(storage, operations)
+    assert type(container.cargo) is CargoLedger
+    assert container.cargo.item_count == 5 and container.loaded_mass == 18
+    assert container.is_hazardous
+
+
+def test_truncated_loads_still_count_as_accepted(tmp_path):
+    storage = Storage()
+    container = Container(10_000, 200, 500, 100)
+    storage.add_container(container)
+    container.use_cargo_ledger(max_items=5)
+    snapshot_path, journal_path = tmp_path / "yard.snap", tmp_path / "yard.journal"
+    write_snapshot(snapshot_path, [storage])
+    with Journal(journal_path, [storage]) as journal:
+        for _ in range(6):
+            journal.load_container(container, Cargo(True, 1))
+    (restored,) = restore(snapshot_path, journal_path)
+    assert restored.get(container.serial).loaded_mass == 6
+
+    with ShardedExecutor(workers=1) as executor:
+        report = executor.run(storage, [("load", container.serial_number, Cargo(True, 1))])
+    assert report.outcomes == [None]
+
+    service = ContainerService(storage)
+    loaded = service.handle({"op": "load", "serial_number": container.serial_number, "cargo": [True, 1]})
+    assert loaded["result"] == {"loaded_mass": 8}
+    assert container.cargo.item_count == 8 and len(container.cargo) <= 5
+
+
+@pytest.mark.parametrize("write, read", [(write_csv, read_csv), (write_ndjson, read_ndjson)])
+def test_manifests_keep_truncated_hazards(write, read):
+    container = Container(10**6, 200, 500, 100)
+    container.use_cargo_ledger(max_items=4)
+    container.load_container(Cargo(False, 7))
+    for _ in range(10):
+        container.load_container(Cargo(True, 1))
+    assert all(item.safe for item in container.cargo)
+    file = io.StringIO()
+    write([container], file)
+    file.seek(0)
+    (copy,) = read(file)
+    assert copy.is_hazardous
+    assert type(copy.cargo) is CargoLedger and copy.cargo.max_items == 4
+    assert (copy.cargo.safe_items, copy.cargo.hazardous_items) == (10, 1)
+    assert (copy.cargo.safe_mass, copy.cargo.hazardous_mass) == (10, 7)
+
+
+def test_snapshots_keep_truncated_hazards(tmp_path):
+    storage = Storage()
+    container = Container(10**6, 200, 500, 100)
+    storage.add_container(container)
+    container.use_cargo_ledger(max_items=4)
+    container.load_container(Cargo(False, 7))
+    for _ in range(10):
+        container.load_container(Cargo(True, 1))
+    path = tmp_path / "yard.snap"
+    write_snapshot(path, [storage])
+    (restored,) = restore(path)
+    assert [c.serial for c in restored.query(hazardous=True)] == [container.serial]
+    copy = restored.get(container.serial)
+    assert copy.cargo.item_count == 11 and copy.cargo.max_items == 4
+    assert copy.cargo.hazardous_mass == 7
+
+
+def test_service_refuses_ledger_fields():
+    service = ContainerService()
+    record = {"type": "general", "capacity": 1000, "height": 200, "dry_mass": 500, "depth": 100}
+    response = service.handle({"op": "add", "container": {**record, "spill_path": "/tmp/x"}})
+    assert response["error"] == "Field not allowed: spill_path"
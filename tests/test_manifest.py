@@ -0,0 +1,105 @@
+import io
+
+import pytest
+from solution import (
+    Cargo,
+    ChilledContainer,
+    Container,
+    ContainerForLiquids,
+    GasContainer,
+    Ship,
+    Storage,
+)
+from solution.manifest import (
+    export_manifest,
+    import_manifest,
+    load_into_ship,
+    load_into_storage,
+    read_csv,
+    read_ndjson,
+    write_csv,
+    write_ndjson,
+)
+
+FORMATS = [(write_csv, read_csv), (write_ndjson, read_ndjson)]
+
+
+@pytest.fixture
+def containers():
+    regular = Container(1000, 200, 500, 100)
+    regular.load_container(Cargo(True, 200))
+    regular.load_container(Cargo(False, 100.5))
+    liquid = ContainerForLiquids(1000, 200, 500, 100)
+    liquid.load_container(Cargo(True, 400))
+    gas = GasContainer(1000, 200, 500, 100)
+    gas.load_container(Cargo(True, 500))
+    gas.empty_container()
+    chilled = ChilledContainer(1000, 200, 500, 100, "Fruits", -5)
+    chilled.load_container(Cargo(True, 300), "Fruits", -10)
+    return [regular, liquid, gas, chilled]
+
+
+def round_trip(containers, write, read):
+    file = io.StringIO()
+    assert write(containers, file) == len(containers)
+    file.seek(0)
+    return list(read(file))
+
+
+@pytest.mark.parametrize("write, read", FORMATS)
+def test_round_trip_keeps_state(containers, write, read):
+    restored = round_trip(containers, write, read)
+    for original, copy in zip(containers, restored):
+        assert type(copy) is type(original)
+        assert copy.serial_number == original.serial_number
+        assert copy.loaded_mass == original.loaded_mass
+        assert [(c.safe, c.load_mass) for c in copy.cargo] == [
+            (c.safe, c.load_mass) for c in original.cargo
+        ]
+        assert copy.is_hazardous == original.is_hazardous
+    assert restored[2].loaded_mass == 25
+    assert restored[3].type_of_cargo == "Fruits"
+    assert restored[3].temperature == -5
+
+
+@pytest.mark.parametrize("write, read", FORMATS)
+def test_round_trip_keeps_behaviour(containers, write, read, capsys):
+    regular, liquid, gas, chilled = round_trip(containers, write, read)
+    liquid.load_container(Cargo(True, 600))
+    assert liquid.loaded_mass == 400
+    assert "OverfillException" in capsys.readouterr().out
+    gas.load_container(Cargo(True, 475))
+    gas.empty_container()
+    assert gas.loaded_mass == 25
+    with pytest.raises(Exception, match="different type of cargo"):
+        chilled.load_container(Cargo(True, 10), "Meat", -10)
+    regular.empty_container()
+    assert regular.loaded_mass == 0
+
+
+def test_readers_are_lazy(containers):
+    file = io.StringIO()
+    write_ndjson(containers, file)
+    file.write("not json\n")
+    file.seek(0)
+    reader = read_ndjson(file)
+    assert next(reader).serial_number == containers[0].serial_number
+
+
+def test_manifest_files_load_into_storage_and_ship(containers, tmp_path):
+    path = tmp_path / "manifest.csv"
+    assert export_manifest(path, containers) == 4
+
+    storage = Storage()
+    assert load_into_storage(storage, import_manifest(path)) == 4
+    assert storage.loaded_mass == sum(c.loaded_mass for c in containers)
+
+    ship = Ship(20, 10, 100_000)
+    reports = load_into_ship(ship, import_manifest(path), batch_size=3)
+    assert [len(report.accepted) for report in reports] == [3, 1]
+    assert ship.storage.container_count == 4
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(Exception, match="Unknown manifest format"):
+        export_manifest(tmp_path / "manifest.xml", [])
@@ -0,0 +1,81 @@
+import pstats
+
+import pytest
+from solution import Cargo, ChilledContainer, Container, ContainerForLiquids, Ship, Storage
+from solution import metrics
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def test_disabled_metrics_leave_the_methods_untouched():
+    original = Container.__dict__["load_container"]
+    metrics.enable()
+    assert Container.__dict__["load_container"] is not original
+    metrics.disable()
+    assert Container.__dict__["load_container"] is original
+    Container(1000, 200, 500, 100).load_container(Cargo(True, 1))
+    assert metrics.snapshot()["operations"]["container.load_container"]["calls"] == 0
+
+
+def test_operations_are_counted_and_timed():
+    with metrics.enabled():
+        storage = Storage()
+        chilled = ChilledContainer(1000, 200, 500, 100, "Fish", 5)
+        storage.add_container(chilled)
+        chilled.load_container(Cargo(True, 100), "Fish", 0)
+        with pytest.raises(Exception):
+            chilled.load_container(Cargo(True, 100), "Meat", 0)
+        storage.replace_container(chilled.serial_number, Container(1000, 200, 500, 100))
+    operations = metrics.snapshot()["operations"]
+    # The chilled load goes through Container.load_container too, but counts once.
+    assert operations["container.load_container"]["calls"] == 2
+    assert operations["container.load_container"]["errors"] == 1
+    assert operations["storage.add_container"]["calls"] == 1
+    assert operations["storage.replace_container"]["calls"] == 1
+    buckets = operations["container.load_container"]["buckets"]
+    assert buckets["+Inf"] == 2
+
+
+def test_overfills_and_failed_transports_are_rejections():
+    with metrics.enabled():
+        container = ContainerForLiquids(1000, 200, 500, 100)
+        container.load_container(Cargo(False, 600))
+        ship, full = Ship(20, 5, 100_000), Ship(20, 1, 100_000)
+        full.load_container(Container(1000, 200, 500, 100))
+        moving = Container(1000, 200, 500, 100)
+        ship.load_container(moving)
+        with pytest.raises(Exception):
+            ship.transport_container(moving, full)
+    snapshot = metrics.snapshot()
+    assert snapshot["rejections"] == {"OverfillException": 1}
+    assert snapshot["operations"]["ship.transport_container"]["errors"] == 1
+
+
+def test_prometheus_export(tmp_path):
+    with metrics.enabled():
+        Container(1000, 200, 500, 100).load_container(Cargo(True, 1))
+    path = tmp_path / "solution.prom"
+    metrics.export_prometheus(path)
+    text = path.read_text()
+    assert "# TYPE solution_operation_seconds histogram" in text
+    assert 'solution_operation_calls_total{operation="container.load_container"} 1' in text
+    assert 'solution_operation_seconds_bucket{operation="container.load_container",le="+Inf"} 1' in text
+
+
+def test_capture_profile(tmp_path):
+    path = tmp_path / "batch.prof"
+    with metrics.capture_profile(path, memory=True) as profile:
+        container = Container(10**6, 200, 500, 100)
+        for _ in range(100):
+            container.load_container(Cargo(True, 1))
+    assert "load_container" in profile.report()
+    assert profile.memory is not None
+    assert pstats.Stats(str(path)).total_calls > 0
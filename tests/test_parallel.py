@@ -0,0 +1,124 @@
+import multiprocessing
+import random
+
+import pytest
+from solution import Cargo, ChilledContainer, Container, ContainerForLiquids, GasContainer, Storage
+from solution.events import RingBufferSink, use_sink
+from solution.manifest import build_container, container_record
+from solution.parallel import OVERFILL, UNKNOWN_CONTAINER, ShardedExecutor, run_operations
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+def yard(rng):
+    storage = Storage()
+    for i in range(40):
+        match i % 4:
+            case 0:
+                container = Container(1000, 100, 100, 100)
+            case 1:
+                container = ContainerForLiquids(1000, 100, 100, 100)
+            case 2:
+                container = GasContainer(1000, 100, 100, 100)
+            case 3:
+                container = ChilledContainer(1000, 100, 100, 100, rng.choice("AB"), -10)
+        storage.add_container(container)
+    return storage
+
+
+def copy_of(storage):
+    copy = Storage()
+    for container in storage.containers:
+        copy.add_container(build_container(container_record(container), container.cargo))
+    return copy
+
+
+def workload(storage, rng, size=2000):
+    containers = list(storage.containers)
+    operations = []
+    for _ in range(size):
+        container = rng.choice(containers)
+        # Containers are named by serial number or, now and then, by key.
+        name = container.serial if rng.random() < 0.2 else container.serial_number
+        roll = rng.random()
+        if roll < 0.1:
+            operations.append(("empty", name))
+        elif roll < 0.12:
+            operations.append(("load", "KON-M-999999", Cargo(True, 10)))
+        elif roll < 0.13:
+            operations.append(("load", name, None))
+        else:
+            cargo = Cargo(rng.random() < 0.7, rng.randint(10, 300))
+            if container.kind == "chilled":
+                operations.append(("load", name, cargo, rng.choice("AB"), rng.choice((-20, -5))))
+            else:
+                operations.append(("load", name, cargo))
+    return operations
+
+
+def state(storage):
+    return [
+        (c.serial, c.loaded_mass, [(i.safe, i.load_mass) for i in c.cargo])
+        for c in storage.containers
+    ]
+
+
+@pytest.mark.parametrize("start_method", ["fork", "spawn"])
+def test_sharded_run_matches_serial_run(start_method):
+    rng = random.Random(11)
+    serial = yard(rng)
+    sharded = copy_of(serial)
+    operations = workload(serial, rng)
+
+    expected = run_operations(serial, operations, workers=1)
+    context = multiprocessing.get_context(start_method)
+    with ShardedExecutor(workers=2, mp_context=context) as executor:
+        report = executor.run(sharded, operations)
+
+    assert report.outcomes == expected.outcomes
+    assert state(sharded) == state(serial)
+    # Running totals add the same changes in bigger steps.
+    assert sharded.total_mass == pytest.approx(serial.total_mass)
+    assert sharded.count_by_hazard == serial.count_by_hazard
+    reasons = {reason for _, reason in report.rejected}
+    assert OVERFILL in reasons and UNKNOWN_CONTAINER in reasons
+    assert any("different type of cargo" in reason for reason in reasons)
+
+
+def test_sharded_run_emits_events_in_order():
+    rng = random.Random(5)
+    serial = yard(rng)
+    sharded = copy_of(serial)
+    operations = workload(serial, rng, 300)
+    with use_sink(RingBufferSink()) as expected:
+        run_operations(serial, operations, workers=1)
+    with use_sink(RingBufferSink()) as events:
+        run_operations(sharded, operations, workers=3)
+    assert events.messages() == expected.messages()
+
+
+def test_executor_reuses_its_pool_unless_it_forks():
+    rng = random.Random(2)
+    storage = yard(rng)
+    with ShardedExecutor(workers=2, mp_context=multiprocessing.get_context("fork")) as executor:
+        executor.run(storage, workload(storage, rng, 50))
+        assert executor._pool is None
+    context = multiprocessing.get_context("spawn")
+    with ShardedExecutor(workers=2, mp_context=context) as executor:
+        executor.run(storage, workload(storage, rng, 50))
+        pool = executor._pool
+        executor.run(storage, workload(storage, rng, 50))
+        assert executor._pool is pool
+    assert executor._pool is None
+
+
+def test_spawned_workers_handle_imported_serials():
+    storage = Storage()
+    container = Container(1000, 100, 100, 100, serial_number="ABC123")
+    storage.add_container(container)
+    operations = [("load", "ABC123", Cargo(True, 300))] * 4
+    context = multiprocessing.get_context("spawn")
+    with ShardedExecutor(workers=2, mp_context=context) as executor:
+        report = executor.run(storage, operations)
+    assert report.outcomes == [None, None, None, OVERFILL]
+    assert container.loaded_mass == 900
@@ -0,0 +1,118 @@
+import random
+
+import pytest
+from solution import (
+    Cargo,
+    ChilledContainer,
+    Container,
+    ContainerForLiquids,
+    GasContainer,
+    Storage,
+)
+from solution.events import HazardRaised, RingBufferSink, use_sink
+from solution.planning import CargoOrder, plan_loading
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+def test_first_fit_decreasing_packs_tightly():
+    containers = [Container(10, 100, 100, 100) for _ in range(3)]
+    plan = plan_loading(containers, [Cargo(True, m) for m in (2, 6, 3, 5, 4)])
+    assert not plan.unassigned
+    packed = [[order.cargo.load_mass for order in orders] for _, orders in plan.assignments]
+    assert packed == [[6, 4], [5, 3, 2]]
+
+
+def test_a_container_listed_twice_is_planned_once():
+    container = Container(100, 100, 100, 100)
+    plan = plan_loading([container, container], [Cargo(True, 80)] * 2)
+    assert len(plan.assignments) == 1 and len(plan.unassigned) == 1
+    plan.apply()
+    assert container.loaded_mass == 80
+
+
+def test_liquid_limits_hold_when_loaded_one_by_one():
+    rng = random.Random(3)
+    containers = [ContainerForLiquids(1000, 100, 100, 100) for _ in range(20)]
+    orders = [Cargo(rng.random() < 0.6, rng.randint(20, 300)) for _ in range(200)]
+    plan = plan_loading(containers, orders)
+    assert plan.planned_count + len(plan.unassigned) == 200
+
+    # Replaying the plan through the regular per-item rules never overfills.
+    with use_sink(RingBufferSink()) as sink:
+        for container, planned in plan.assignments:
+            copy = ContainerForLiquids(1000, 100, 100, 100)
+            for order in planned:
+                copy.load_container(order.cargo)
+            assert len(copy.cargo) == len(planned)
+    assert not [event for event in sink.events if isinstance(event, HazardRaised)]
+
+    for container, planned in plan.assignments:
+        hazardous = sum(o.cargo.load_mass for o in planned if not o.cargo.safe)
+        assert hazardous <= 500
+        assert sum(o.cargo.load_mass for o in planned) <= 900
+
+
+def test_chilled_orders_match_type_and_temperature():
+    cold = ChilledContainer(1000, 100, 100, 100, "Fish", -20)
+    warm = ChilledContainer(1000, 100, 100, 100, "Fish", 0)
+    fruit = ChilledContainer(1000, 100, 100, 100, "Fruit", 5)
+    plain = Container(1000, 100, 100, 100)
+    orders = [
+        CargoOrder(Cargo(True, 100), "Fish", -25),
+        CargoOrder(Cargo(True, 200), "Fish", -5),
+        CargoOrder(Cargo(True, 300), "Meat", -30),
+        Cargo(True, 400),
+    ]
+    plan = plan_loading([cold, warm, fruit, plain], orders)
+    placed = {container.serial: orders for container, orders in plan.assignments}
+    # Both fish containers qualify for -25 °C; the coldest is tried first.
+    assert [o.cargo.load_mass for o in placed[cold.serial]] == [100]
+    assert [o.cargo.load_mass for o in placed[warm.serial]] == [200]
+    assert fruit.serial not in placed
+    assert [o.cargo.load_mass for o in placed[plain.serial]] == [400]
+    assert [(order.type_of_cargo, reason) for order, reason in plan.unassigned] == [
+        ("Meat", "No container takes this type of cargo")
+    ]
+
+
+def test_chilled_orders_need_a_warm_enough_container():
+    container = ChilledContainer(1000, 100, 100, 100, "Fish", -20)
+    plan = plan_loading([container], [CargoOrder(Cargo(True, 100), "Fish", -10)])
+    assert plan.unassigned[0][1] == "No container has room for this cargo"
+
+
+def test_gas_residue_is_kept_when_emptying_first():
+    container = GasContainer(1000, 100, 100, 100)
+    container.load_container(Cargo(True, 1000))
+    plan = plan_loading([container], [Cargo(True, 960), Cargo(True, 950)], empty_first=True)
+    assert [o.cargo.load_mass for _, orders in plan.assignments for o in orders] == [950]
+    plan.apply()
+    assert container.loaded_mass == 1000
+    assert [item.load_mass for item in container.cargo] == [950]
+
+
+def test_apply_updates_storage_once_per_container():
+    storage = Storage()
+    containers = [Container(1000, 100, 100, 100) for _ in range(4)]
+    for container in containers:
+        storage.add_container(container)
+    storage.query()
+    plan = plan_loading(containers, [Cargo(i % 3 != 0, 100) for i in range(30)])
+    report = plan.apply()
+    assert report.ok
+    assert len(report.accepted) == 30
+    assert storage.loaded_mass == 3000
+    # First fit fills the containers in order; the last one is left empty.
+    assert storage.count_by_hazard["hazardous"] == 3
+    assert storage.query(hazardous=True) == containers[:3]
+    assert [container.version for container in containers] == [1, 1, 1, 0]
+
+
+def test_stale_plan_is_refused():
+    container = Container(1000, 100, 100, 100)
+    plan = plan_loading([container], [Cargo(True, 500)])
+    container.load_container(Cargo(True, 600))
+    with pytest.raises(Exception, match="out of date"):
+        plan.apply()
+    assert container.loaded_mass == 600
@@ -0,0 +1,115 @@
+import pytest
+from solution import Cargo, Container, GasContainer, Ship, Storage
+from solution.console_app import console_remove_container, console_select
+from solution.rendering import (
+    RenderCache,
+    container_table,
+    get_render_cache,
+    pages,
+    print_pages,
+)
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+def test_version_is_bumped_on_load_and_empty():
+    container = GasContainer(1000, 200, 500, 100)
+    assert container.version == 0
+    container.load_container(Cargo(True, 100))
+    assert container.version == 1
+    container.load_container(Cargo(True, 5000))  # rejected, nothing changed
+    assert container.version == 1
+    container.empty_container()
+    assert container.version == 2
+
+
+def test_cache_reuses_text_until_the_container_changes():
+    cache = RenderCache()
+    container = Container(1000, 200, 500, 100)
+    first = cache.get(container, container_table)
+    assert cache.get(container, container_table) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    container.load_container(Cargo(True, 100))
+    updated = cache.get(container, container_table)
+    assert updated != first
+    assert "100 kg" in updated
+    assert cache.misses == 2
+
+
+def test_cache_evicts_least_recently_used():
+    cache = RenderCache(maxsize=2)
+    containers = [Container(1000, 200, 500, 100) for _ in range(3)]
+    for container in containers:
+        cache.get(container, container_table)
+    assert len(cache) == 2
+    cache.get(containers[0], container_table)
+    assert cache.misses == 4
+
+
+def test_print_pages_only_renders_what_it_prints(capsys):
+    rendered = []
+
+    def render():
+        for page in pages(range(100), 10):
+            rendered.append(page)
+            yield ",".join(map(str, page))
+
+    print_pages(render(), max_pages=2, total=100, page_size=10)
+    assert len(rendered) == 2
+    assert "80 more not shown" in capsys.readouterr().out
+
+
+def test_print_info_pages_cargo(capsys):
+    container = Container(10_000, 200, 500, 100)
+    for _ in range(50):
+        container.load_container(Cargo(True, 1))
+    container.print_info(page_size=10, max_pages=1)
+    out = capsys.readouterr().out
+    assert out.count("| Safe ") == 10
+    assert "40 more not shown" in out
+
+
+def test_ship_manifest_summarises_cargo(capsys):
+    ship = Ship(20, 100, 1_000_000)
+    container = Container(1000, 200, 500, 100)
+    container.load_container(Cargo(False, 10))
+    container.load_container(Cargo(True, 10))
+    ship.load_container(container)
+    ship.print_info()
+    out = capsys.readouterr().out
+    assert "2 items, 1 hazardous" in out
+    assert "Cargo(" not in out
+
+
+def test_ship_print_info_uses_cached_rows():
+    ship = Ship(20, 100, 1_000_000)
+    for _ in range(5):
+        ship.load_container(Container(1000, 200, 500, 100))
+    cache = get_render_cache()
+    cache.clear()
+    ship.print_info()
+    ship.print_info()
+    assert cache.hits >= 5
+
+
+def test_console_select_pages(monkeypatch, capsys):
+    containers = [Container(1000, 200, 500, 100) for _ in range(45)]
+    answers = iter(["n", "n", "n", "p", "41"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    assert console_select(containers, container_table, "? ") == "41"
+    out = capsys.readouterr().out
+    assert "Strona 3/3" in out
+    assert "Strona 2/3" in out
+
+
+def test_console_remove_from_later_page(monkeypatch):
+    storage = Storage()
+    containers = [Container(1000, 200, 500, 100) for _ in range(30)]
+    for container in containers:
+        storage.add_container(container)
+    answers = iter(["n", "25"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    console_remove_container(storage)
+    assert containers[25] not in storage.containers
+    assert len(storage.containers) == 29
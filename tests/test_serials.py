@@ -0,0 +1,140 @@
+import threading
+
+import pytest
+from solution import (
+    ChilledContainer,
+    Container,
+    ContainerForLiquids,
+    InvalidSerialNumberException,
+    SerialNumber,
+    Storage,
+)
+from solution.serials import (
+    SerialAllocator,
+    format_serial,
+    intern_serial,
+    serial_key,
+    validate,
+    validate_many,
+)
+
+
+def test_serials_follow_type_scheme():
+    liquid = ContainerForLiquids(10, 1, 1, 1)
+    chilled = ChilledContainer(10, 1, 1, 1, "Fruits", 5)
+    assert liquid.serial_number.startswith("KON-L-")
+    assert chilled.serial_number.startswith("KON-C-")
+    assert isinstance(liquid.serial, int)
+    assert serial_key(liquid.serial_number) == liquid.serial
+    assert format_serial(liquid.serial) == liquid.serial_number
+
+
+def test_sequential_numbers_per_type():
+    first = Container(10, 1, 1, 1)
+    second = Container(10, 1, 1, 1)
+    first_number = int(first.serial_number.rsplit("-", 1)[1])
+    assert second.serial_number == f"KON-M-{first_number + 1}"
+
+
+def test_explicit_serials_are_kept_and_never_reallocated():
+    container = Container(10, 1, 1, 1, "KON-M-5000000")
+    assert container.serial_number == "KON-M-5000000"
+    assert Container(10, 1, 1, 1).serial_number == "KON-M-5000001"
+
+    legacy = Container(10, 1, 1, 1, "LEGACY-42")
+    assert legacy.serial_number == "LEGACY-42"
+    assert intern_serial("LEGACY-42") == legacy.serial
+    storage = Storage()
+    storage.add_container(legacy)
+    assert storage.get("LEGACY-42") is legacy
+
+
+def test_unknown_serials_have_no_key():
+    assert serial_key("KON-X-1") is None
+    assert serial_key("KON-M-007") is None
+    assert serial_key("never seen") is None
+    assert serial_key(None) is None
+
+
+def test_reserve_returns_consecutive_block():
+    allocator = SerialAllocator()
+    block = allocator.reserve("chilled", 3)
+    assert [format_serial(key) for key in block] == ["KON-C-1", "KON-C-2", "KON-C-3"]
+    assert format_serial(allocator.allocate("chilled")) == "KON-C-4"
+
+
+def test_allocation_is_unique_across_threads():
+    allocator = SerialAllocator(block_size=16)
+    results = [[] for _ in range(8)]
+
+    def worker(out):
+        for _ in range(1000):
+            out.append(allocator.allocate("gas"))
+
+    threads = [threading.Thread(target=worker, args=(out,)) for out in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    keys = [key for out in results for key in out]
+    assert len(set(keys)) == len(keys) == 8000
+
+
+def _allocate_in_worker(count):
+    from solution.serials import allocate_serial
+
+    return [allocate_serial("liquid") for _ in range(count)]
+
+
+def test_shared_allocator_is_unique_across_processes():
+    from concurrent.futures import ProcessPoolExecutor
+
+    from solution.serials import set_allocator
+
+    allocator = SerialAllocator.shared(block_size=8)
+    with ProcessPoolExecutor(
+        max_workers=2, initializer=set_allocator, initargs=(allocator,)
+    ) as pool:
+        keys = [key for out in pool.map(_allocate_in_worker, [100] * 4) for key in out]
+    assert len(set(keys)) == len(keys) == 400
+
+
+def test_validate_is_fully_anchored():
+    assert validate("KON-C-12")
+    assert not validate("KON-C-12x")
+    assert not validate("xKON-C-12")
+    assert not validate("KON--")
+    assert not validate("KON-Q-1")
+    assert not validate(12)
+
+
+def test_validate_many_streams_results():
+    results = validate_many(iter(["KON-L-1", "bad", "KON-G-7"]))
+    assert next(results) == ("KON-L-1", True)
+    assert list(results) == [("bad", False), ("KON-G-7", True)]
+
+
+def test_serial_number_is_an_interned_storage_key():
+    container = ContainerForLiquids(10, 1, 1, 1)
+    serial = SerialNumber(container.serial_number)
+    assert serial is SerialNumber(container.serial_number)
+    assert serial == container.serial
+    assert str(serial) == serial.serial_number == container.serial_number
+    storage = Storage()
+    storage.add_container(container)
+    assert storage.get(serial) is container
+    assert {serial: "found"}[container.serial] == "found"
+
+
+def test_invalid_serial_number_raises():
+    with pytest.raises(InvalidSerialNumberException, match="Received: KON-X-1"):
+        SerialNumber("KON-X-1")
+
+
+def test_invalid_integer_serials_raise():
+    legacy = Container(10, 1, 1, 1, "LEGACY-43")
+    assert Container(10, 1, 1, 1, legacy.serial).serial_number == "LEGACY-43"
+    never_interned = 1 << 40 | 7
+    for key in (5, 0, -1, never_interned):
+        with pytest.raises(InvalidSerialNumberException, match=f"Received: {key}"):
+            Container(1, 1, 1, 1, key)
@@ -0,0 +1,144 @@
+import asyncio
+import json
+
+import pytest
+from solution import Cargo, Container, Ship
+from solution.service import ContainerService
+
+GENERAL = {"type": "general", "capacity": 1000, "height": 200, "dry_mass": 500, "depth": 100}
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+def test_operations_on_storage_and_ships():
+    service = ContainerService()
+    added = service.handle({"op": "add", "container": GENERAL, "id": 1})
+    assert added["ok"] and added["id"] == 1
+    serial_number = added["result"]["serial_number"]
+
+    loaded = service.handle({"op": "load", "serial_number": serial_number, "cargo": [False, 300]})
+    assert loaded["result"] == {"loaded_mass": 300}
+    overfilled = service.handle(
+        {"op": "load", "serial_number": serial_number, "cargo": [True, 800]}
+    )
+    assert overfilled == {"id": None, "ok": False, "error": "Cargo would overfill the container"}
+    assert service.handle({"op": "query", "hazardous": True})["result"] == [serial_number]
+
+    for _ in range(2):
+        service.handle({"op": "add_ship", "max_speed": 20, "capacity": 5, "max_tonnage": 10_000})
+    service.handle({"op": "add", "target": 0, "container": {**GENERAL, "cargo": [[True, 10]]}})
+    on_ship = service.ships[0].storage.containers[0]
+    moved = service.handle(
+        {"op": "transport", "serial_number": on_ship.serial_number, "source": 0, "destination": 1}
+    )
+    assert moved["ok"]
+    assert service.handle({"op": "stats", "target": 1})["result"]["loaded_mass"] == 10
+
+    assert service.handle({"op": "remove", "serial_number": serial_number})["ok"]
+    assert service.storage.container_count == 0
+
+
+def test_errors_are_reported_per_request():
+    service = ContainerService()
+    assert service.handle({"op": "fly"})["error"] == "Unknown operation. Received: fly"
+    assert service.handle({"op": "empty", "serial_number": "KON-M-999999"})["error"].startswith(
+        "Unknown container"
+    )
+    assert service.handle({"op": "add"})["error"] == "Missing field: container"
+    assert service.handle({"op": "stats", "target": 3})["error"] == "Unknown ship. Received: 3"
+    assert service.handle([1, 2])["error"] == "Request must be a JSON object"
+
+
+def test_added_cargo_follows_the_load_rules():
+    service = ContainerService()
+    liquid = {"type": "liquid", "capacity": 100, "height": 200, "dry_mass": 500, "depth": 100}
+    overfilled = service.handle({"op": "add", "container": {**liquid, "cargo": [[False, 400]]}})
+    assert overfilled["error"] == "Cargo would overfill the container"
+    forged = service.handle({"op": "add", "container": {**GENERAL, "loaded_mass": -50}})
+    assert forged["error"] == "Field not allowed: loaded_mass"
+    assert service.storage.container_count == 0
+
+    added = service.handle({"op": "add", "container": {**liquid, "cargo": [[False, 50]]}})
+    assert service.storage.get(added["result"]["serial_number"]).loaded_mass == 50
+    assert service.storage.loaded_mass == 50
+
+
+def test_batch_answers_every_request():
+    service = ContainerService()
+    response = service.handle(
+        {"op": "batch", "requests": [{"op": "add", "container": GENERAL}, {"op": "fly"}]}
+    )
+    assert [item["ok"] for item in response["result"]] == [True, False]
+
+
+def test_pipelined_requests_are_answered_in_order():
+    async def scenario():
+        service = ContainerService(max_batch=16, max_pending=8)
+        container = Container(10**6, 200, 500, 100)
+        service.storage.add_container(container)
+        host, port = await service.start()
+        reader, writer = await asyncio.open_connection(host, port)
+        requests = [
+            {"id": number, "op": "load", "serial_number": container.serial_number, "cargo": [True, 1]}
+            for number in range(200)
+        ]
+        writer.write(b"".join(json.dumps(request).encode() + b"\n" for request in requests))
+        writer.write(b"not json\n")
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in range(201)]
+        writer.close()
+        await service.close()
+        return service, container, responses
+
+    service, container, responses = asyncio.run(scenario())
+    assert [response["id"] for response in responses[:200]] == list(range(200))
+    assert [response["result"]["loaded_mass"] for response in responses[:200]] == list(range(1, 201))
+    assert responses[200]["error"] == "Invalid JSON"
+    assert container.loaded_mass == 200
+    # Pipelined requests were handled several at a time.
+    assert service.batches < service.handled
+
+
+def test_a_malformed_line_does_not_stop_other_clients():
+    async def scenario():
+        service = ContainerService()
+        host, port = await service.start()
+        _, first = await asyncio.open_connection(host, port)
+        first.write(b"[" * 200_000 + b"\n")
+        await first.drain()
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b'{"id":1,"op":"stats"}\n')
+        await writer.drain()
+        response = json.loads(await asyncio.wait_for(reader.readline(), 10))
+        first.close()
+        writer.close()
+        await service.close()
+        return response
+
+    assert asyncio.run(scenario())["ok"]
+
+
+def test_service_runs_against_existing_ships():
+    ship = Ship(20, 5, 10_000)
+    container = Container(1000, 200, 500, 100)
+    container.load_container(Cargo(True, 100))
+    ship.load_container(container)
+    service = ContainerService(ships=[ship])
+    result = service.handle({"op": "query", "target": 0, "records": True})["result"]
+    assert result[0]["serial_number"] == container.serial_number
+    assert result[0]["loaded_mass"] == 100
+
+
+def test_serve_saves_ships_added_over_the_wire(monkeypatch, tmp_path):
+    from solution.__main__ import main
+    from solution.snapshot import restore
+
+    async def one_request(host, port, service):
+        service.handle({"op": "add_ship", "max_speed": 20, "capacity": 5, "max_tonnage": 10_000})
+        service.handle({"op": "add", "target": 0, "container": GENERAL})
+
+    monkeypatch.setattr("solution.service.serve", one_request)
+    path = tmp_path / "yard.snap"
+    main(["serve", "--snapshot", str(path), "--quiet"])
+    _, ship = restore(path)
+    assert ship.storage.container_count == 1
@@ -0,0 +1,68 @@
+import pytest
+from solution import Cargo, Container, Ship
+
+
+def make_containers(count, dry_mass=100):
+    return [Container(1000, 200, dry_mass, 100) for _ in range(count)]
+
+
+def test_batch_loads_every_container():
+    ship = Ship(30, 10, 10000)
+    containers = make_containers(3)
+    containers[0].load_container(Cargo(True, 200))
+    report = ship.load_container_batch(containers)
+    assert report.ok
+    assert report.accepted == containers
+    assert report.total_mass == 500
+    assert list(ship.storage.containers) == containers
+
+
+def test_batch_over_capacity_loads_nothing():
+    ship = Ship(30, 2, 10000)
+    report = ship.load_container_batch(make_containers(3))
+    assert not report.ok
+    assert report.accepted == []
+    assert len(report.rejected) == 3
+    assert "capacity" in report.rejected[0][1]
+    assert len(ship.storage.containers) == 0
+
+
+def test_batch_over_tonnage_loads_nothing():
+    ship = Ship(30, 10, 250)
+    ship.load_container(make_containers(1)[0])
+    report = ship.load_container_batch(make_containers(2))
+    assert "tonnage" in report.rejected[0][1]
+    assert len(ship.storage.containers) == 1
+
+
+def test_batch_with_invalid_container_loads_nothing():
+    ship = Ship(30, 10, 10000)
+    containers = make_containers(2)
+    ship.load_container(containers[0])
+    report = ship.load_container_batch([containers[1], containers[0], None])
+    assert report.rejected[0] == (containers[0], "Container is already on board")
+    assert report.rejected[1] == (None, "Container cannot be None")
+    assert report.rejected[2][0] is containers[1]
+    assert list(ship.storage.containers) == [containers[0]]
+
+
+def test_load_container_group_returns_report():
+    ship = Ship(30, 10, 10000)
+    report = ship.load_container_group(make_containers(2))
+    assert report.ok
+    with pytest.raises(Exception, match="cannot be None"):
+        ship.load_container_group(None)
+
+
+def test_current_tonnage_tracks_loading_and_transport():
+    ship1 = Ship(30, 10, 10000)
+    ship2 = Ship(30, 10, 10000)
+    container = Container(1000, 200, 100, 100)
+    ship1.load_container(container)
+    container.load_container(Cargo(True, 400))
+    assert ship1.current_tonnage == 500
+    ship1.transport_container(container, ship2)
+    assert ship1.current_tonnage == 0
+    assert ship2.current_tonnage == 500
+    container.empty_container()
+    assert ship2.current_tonnage == 100
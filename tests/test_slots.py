@@ -0,0 +1,49 @@
+import tracemalloc
+
+import pytest
+from solution import Cargo, ChilledContainer, Container, GasContainer
+
+COUNT = 100_000
+
+
+class DictCargo:
+    def __init__(self, safe, load_mass):
+        self.safe = safe
+        self.load_mass = load_mass
+
+
+def traced_bytes(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return used
+
+
+def test_slotted_cargo_uses_less_memory():
+    slotted = traced_bytes(lambda: [Cargo(True, 100) for _ in range(COUNT)])
+    with_dict = traced_bytes(lambda: [DictCargo(True, 100) for _ in range(COUNT)])
+    assert slotted < 0.75 * with_dict
+
+
+def test_containers_have_no_instance_dict():
+    for container in (
+        Cargo(True, 1),
+        Container(10, 1, 1, 1),
+        GasContainer(10, 1, 1, 1),
+        ChilledContainer(10, 1, 1, 1, "Fruits", 5),
+    ):
+        assert not hasattr(container, "__dict__")
+    with pytest.raises(AttributeError):
+        Container(10, 1, 1, 1).colour = "red"
+
+
+def test_kind_discriminates_container_types(capsys):
+    assert Container(10, 1, 1, 1).kind == "general"
+    assert GasContainer(10, 1, 1, 1).kind == "gas"
+    ChilledContainer(10, 1, 1, 1, "Fruits", 5).print_info()
+    assert "Fruits" in capsys.readouterr().out
+    Container(10, 1, 1, 1).print_info()
+    assert "Temperature" not in capsys.readouterr().out
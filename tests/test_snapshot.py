@@ -0,0 +1,144 @@
+import os
+
+import pytest
+from solution import (
+    Cargo,
+    ChilledContainer,
+    Container,
+    ContainerForLiquids,
+    GasContainer,
+    Ship,
+    Storage,
+)
+from solution.snapshot import Journal, Snapshot, checkpoint, restore, write_snapshot
+
+
+@pytest.fixture
+def locations():
+    yard = Storage()
+    regular = Container(1000, 200, 500, 100)
+    regular.load_container(Cargo(False, 300))
+    gas = GasContainer(1000, 200, 500, 100)
+    gas.load_container(Cargo(True, 500))
+    gas.empty_container()
+    yard.add_container(regular)
+    yard.add_container(gas)
+    yard.add_container(Container(1000, 200, 500, 100, "LEGACY-SNAP-1"))
+
+    ship = Ship(30, 10, 100_000)
+    chilled = ChilledContainer(1000, 200, 500, 100, "Fruits", -5)
+    chilled.load_container(Cargo(True, 100), "Fruits", -5)
+    ship.load_container(chilled)
+    ship.load_container(ContainerForLiquids(800, 200, 250, 100))
+    return [yard, ship]
+
+
+def test_snapshot_round_trip(locations, tmp_path):
+    path = tmp_path / "yard.snap"
+    write_snapshot(path, locations)
+    assert os.listdir(tmp_path) == ["yard.snap"]
+
+    yard, ship = restore(path)
+    original_yard, original_ship = locations
+    assert [c.serial_number for c in yard.containers] == [
+        c.serial_number for c in original_yard.containers
+    ]
+    assert yard.loaded_mass == original_yard.loaded_mass
+    assert yard.count_by_hazard == original_yard.count_by_hazard
+    assert isinstance(ship, Ship)
+    assert (ship.max_speed, ship.capacity, ship.max_tonnage) == (30, 10, 100_000)
+    assert ship.current_tonnage == original_ship.current_tonnage
+    chilled = ship.storage.containers[0]
+    assert chilled.type_of_cargo == "Fruits"
+    assert chilled.cargo[0].load_mass == 100
+
+
+def test_snapshot_lookups_are_lazy(locations, tmp_path):
+    path = tmp_path / "yard.snap"
+    write_snapshot(path, locations)
+    gas = locations[0].containers[1]
+    with Snapshot(path) as snapshot:
+        assert len(snapshot) == 5
+        row = snapshot.find(gas.serial_number)
+        assert snapshot.row(row)["loaded_mass"] == 25
+        assert snapshot.row(row)["location"] == 0
+        assert snapshot.get("LEGACY-SNAP-1").serial_number == "LEGACY-SNAP-1"
+        assert snapshot.find("KON-M-999999999") is None
+        restored = snapshot.get(gas.serial)
+        restored.load_container(Cargo(True, 100))
+        restored.empty_container()
+        assert restored.loaded_mass == 6.25
+
+
+def test_restored_serials_are_not_reallocated(locations, tmp_path):
+    path = tmp_path / "yard.snap"
+    write_snapshot(path, locations)
+    restored = {c.serial for location in restore(path) for c in
+                (location.storage if isinstance(location, Ship) else location).containers}
+    assert Container(10, 1, 1, 1).serial not in restored
+
+
+def test_journal_replays_changes_after_snapshot(locations, tmp_path):
+    snapshot_path = tmp_path / "yard.snap"
+    journal_path = tmp_path / "yard.journal"
+    write_snapshot(snapshot_path, locations)
+    yard, ship = locations
+    new_container = Container(1000, 200, 500, 100)
+    regular = yard.containers[0]
+    with Journal(journal_path, locations) as journal:
+        journal.add_container(0, new_container)
+        journal.load_container(new_container, Cargo(True, 400))
+        journal.load_container(new_container, Cargo(True, 4000))
+        journal.empty_container(regular)
+        journal.remove_container(1, ship.storage.containers[1])
+        journal.load_container(ship.storage.containers[0], Cargo(True, 50), "Fruits", -5)
+    with open(journal_path, "a") as file:
+        file.write('["empty", "KON')
+
+    restored_yard, restored_ship = restore(snapshot_path, journal_path)
+    assert restored_yard.get(new_container.serial_number).loaded_mass == 400
+    assert restored_yard.get(regular.serial_number).loaded_mass == 0
+    assert restored_ship.storage.container_count == 1
+    assert restored_ship.current_tonnage == ship.current_tonnage
+
+
+def test_checkpoint_folds_journal_into_snapshot(locations, tmp_path):
+    snapshot_path = tmp_path / "yard.snap"
+    journal_path = tmp_path / "yard.journal"
+    with Journal(journal_path, locations) as journal:
+        journal.add_container(0, Container(1000, 200, 500, 100))
+        checkpoint(snapshot_path, journal)
+        assert os.path.getsize(journal_path) == 0
+    yard, _ = restore(snapshot_path, journal_path)
+    assert yard.container_count == 4
+
+
+def test_journal_cuts_off_a_torn_line(locations, tmp_path):
+    snapshot_path = tmp_path / "yard.snap"
+    journal_path = tmp_path / "yard.journal"
+    write_snapshot(snapshot_path, locations)
+    with Journal(journal_path, locations) as journal:
+        journal.add_container(0, Container(1000, 200, 500, 100))
+    with open(journal_path, "a") as file:
+        file.write('["empty", "KON')
+
+    restored = restore(snapshot_path, journal_path)
+    with Journal(journal_path, restored) as journal:
+        journal.add_container(0, Container(1000, 200, 500, 100))
+        journal.add_container(0, Container(1000, 200, 500, 100))
+    yard, _ = restore(snapshot_path, journal_path)
+    assert yard.container_count == restored[0].container_count == locations[0].container_count + 2
+
+
+def test_journal_replaces_by_key(locations, tmp_path):
+    snapshot_path = tmp_path / "yard.snap"
+    journal_path = tmp_path / "yard.journal"
+    write_snapshot(snapshot_path, locations)
+    yard = locations[0]
+    old = yard.containers[0]
+    replacement = Container(1000, 200, 500, 100)
+    with Journal(journal_path, locations) as journal:
+        journal.replace_container(0, old.serial, replacement)
+    restored_yard, _ = restore(snapshot_path, journal_path)
+    assert restored_yard.get(old.serial) is None
+    assert restored_yard.get(replacement.serial) is not None
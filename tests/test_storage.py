@@ -0,0 +1,107 @@
+import pytest
+from solution import Cargo, Container, GasContainer, Storage
+
+
+@pytest.fixture
+def containers():
+    return [Container(1000, 200, 500, 100) for _ in range(5)]
+
+
+@pytest.fixture
+def storage(containers):
+    storage = Storage()
+    for container in containers:
+        storage.add_container(container)
+    return storage
+
+
+def test_get_by_serial_number(storage, containers):
+    assert storage.get(containers[2].serial_number) is containers[2]
+    assert storage.get("missing") is None
+
+
+def test_add_duplicate_serial_number_is_rejected(storage, containers):
+    with pytest.raises(Exception, match="already in storage"):
+        storage.add_container(containers[0])
+    assert len(storage.containers) == 5
+
+
+def test_replace_keeps_position(storage, containers):
+    new_container = GasContainer(500, 100, 100, 100)
+    storage.replace_container(containers[1].serial_number, new_container)
+    assert storage.containers[1] is new_container
+    assert storage.get(containers[1].serial_number) is None
+    assert containers[1] not in storage.containers
+    assert new_container in storage.containers
+
+
+def test_only_stored_containers_are_in_the_view(storage, containers):
+    assert containers[0] in storage.containers
+    assert None not in storage.containers
+    assert "KON-M-1" not in storage.containers
+    assert Container(1000, 200, 500, 100) not in storage.containers
+
+
+def test_remove_keeps_insertion_order(storage, containers):
+    storage.remove_container(containers[0])
+    storage.remove_container_by_serial_number(containers[3].serial_number)
+    assert list(storage.containers) == [containers[1], containers[2], containers[4]]
+    assert storage.containers[0] is containers[1]
+    assert storage.containers[-1] is containers[4]
+
+
+def test_remove_missing_container_raises(storage):
+    with pytest.raises(ValueError):
+        storage.remove_container(Container(1000, 200, 500, 100))
+
+
+def test_many_removals_compact_slots():
+    storage = Storage()
+    containers = [Container(10, 1, 1, 1) for _ in range(200)]
+    for container in containers:
+        storage.add_container(container)
+    for container in containers[:150]:
+        storage.remove_container(container)
+    assert len(storage._slots) < 200
+    assert list(storage.containers) == containers[150:]
+    assert storage.get(containers[199].serial_number) is containers[199]
+
+
+def test_aggregates_follow_add_load_empty_and_remove():
+    storage = Storage()
+    container = Container(1000, 200, 500, 100)
+    gas = GasContainer(1000, 200, 100, 100)
+    storage.add_container(container)
+    storage.add_container(gas)
+    assert storage.total_mass == 600
+    assert storage.count_by_type == {"general": 1, "gas": 1}
+
+    container.load_container(Cargo(False, 300))
+    gas.load_container(Cargo(True, 200))
+    assert storage.loaded_mass == 500
+    assert storage.total_mass == 1100
+    assert storage.count_by_hazard == {"safe": 1, "hazardous": 1}
+
+    gas.empty_container()
+    container.empty_container()
+    assert storage.loaded_mass == 10
+    assert storage.count_by_hazard == {"safe": 2, "hazardous": 0}
+
+    storage.remove_container(gas)
+    assert storage.total_mass == 500
+    assert storage.container_count == 1
+    assert storage.count_by_type == {"general": 1}
+    gas.load_container(Cargo(True, 100))
+    assert storage.total_mass == 500
+
+
+def test_aggregates_follow_replace_and_empty_warehouse(storage, containers):
+    new_container = GasContainer(500, 100, 100, 100)
+    storage.replace_container(containers[0].serial_number, new_container)
+    assert storage.total_mass == 4 * 500 + 100
+    assert storage.count_by_type == {"general": 4, "gas": 1}
+    storage.empty_warehouse()
+    assert storage.total_mass == 0
+    assert storage.count_by_type == {}
+    containers[1].load_container(Cargo(True, 10))
+    assert storage.loaded_mass == 0
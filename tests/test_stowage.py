@@ -0,0 +1,114 @@
+import itertools
+import random
+
+import pytest
+from solution import Container, Ship, Storage
+from solution.stowage import plan_stowage
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+def yard(masses):
+    storage = Storage()
+    for mass in masses:
+        storage.add_container(Container(1000, 100, mass, 100))
+    return storage
+
+
+def best_mass(containers, slots, tonnage):
+    return max(
+        total
+        for count in range(slots + 1)
+        for combination in itertools.combinations(containers, count)
+        if (total := sum(c.dry_mass for c in combination)) <= tonnage
+    )
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_plan_is_feasible_and_near_optimal(seed):
+    rng = random.Random(seed)
+    storage = yard(rng.randint(100, 900) for _ in range(12))
+    ship = Ship(20, rng.randint(2, 5), rng.randint(1000, 3000))
+    plan = plan_stowage(storage, [ship])
+    (stowage,) = plan.stowages
+    assert len(stowage.containers) <= ship.capacity
+    assert stowage.mass == sum(c.dry_mass for c in stowage.containers) <= ship.max_tonnage
+    # Rounding to 1000 buckets loses at most one bucket per container.
+    optimum = best_mass(storage.containers, ship.capacity, ship.max_tonnage)
+    assert stowage.mass >= optimum - ship.capacity * ship.max_tonnage / 1000
+
+
+def test_dynamic_program_beats_greedy():
+    storage = yard([600, 500, 500])
+    plan = plan_stowage(storage, [Ship(20, 3, 1000)])
+    assert plan.stowages[0].method == "bucketed"
+    assert plan.total_mass == 1000
+
+
+def test_zero_time_budget_keeps_greedy_answer():
+    storage = yard([600, 500, 500])
+    plan = plan_stowage(storage, [Ship(20, 3, 1000)], time_budget=0)
+    assert plan.stowages[0].method == "greedy"
+    assert plan.total_mass == 600
+
+
+def test_priority_orders_the_choice():
+    storage = yard([900, 200, 300])
+    light = storage.containers[1]
+    plan = plan_stowage(
+        storage, [Ship(20, 2, 1000)], priority=lambda c: c is light
+    )
+    assert plan.stowages[0].containers == [light, storage.containers[2]]
+
+
+def test_ships_share_the_yard_and_apply_moves_containers():
+    storage = yard([400] * 10)
+    loaded = Ship(20, 3, 5000)
+    loaded.load_container(Container(1000, 100, 400, 100))
+    ships = [loaded, Ship(20, 10, 1200)]
+    plan = plan_stowage(storage, ships)
+    assert [len(s.containers) for s in plan.stowages] == [2, 3]
+    assert len(plan.unassigned) == 5
+    reports = plan.apply()
+    assert all(report.ok for report in reports)
+    assert storage.container_count == 5
+    assert [ship.storage.container_count for ship in ships] == [3, 3]
+
+
+def test_apply_skips_a_ship_whose_containers_moved():
+    storage = yard([400] * 3)
+    a, b = Ship(20, 5, 5000), Ship(20, 5, 5000)
+    plan = plan_stowage(storage, [a])
+    moved = storage.containers[0]
+    storage.remove_container(moved)
+    b.load_container(moved)
+
+    (report,) = plan.apply()
+    assert report.accepted == [] and len(report.rejected) == 3
+    reasons = {container.serial: reason for container, reason in report.rejected}
+    assert "is not in the storage" in reasons[moved.serial]
+    assert a.storage.container_count == 0
+    assert b.storage.get(moved.serial) is moved
+    assert storage.container_count == 2
+
+
+def test_load_container_enforces_ship_limits():
+    ship = Ship(20, 1, 1000)
+    ship.load_container(Container(1000, 100, 400, 100))
+    with pytest.raises(Exception, match="Ship is full"):
+        ship.load_container(Container(1000, 100, 400, 100))
+
+    heavy = Ship(20, 5, 1000)
+    with pytest.raises(Exception, match="remaining tonnage"):
+        heavy.load_container(Container(1000, 100, 1200, 100))
+
+
+def test_transport_to_a_full_ship_keeps_the_container():
+    source = Ship(20, 5, 10_000)
+    destination = Ship(20, 1, 10_000)
+    destination.load_container(Container(1000, 100, 400, 100))
+    container = Container(1000, 100, 400, 100)
+    source.load_container(container)
+    with pytest.raises(Exception, match="Ship is full"):
+        source.transport_container(container, destination)
+    assert container in source.storage.containers
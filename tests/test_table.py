@@ -0,0 +1,90 @@
+import tracemalloc
+
+import pytest
+from solution import (
+    Cargo,
+    ChilledContainer,
+    Container,
+    ContainerForLiquids,
+    GasContainer,
+    Storage,
+)
+from solution.table import ContainerTable
+
+
+@pytest.fixture
+def table():
+    table = ContainerTable()
+    table.append(Container, 1000, 200, 500, 100)
+    table.append(ContainerForLiquids, 1000, 200, 500, 100)
+    table.append(GasContainer, 1000, 200, 500, 100)
+    table.append(ChilledContainer, 1000, 200, 500, 100, "Fruits", 5)
+    return table
+
+
+def test_rows_behave_like_containers(table):
+    regular, liquid, gas, chilled = table
+    regular.load_container(Cargo(True, 800))
+    assert regular.loaded_mass == 800
+    assert len(regular.cargo) == 1
+
+    liquid.load_container(Cargo(False, 600))
+    assert liquid.loaded_mass == 0
+
+    gas.load_container(Cargo(True, 500))
+    gas.empty_container()
+    assert gas.loaded_mass == 25
+    assert gas.cargo == []
+
+    chilled.load_container(Cargo(True, 200), "Fruits", 5)
+    assert chilled.loaded_mass == 200
+    assert chilled.type_of_cargo == "Fruits"
+    with pytest.raises(Exception, match="different type of cargo"):
+        chilled.load_container(Cargo(True, 200), "Vegetables", 5)
+    assert not hasattr(regular, "temperature")
+
+
+def test_serial_numbers_and_find(table):
+    codes = [row.serial_number.split("-")[1] for row in table]
+    assert codes == ["M", "L", "G", "C"]
+    assert table.find(table[2].serial_number) == table[2]
+    assert table.find(table[2].serial) == table[2]
+    assert table.find("KON-G-0") is None
+    row = table[table.append(GasContainer, 10, 1, 1, 1, serial_number="KON-G-999999")]
+    assert table.find("KON-G-999999") == row
+
+
+def test_rows_work_with_storage(table, capsys):
+    storage = Storage()
+    storage.add_container(table[0])
+    table[0].load_container(Cargo(False, 100))
+    assert storage.loaded_mass == 100
+    assert table[0] in storage.containers
+    storage.remove_container(table[0])
+    assert storage.container_count == 0
+    table[3].print_info()
+    assert "Fruits" in capsys.readouterr().out
+
+
+def test_table_rows_are_compact():
+    count = 20_000
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    containers = [Container(1000, 200, 500, 100) for _ in range(count)]
+    object_bytes = tracemalloc.get_traced_memory()[0] - before
+    del containers
+    before = tracemalloc.get_traced_memory()[0]
+    table = ContainerTable()
+    for _ in range(count):
+        table.append(Container, 1000, 200, 500, 100)
+    table_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert table_bytes / count <= 80
+    assert object_bytes >= 3 * table_bytes
+
+
+def test_rows_are_counted_by_kind():
+    table = ContainerTable()
+    storage = Storage()
+    storage.add_container(table[table.append(GasContainer, 10, 1, 1, 1)])
+    assert storage.count_by_type == {"gas": 1}
@@ -0,0 +1,94 @@
+import pytest
+from solution import Cargo, Container, Ship, Storage
+from solution.console_app import console_move_container
+from solution.terminal import NOT_REGISTERED, Terminal
+from solution.transactions import Transaction
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+@pytest.fixture
+def terminal():
+    yard = Storage()
+    for _ in range(4):
+        yard.add_container(Container(1000, 200, 500, 100))
+    return Terminal([yard], [Ship(20, 2, 100_000), Ship(20, 5, 100_000)])
+
+
+def test_index_follows_every_way_of_moving(terminal):
+    yard = terminal.yards[0]
+    first, second = terminal.ships
+    a, b, c, d = yard.containers
+    assert terminal.container_count == 4
+    assert terminal.locate(a.serial_number) is yard
+
+    yard.remove_container(a)
+    first.load_container(a)
+    assert terminal.locate(a.serial_number) is first
+    first.transport_container(a, second)
+    assert terminal.locate(a.serial) is second
+    replacement = Container(1000, 200, 500, 100)
+    second.replace_container(a.serial_number, replacement)
+    assert terminal.locate(a.serial_number) is None
+    assert terminal.find(replacement.serial_number) is replacement
+    second.unload_container(replacement)
+    assert replacement.serial_number not in terminal
+
+    Transaction().unload(yard, b).load(first, b).commit()
+    assert terminal.locate(b.serial_number) is first
+    yard.empty_warehouse()
+    assert terminal.locations(c.serial_number) == []
+    assert terminal.container_count == 1
+
+
+def test_bulk_moves_are_all_or_nothing(terminal):
+    yard = terminal.yards[0]
+    first, second = terminal.ships
+    serial_numbers = [container.serial_number for container in yard.containers]
+
+    report = terminal.move(serial_numbers, first)
+    assert not report.committed
+    assert report.outcomes[:2] == [None, None]
+    assert report.outcomes[2] == "Ship is full: it can carry at most 2 containers"
+    assert all(terminal.locate(serial) is yard for serial in serial_numbers)
+
+    report = terminal.move([*serial_numbers[:2], "KON-M-999999"], second)
+    assert not report.committed
+    assert "is not in the terminal" in report.outcomes[2]
+
+    report = terminal.move(serial_numbers, second)
+    assert report.committed and report.outcomes == [None] * 4
+    assert second.storage.container_count == 4
+    assert all(terminal.locate(serial) is second for serial in serial_numbers)
+
+
+def test_moves_only_go_to_registered_locations(terminal):
+    yard = terminal.yards[0]
+    a, b = yard.containers[:2]
+    report = terminal.move([a.serial_number, b.serial_number], Ship(20, 5, 100_000))
+    assert not report.committed
+    assert report.outcomes == [NOT_REGISTERED, NOT_REGISTERED]
+    assert terminal.locate(a.serial_number) is yard and yard.get(a.serial) is a
+
+
+def test_ships_can_join_and_leave(terminal):
+    ship = Ship(20, 5, 100_000)
+    container = Container(1000, 200, 500, 100)
+    container.load_container(Cargo(True, 10))
+    ship.load_container(container)
+    terminal.add_ship(ship)
+    assert terminal.locate(container.serial_number) is ship
+    with pytest.raises(Exception):
+        Terminal(ships=[ship])
+    terminal.remove_ship(ship)
+    assert terminal.locate(container.serial_number) is None
+    ship.unload_container(container)  # no longer reported
+
+
+def test_console_moves_a_container(terminal, monkeypatch, capsys):
+    container = terminal.yards[0].containers[0]
+    answers = iter([container.serial_number, "1"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    console_move_container(terminal)
+    assert terminal.locate(container.serial_number) is terminal.ships[1]
+    assert "Kontener znajduje się: magazyn" in capsys.readouterr().out
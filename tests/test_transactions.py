@@ -0,0 +1,169 @@
+import pytest
+from solution import Cargo, Container, ContainerForLiquids, Ship, Storage
+from solution.events import (
+    ContainerLoaded,
+    ContainerRemoved,
+    HazardRaised,
+    RingBufferSink,
+    use_sink,
+)
+from solution.transactions import Transaction
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+def state(*storages):
+    return [
+        (
+            [container.serial for container in storage.containers],
+            storage.total_mass,
+            storage.loaded_mass,
+            dict(storage.count_by_type),
+            dict(storage.count_by_hazard),
+        )
+        for storage in storages
+    ]
+
+
+def test_commit_applies_every_operation():
+    yard = Storage()
+    first, second = Ship(20, 5, 100_000), Ship(20, 5, 100_000)
+    containers = [Container(1000, 200, 500, 100) for _ in range(3)]
+    yard.add_container(containers[0])
+    first.load_container(containers[1])
+    yard.query(hazardous=True)  # build the indexes
+
+    replacement = ContainerForLiquids(1000, 200, 400, 100)
+    report = (
+        Transaction()
+        .unload(yard, containers[0])
+        .load(first, containers[0])
+        .load_cargo(containers[0], Cargo(False, 100))
+        .transport(containers[1], first, second)
+        .replace(second, containers[1].serial_number, replacement)
+        .load(yard, containers[2])
+        .load_cargo(containers[2], Cargo(True, 200))
+        .empty(containers[2])
+        .commit()
+    )
+    assert report.committed
+    assert report.rejected == []
+    assert list(first.storage.containers) == [containers[0]]
+    assert list(second.storage.containers) == [replacement]
+    assert list(yard.containers) == [containers[2]]
+    assert containers[0].loaded_mass == 100 and containers[0].is_hazardous
+    assert containers[2].loaded_mass == 0 and containers[2].cargo == []
+    assert first.current_tonnage == 600
+    assert second.current_tonnage == 400
+    assert yard.query(hazardous=True) == []
+    assert first.storage.query(hazardous=True) == [containers[0]]
+    assert containers[1]._storages == []
+
+
+def test_a_failing_operation_leaves_everything_as_it_was():
+    yard = Storage()
+    ship = Ship(20, 1, 100_000)
+    containers = [Container(1000, 200, 500, 100) for _ in range(2)]
+    for container in containers:
+        yard.add_container(container)
+    before = state(yard, ship.storage)
+
+    report = (
+        Transaction()
+        .load_cargo(containers[0], Cargo(True, 100))
+        .unload(yard, containers[0])
+        .load(ship, containers[0])
+        .unload(yard, containers[1])
+        .load(ship, containers[1])
+        .replace(yard, "KON-M-999999", Container(1000, 200, 500, 100))
+        .load_cargo(containers[1], Cargo(True, 5000))
+        .commit()
+    )
+    assert not report.committed
+    assert [index for index, _ in report.rejected] == [4, 5, 6]
+    assert report.outcomes[4] == "Ship is full: it can carry at most 1 containers"
+    assert "is not in the storage" in report.outcomes[5]
+    assert report.outcomes[6] == "Cargo would overfill the container"
+    assert state(yard, ship.storage) == before
+    assert containers[0].loaded_mass == 0
+    assert containers[0]._storages == [yard]
+
+
+def test_checks_see_earlier_operations():
+    ship = Ship(20, 5, 100_000)
+    container = ContainerForLiquids(1000, 200, 500, 100)
+    ship.load_container(container)
+    report = (
+        Transaction()
+        .load_cargo(container, Cargo(False, 400))
+        .load_cargo(container, Cargo(False, 400))  # over the hazardous limit by now
+        .commit()
+    )
+    assert report.outcomes == [None, "Cargo would overfill the container"]
+    assert container.loaded_mass == 0
+
+
+def test_errors_while_applying_are_rolled_back(monkeypatch):
+    yard = Storage()
+    ship = Ship(20, 5, 100_000)
+    container = Container(1000, 200, 500, 100)
+    yard.add_container(container)
+    before = state(yard, ship.storage)
+
+    def broken(self, draft):
+        raise RuntimeError("disk on fire")
+
+    transaction = Transaction().load_cargo(container, Cargo(True, 10)).unload(yard, container)
+    transaction.load(ship, container)
+    # Fails once both moves are done, before the cargo is loaded.
+    monkeypatch.setattr("solution.transactions._Apply.content", broken)
+    with pytest.raises(RuntimeError):
+        transaction.commit()
+    assert state(yard, ship.storage) == before
+    assert container.loaded_mass == 0
+    assert container._storages == [yard]
+
+
+def test_events_follow_a_commit():
+    ship, other = Ship(20, 5, 100_000), Ship(20, 5, 100_000)
+    container = Container(1000, 200, 500, 100)
+    ship.load_container(container)
+    with use_sink(RingBufferSink()) as sink:
+        Transaction().load_cargo(container, Cargo(True, 10)).transport(container, ship, other).commit()
+    assert [type(event) for event in sink.events] == [ContainerLoaded, ContainerRemoved]
+
+
+def test_a_rolled_back_commit_only_emits_its_hazards():
+    storage = Storage()
+    container, other = Container(1000, 200, 500, 100), Container(1000, 200, 500, 100)
+    with use_sink(RingBufferSink()) as sink:
+        report = (
+            Transaction()
+            .load(storage, container)
+            .load_cargo(other, Cargo(True, 10))
+            .load_cargo(other, Cargo(True, 1000))
+            .commit()
+        )
+    assert not report.committed
+    assert [type(event) for event in sink.events] == [HazardRaised]
+    assert sink.events[0].serial == other.serial
+
+
+def test_loads_after_an_empty_start_from_fresh_cargo():
+    container = Container(1000, 200, 500, 100)
+    container.load_container(Cargo(True, 5))
+    transaction = Transaction()
+    for mass in (10, 20):
+        transaction.load_cargo(container, Cargo(True, mass))
+    transaction.empty(container).load_cargo(container, Cargo(False, 30))
+    assert transaction.commit().committed
+    assert [(item.safe, item.load_mass) for item in container.cargo] == [(False, 30)]
+    assert container.loaded_mass == 30 and container.is_hazardous
+
+
+def test_replace_reports_whether_it_replaced():
+    ship = Ship(20, 5, 100_000)
+    container = Container(1000, 200, 500, 100)
+    ship.load_container(container)
+    assert ship.replace_container(container.serial_number, Container(1000, 200, 500, 100))
+    assert not ship.replace_container("KON-M-999999", Container(1000, 200, 500, 100))